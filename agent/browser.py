@@ -2,8 +2,25 @@
 import logging
 import time
 import random
+from PIL import Image
 from playwright.sync_api import sync_playwright, Page, ElementHandle
 from agent.humanizer import generate_human_path, random_sleep, typing_delay
+from ultragravity.ax_tree import AXElement, flatten_accessibility_tree
+from ultragravity.browser_service import BLANK_PAGE, CLAIM_PAGE_SCRIPT, BrowserService
+from ultragravity.element_index import (
+    DOM_STAMP_SCRIPT,
+    ELEMENT_INDEX_SCRIPT,
+    ElementIndex,
+    ElementIndexCache,
+    build_element_index,
+    draw_marks,
+    parse_mark,
+)
+from ultragravity.input_speed import InputSpeed, InputSpeedPolicy
+from ultragravity.page_cache import normalize_url, validator_from_headers
+from ultragravity.page_content import PageFetchResult, fetch_pages
+from ultragravity.request_policy import RequestRouter
+from ultragravity.settle import PageSettleDetector, SettleResult
 
 # Import stealth
 try:
@@ -25,16 +42,42 @@ except Exception:
             return None
 
 class BrowserAgent:
-    def __init__(self, headless: bool = True):
+    def __init__(
+        self,
+        headless: bool = True,
+        settle_detector: PageSettleDetector | None = None,
+        element_index_cache: ElementIndexCache | None = None,
+        input_speed_policy: InputSpeedPolicy | None = None,
+        service: BrowserService | None = None,
+        auto_start_service: bool = False,
+        request_router: RequestRouter | None = None,
+    ):
         self.headless = headless
+        self.request_router = request_router
+        self.service = service
+        self.auto_start_service = auto_start_service
+        self.attached = False
+        self.input_speed_policy = input_speed_policy or InputSpeedPolicy()
+        self.settle_detector = settle_detector or PageSettleDetector()
+        self.element_index_cache = element_index_cache or ElementIndexCache()
+        self.element_index: ElementIndex | None = None
+        self.document_validators: dict[str, str] = {}
         self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
+        self.ax_elements: dict[str, AXElement] = {}
         self.logger = logging.getLogger("BrowserAgent")
 
     def start(self):
         self.playwright = sync_playwright().start()
+        endpoint = self._service_endpoint()
+        if endpoint:
+            try:
+                self._attach(endpoint)
+                return
+            except Exception as exc:
+                self.logger.warning(f"Could not attach to browser service at {endpoint}, launching: {exc}")
         # Launch with minimal arguments first to ensure stability
         self.browser = self.playwright.chromium.launch(
             headless=self.headless,
@@ -47,6 +90,7 @@ class BrowserAgent:
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
         )
         
+        self._install_routing()
         self.page = self.context.new_page()
         
         # Apply stealth to the page
@@ -59,20 +103,201 @@ class BrowserAgent:
             });
         """)
 
+    def _service_endpoint(self) -> str | None:
+        if self.service is None:
+            return None
+        endpoint = self.service.endpoint()
+        if endpoint is None and self.auto_start_service:
+            try:
+                endpoint = self.service.start().endpoint
+            except Exception as exc:
+                self.logger.warning(f"Browser service failed to start: {exc}")
+        return endpoint
+
+    def _attach(self, endpoint: str):
+        """Takes a warm blank tab from the running service; nothing is launched."""
+        self.browser = self.playwright.chromium.connect_over_cdp(endpoint)
+        self.context = self.browser.contexts[0] if self.browser.contexts else self.browser.new_context()
+        self._install_routing()
+        self.page = self._claim_warm_page() or self.context.new_page()
+        self.page.set_viewport_size({"width": 1280, "height": 720})
+        # Init scripts belong to this CDP session, so they are re-added on every attach.
+        _apply_stealth(self.page)
+        self.page.add_init_script("""
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined
+            });
+        """)
+        self.attached = True
+        self.logger.info(f"Attached to browser service at {endpoint}")
+
+    def _claim_warm_page(self):
+        """A blank tab no other attached run holds, claimed with a flag set inside the page.
+
+        Page scripts run one at a time, so two runs racing for the same tab see the
+        flag exactly once; navigating the tab back to blank on release clears it.
+        """
+        for page in self.context.pages:
+            if page.url != BLANK_PAGE:
+                continue
+            try:
+                if page.evaluate(CLAIM_PAGE_SCRIPT):
+                    return page
+            except Exception:
+                continue
+        return None
+
+    def _install_routing(self):
+        if self.request_router is not None:
+            self.context.route("**/*", self.request_router.handle)
+            self.context.on("requestfinished", self.request_router.on_request_finished)
+            self.context.on("requestfailed", self.request_router.on_request_failed)
+
+    def _release(self):
+        """Hands the tab back blank and tops the warm pool up before disconnecting."""
+        try:
+            self.page.goto(BLANK_PAGE)
+            blank_pages = [page for page in self.context.pages if page.url == BLANK_PAGE]
+            for _ in range(self.service.warm_pages - len(blank_pages)):
+                self.context.new_page()
+        except Exception as exc:
+            self.logger.warning(f"Could not return page to the browser service: {exc}")
+
     def navigate(self, url: str):
         self.logger.info(f"Navigating to {url}")
-        self.page.goto(url, wait_until="domcontentloaded")
-        random_sleep(1, 2) # Human pause after load
+        response = self.page.goto(url, wait_until="domcontentloaded")
+        if response is not None:
+            validator = validator_from_headers(response.headers)
+            if validator:
+                self.document_validators[normalize_url(self.page.url)] = validator
+        self.wait_for_settle()
+
+    def document_validator(self, url: str | None = None) -> str:
+        """ETag/Last-Modified seen when ``url`` (default: the current page) was navigated to."""
+        return self.document_validators.get(normalize_url(url or self.page.url), "")
+
+    def wait_for_settle(self, timeout_seconds: float | None = None) -> SettleResult:
+        """Returns once the page is network-idle and the DOM has stopped mutating."""
+        result = self.settle_detector.wait(self.page, timeout_seconds=timeout_seconds)
+        self.logger.debug(f"Page settle: {result.reason} after {result.elapsed_ms}ms")
+        return result
+
+    def fetch_pages(
+        self,
+        urls: list[str],
+        max_concurrency: int = 4,
+        timeout_seconds: float = 15.0,
+    ) -> list[PageFetchResult]:
+        """Readable Markdown from several URLs, loaded in parallel tabs; ``self.page`` is untouched."""
+        return fetch_pages(self.context, urls, max_concurrency=max_concurrency, timeout_seconds=timeout_seconds)
 
     def get_screenshot(self, path: str = "screenshot.png"):
         self.page.screenshot(path=path)
         return path
 
+    def build_element_index(self, max_elements: int = 80) -> ElementIndex:
+        """Indexes visible interactive elements in one DOM pass; marks resolve against it.
+
+        The pass is skipped when the page's DOM stamp (mutations, scroll, viewport)
+        is unchanged since an index was last built for it.
+        """
+        url = self.page.url
+        stamp = str(self.page.evaluate(DOM_STAMP_SCRIPT) or "")
+        cached = self.element_index_cache.lookup(url, stamp)
+        if cached is not None and len(cached.elements) <= max_elements:
+            self.element_index = cached
+            return cached
+        raw_elements = self.page.evaluate(ELEMENT_INDEX_SCRIPT, max_elements) or []
+        index = build_element_index(url, raw_elements)
+        self.element_index = self.element_index_cache.put(index, stamp=stamp)
+        return self.element_index
+
+    def get_marked_screenshot(
+        self,
+        path: str = "screenshot.png",
+        marked_path: str = "screenshot_marked.png",
+        max_elements: int = 80,
+    ) -> tuple[str, ElementIndex]:
+        """Screenshot with numbered element marks drawn on it, plus the index behind them."""
+        index = self.build_element_index(max_elements=max_elements)
+        self.page.screenshot(path=path)
+        viewport = self.page.viewport_size or {}
+        scale = 1.0
+        if viewport.get("width"):
+            with Image.open(path) as image:
+                scale = image.width / viewport["width"]
+        return draw_marks(path, index, marked_path, scale=scale), index
+
     def get_accessibility_tree(self):
         return self.page.accessibility.snapshot()
 
+    def get_ax_elements(self, max_nodes: int = 150) -> list[AXElement]:
+        """Pruned accessibility elements; remembered so ids can be resolved later."""
+        elements = flatten_accessibility_tree(self.page.accessibility.snapshot(interesting_only=True), max_nodes=max_nodes)
+        self.ax_elements = {element.element_id: element for element in elements}
+        return elements
+
+    def locate_element(self, element_id: str):
+        element = self.ax_elements.get(element_id)
+        if element is None:
+            return None
+        if element.name:
+            return self.page.get_by_role(element.role, name=element.name, exact=True).nth(element.nth)
+        return self.page.get_by_role(element.role).nth(element.role_nth)
+
+    def mark_center(self, element_id: str) -> tuple[int, int] | None:
+        """Resolves a set-of-marks id, re-measuring through its selector when possible."""
+        element = self.element_index.get(element_id) if self.element_index else None
+        if element is None:
+            return None
+        locator = self.locator_for(element_id)
+        if locator is not None:
+            try:
+                box = locator.bounding_box(timeout=1000)
+            except Exception:
+                box = None
+            if box:
+                return int(box["x"] + box["width"] / 2), int(box["y"] + box["height"] / 2)
+        return element.center
+
+    def element_center(self, element_id: str) -> tuple[int, int] | None:
+        """Resolves an element id to viewport coordinates through a role locator."""
+        if parse_mark(element_id) is not None:
+            return self.mark_center(element_id)
+        locator = self.locate_element(element_id)
+        if locator is None:
+            return None
+        try:
+            locator.scroll_into_view_if_needed(timeout=2000)
+            box = locator.bounding_box(timeout=2000)
+        except Exception as exc:
+            self.logger.warning(f"Could not resolve element {element_id}: {exc}")
+            return None
+        if not box:
+            return None
+        return int(box["x"] + box["width"] / 2), int(box["y"] + box["height"] / 2)
+
+    def input_speed(self) -> InputSpeed:
+        return self.input_speed_policy.resolve("browser", self.page.url if self.page else "")
+
+    def locator_for(self, element_id: str):
+        """Playwright locator for an AX id or a set-of-marks id, if one is known."""
+        if parse_mark(element_id) is None:
+            return self.locate_element(element_id)
+        element = self.element_index.get(element_id) if self.element_index else None
+        if element is None or not element.selector:
+            return None
+        return self.page.locator(element.selector).first
+
     def human_click(self, x: int, y: int):
         """Simulate human mouse movement and click."""
+        speed = self.input_speed()
+        if speed is not InputSpeed.HUMAN:
+            if speed is InputSpeed.FAST:
+                self.page.mouse.move(x, y, steps=5)
+            self.page.mouse.click(x, y)
+            self.logger.info(f"Clicked at ({x}, {y}) [{speed.value}]")
+            return
         # Get current mouse position
         # Playwright doesn't expose current mouse pos directly easily in sync API without tracking, 
         # so we assume starting from a known or random point if it's the first move.
@@ -95,6 +320,7 @@ class BrowserAgent:
 
     def human_type(self, text: str, selector: str = None):
         """Simulate human typing."""
+        speed = self.input_speed()
         if selector:
             self.page.click(selector)
             
@@ -102,6 +328,11 @@ class BrowserAgent:
             self.logger.warning("human_type called with empty or None text.")
             return
 
+        if speed is not InputSpeed.HUMAN:
+            self._type_bulk(text, speed)
+            self.logger.info(f"Typed text: {text} [{speed.value}]")
+            return
+
         for char in text:
             if char == '\n':
                 self.page.keyboard.press("Enter")
@@ -111,17 +342,59 @@ class BrowserAgent:
             
         self.logger.info(f"Typed text: {text}")
 
+    def _type_bulk(self, text: str, speed: InputSpeed) -> None:
+        """One keyboard call per line instead of one per character; newlines press Enter."""
+        for index, line in enumerate(text.split("\n")):
+            if index:
+                self.page.keyboard.press("Enter")
+            if not line:
+                continue
+            if speed is InputSpeed.INSTANT:
+                self.page.keyboard.insert_text(line)
+            else:
+                self.page.keyboard.type(line, delay=10)
+
+    def _act_on_locator(self, action: str, element_id: str, text: str) -> bool:
+        """Instant mode: click or type through the element's locator, skipping the mouse.
+
+        Text is inserted at the caret like the other speeds type it, never
+        replacing what the field already holds.
+        """
+        locator = self.locator_for(element_id)
+        if locator is None:
+            return False
+        try:
+            locator.click(timeout=2000)
+            if action == "type":
+                self._type_bulk(text, InputSpeed.INSTANT)
+        except Exception as exc:
+            self.logger.warning(f"Locator {action} failed for {element_id}, using coordinates: {exc}")
+            return False
+        self.logger.info(f"{action.capitalize()} via locator {element_id} [instant]")
+        return True
+
     def scroll_human(self, dy: int):
         """Smooth scroll."""
         self.page.mouse.wheel(0, dy)
-        random_sleep(0.5, 1.0)
+        if self.input_speed() is InputSpeed.HUMAN:
+            random_sleep(0.5, 1.0)
 
     def execute_action(self, action_plan: dict):
         """Executes the action determined by the Vision module."""
         action = action_plan.get("action")
         target = action_plan.get("target_element", {})
         coords = target.get("coordinates")
-        
+        element_id = target.get("element_id")
+        if element_id and action in {"click", "type"}:
+            if self.input_speed() is InputSpeed.INSTANT and self._act_on_locator(
+                action, element_id, str(action_plan.get("value", "") or "")
+            ):
+                return
+            coords = self.element_center(element_id) or coords
+            if not coords:
+                # Clicking nothing would look like success and let the loop cache and repeat the plan.
+                raise LookupError(f"Element {element_id} could not be resolved and the plan has no coordinates")
+
         if action == "click":
             if coords:
                 self.human_click(coords[0], coords[1])
@@ -139,7 +412,7 @@ class BrowserAgent:
             self.scroll_human(500)
             
         elif action == "wait":
-            random_sleep(2, 4)
+            self.wait_for_settle()
             
         elif action == "done":
             self.logger.info("Task completed.")
@@ -148,7 +421,17 @@ class BrowserAgent:
             self.logger.error(f"Action failed: {action_plan.get('reasoning')}")
 
     def stop(self):
+        if self.request_router is not None and self.request_router.stats.requests:
+            stats = self.request_router.stats
+            self.logger.info(
+                f"Requests: {stats.requests} total, {stats.blocked} blocked, {stats.cache_hits} from cache "
+                f"({stats.bytes_from_cache} bytes not downloaded, {stats.bytes_downloaded} downloaded)"
+            )
+        if self.attached and self.page:
+            self._release()
+            self.attached = False
         if self.browser:
+            # For an attached browser this only disconnects; the service keeps running.
             self.browser.close()
         if self.playwright:
             self.playwright.stop()
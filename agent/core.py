@@ -9,18 +9,40 @@ from agent.vision import VisionAgent
 from agent.browser import BrowserAgent
 from agent.desktop import DesktopAgent
 import agent.bridge_applescript as os_bridge
-from skills import SearchSkill, NavigationSkill, ExtractionSkill
+from skills import SearchSkill, NavigationSkill, ExtractionSkill, ResearchSkill
 from skills.desktop_control import DesktopControlSkill
 from skills.whatsapp import WhatsAppSkill
 from termcolor import colored
 from ultragravity.actions import Action, RiskLevel
+from ultragravity.audit import AuditLogger
+from ultragravity.ax_tree import is_tree_sufficient, serialize_elements
 from ultragravity.call_reduction import TTLCache, build_tool_cache_key
+from ultragravity.capture import CaptureEngine
+from ultragravity.browser_service import BrowserService
+from ultragravity.checkpoint import ExecutionCheckpointer
+from ultragravity.element_index import ElementIndexCache
 from ultragravity.gateway import ActionGateway
+from ultragravity.input_speed import InputSpeedPolicy
+from ultragravity.log_retention import LogRetentionPolicy, apply_log_retention
+from ultragravity.metrics import (
+    MetricsRegistry,
+    MetricsServer,
+    TextfileWriter,
+    budget_collector,
+    cache_collector,
+    counters_collector,
+    telemetry_collector,
+)
+from ultragravity.page_cache import PageContentCache
 from ultragravity.policy import PolicyEngine, PolicyProfile
+from ultragravity.request_policy import HttpAssetCache, RequestPolicy, RequestRouter
 from ultragravity.config import AppRuntimeConfig
-from ultragravity.executor import ExecutionState, PlanExecutor
-from ultragravity.planner import Planner, PlanStep, StepType
+from ultragravity.context_shaper import SummaryChunk
+from ultragravity.executor import ExecutionState, PlanExecutor, StepExecutionRecord
+from ultragravity.planner import ExecutionPlan, Planner, PlanStep, StepType
+from ultragravity.settle import FrameSettleDetector, PageSettleDetector
 from ultragravity.state_machine import SessionPhase, SessionStateMachine
+from ultragravity.tracing import JsonlSpanExporter, Tracer, set_tracer, trace_span
 from ultragravity.memory import MemoryManager, SQLiteMemoryRepository
 from ultragravity.tools import (
     BrowserAdapter,
@@ -45,6 +67,8 @@ class UltragravityAgent:
             repository=self.memory_repo,
             retrieval_top_k=self.runtime_config.memory.retrieval_top_k,
         )
+        self.page_cache = self._build_page_cache()
+        self.vision.chunk_summary_store = self.page_cache
 
         preferred_policy_raw = (self.memory.get_preference("policy_profile", "strict") or "strict").lower().strip()
         try:
@@ -55,9 +79,49 @@ class UltragravityAgent:
         self.memory.set_preference("policy_profile", preferred_policy.value)
         self.memory.set_preference("interaction_style", self.memory.get_preference("interaction_style", "concise") or "concise")
 
-        self.browser = BrowserAgent(headless=headless)
-        self.desktop = DesktopAgent()
-        self.gateway = ActionGateway(policy_engine=PolicyEngine(preferred_policy))
+        if self.runtime_config.tracing.enabled:
+            set_tracer(Tracer(JsonlSpanExporter(self.runtime_config.tracing.log_dir)))
+
+        settle_config = self.runtime_config.settle
+        input_speed_policy = InputSpeedPolicy.from_config(self.runtime_config.input_speed)
+        self.browser = BrowserAgent(
+            headless=headless,
+            settle_detector=PageSettleDetector(
+                timeout_seconds=settle_config.timeout_seconds,
+                quiet_window_ms=settle_config.quiet_window_ms,
+                poll_interval_ms=settle_config.poll_interval_ms,
+            ),
+            element_index_cache=ElementIndexCache(
+                ttl_seconds=self.runtime_config.set_of_marks.cache_ttl_seconds,
+                max_entries=self.runtime_config.set_of_marks.cache_max_entries,
+            ),
+            input_speed_policy=input_speed_policy,
+            service=self._build_browser_service(headless),
+            auto_start_service=self.runtime_config.browser_service.auto_start,
+            request_router=self._build_request_router(),
+        )
+        self.desktop = DesktopAgent(input_speed_policy=input_speed_policy)
+        self.desktop.capture_engine = self._build_capture_engine()
+        self.desktop.max_frame_age_seconds = self.runtime_config.capture.max_frame_age_ms / 1000
+        self.desktop.settle_detector = FrameSettleDetector(
+            capture=self.desktop.capture_frame,
+            timeout_seconds=settle_config.timeout_seconds,
+            poll_interval_ms=settle_config.poll_interval_ms,
+            stable_frames=settle_config.stable_frames,
+            distance_threshold=settle_config.frame_distance_threshold,
+        )
+        audit_config = self.runtime_config.audit
+        self.audit_logger = AuditLogger(
+            log_dir=audit_config.log_dir,
+            buffered=audit_config.buffered,
+            queue_size=audit_config.queue_size,
+            batch_size=audit_config.batch_size,
+            flush_interval_seconds=audit_config.flush_interval_seconds,
+            fsync_policy=audit_config.fsync_policy,
+            max_segment_bytes=audit_config.max_segment_bytes,
+        )
+        self._apply_log_retention()
+        self.gateway = ActionGateway(policy_engine=PolicyEngine(preferred_policy), audit_logger=self.audit_logger)
         os_bridge.set_action_gateway(self.gateway)
 
         self.tool_registry = ToolRegistry()
@@ -71,7 +135,8 @@ class UltragravityAgent:
             max_entries=self.runtime_config.call_reduction.tool_cache.max_entries,
         )
         self.planner = Planner()
-        self.plan_executor = PlanExecutor()
+        self.checkpointer = ExecutionCheckpointer(self.memory)
+        self.plan_executor = PlanExecutor(checkpointer=self.checkpointer)
         self.session_state = SessionStateMachine()
         self.execution_state: ExecutionState | None = None
         self.history = []
@@ -81,6 +146,8 @@ class UltragravityAgent:
         
         # Initialize Skills
         self.skills = [
+            # Before SearchSkill: "research" also contains "search".
+            ResearchSkill(self),
             SearchSkill(self),
             NavigationSkill(self),
             ExtractionSkill(self),
@@ -89,10 +156,100 @@ class UltragravityAgent:
         ]
         self.tool_registry.register(SkillAdapter(self.skills))
 
+        self.metrics = self._build_metrics_registry()
+        self.metrics_server: MetricsServer | None = None
+        self.metrics_textfile: TextfileWriter | None = None
+        self._start_metrics_exporters()
+
+    def _apply_log_retention(self) -> None:
+        retention_config = self.runtime_config.log_retention
+        if not retention_config.enabled:
+            return
+        policy = LogRetentionPolicy(
+            compression=retention_config.compression,
+            compress_after_days=retention_config.compress_after_days,
+            retention_days=retention_config.retention_days,
+            max_total_bytes=retention_config.max_total_bytes,
+        )
+        telemetry_store = self.vision.telemetry.store
+        try:
+            apply_log_retention(self.audit_logger.log_dir, "actions-", policy)
+            apply_log_retention(telemetry_store.log_dir, "provider-", policy, can_compress=telemetry_store.is_folded)
+        except OSError as exc:
+            self.logger.warning(f"Log retention skipped: {exc}")
+
+    def _build_metrics_registry(self) -> MetricsRegistry:
+        registry = MetricsRegistry()
+        registry.register(telemetry_collector(self.vision.telemetry))
+        registry.register(budget_collector(self.vision.budget_manager, ("gemini", "mistral")))
+        registry.register(
+            cache_collector(
+                {
+                    "vision": self.vision.vision_cache,
+                    "summary": self.vision.summary_cache,
+                    "chunk_summary": self.vision.chunk_summary_cache,
+                    "tool_outcome": self.tool_outcome_cache,
+                    **({"page_content": self.page_cache} if self.page_cache is not None else {}),
+                }
+            )
+        )
+        registry.register(
+            counters_collector(
+                "call_reduction_events",
+                "Provider calls avoided or shaped by call reduction.",
+                "kind",
+                lambda: dict(self.vision.call_reduction_stats),
+            )
+        )
+        if self.browser.request_router is not None:
+            registry.register(
+                counters_collector(
+                    "browser_requests",
+                    "Browser requests routed, blocked, or served from the asset cache.",
+                    "kind",
+                    lambda: self.browser.request_router.stats.as_counters(),
+                )
+            )
+        registry.register(
+            counters_collector(
+                "gateway_decisions",
+                "Action gateway outcomes.",
+                "outcome",
+                lambda: dict(self.gateway.decision_counts),
+            )
+        )
+        return registry
+
+    def _start_metrics_exporters(self) -> None:
+        metrics_config = self.runtime_config.metrics
+        if metrics_config.http_enabled:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, host=metrics_config.host, port=metrics_config.port)
+                self.metrics_server.start()
+            except OSError as exc:
+                self.logger.warning(f"Metrics endpoint disabled: {exc}")
+                self.metrics_server = None
+        if metrics_config.textfile_path:
+            self.metrics_textfile = TextfileWriter(
+                self.metrics,
+                metrics_config.textfile_path,
+                interval_seconds=metrics_config.textfile_interval_seconds,
+            )
+            self.metrics_textfile.start()
+
+    def _stop_metrics_exporters(self) -> None:
+        """Closes the metrics port and stops the textfile writer after its final write."""
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+        if self.metrics_textfile is not None:
+            self.metrics_textfile.stop()
+            self.metrics_textfile = None
+
     def _risk_for_skill(self, skill_name: str) -> RiskLevel:
         if skill_name == "ExtractionSkill":
             return RiskLevel.R0
-        if skill_name in {"SearchSkill", "NavigationSkill"}:
+        if skill_name in {"SearchSkill", "NavigationSkill", "ResearchSkill"}:
             return RiskLevel.R1
         if skill_name == "DesktopControlSkill":
             return RiskLevel.R2
@@ -214,6 +371,130 @@ class UltragravityAgent:
             return False, {}, result.error or "Navigation failed"
         return True, {"current_url": url}, ""
 
+    @staticmethod
+    def _idle(seconds: float) -> None:
+        with trace_span("goal_loop.sleep", seconds=seconds):
+            time.sleep(seconds)
+
+    def _settle(self, max_seconds: float) -> None:
+        """Waits for the UI to settle, capped at ``max_seconds`` (the old fixed sleep)."""
+        settle_config = self.runtime_config.settle
+        if not settle_config.enabled:
+            self._idle(max_seconds)
+            return
+
+        timeout = min(max_seconds, settle_config.timeout_seconds)
+        with trace_span("goal_loop.settle", mode=self.mode, timeout_seconds=timeout) as span:
+            try:
+                if self.mode == "BROWSER" and self.browser.page:
+                    result = self.browser.wait_for_settle(timeout_seconds=timeout)
+                else:
+                    result = self.desktop.wait_for_settle(timeout_seconds=timeout)
+            except Exception as exc:
+                self.logger.warning(f"Settle detection failed, falling back to fixed wait: {exc}")
+                time.sleep(timeout)
+                return
+            span.set(settled=result.settled, reason=result.reason, elapsed_ms=result.elapsed_ms)
+
+    def _build_request_router(self) -> RequestRouter | None:
+        routing = self.runtime_config.routing
+        policy = RequestPolicy.from_preset(
+            routing.preset,
+            extra_blocked_types=routing.block_types,
+            extra_blocked_domains=routing.block_domains,
+            allowed_domains=routing.allow_domains,
+        )
+        cache = None
+        if routing.asset_cache_enabled:
+            cache = HttpAssetCache(routing.asset_cache_dir, max_bytes=routing.asset_cache_max_mb * 1_000_000)
+        if cache is None and not policy.blocked_types and not policy.blocked_domains:
+            return None
+        return RequestRouter(policy, cache)
+
+    def _build_capture_engine(self) -> CaptureEngine | None:
+        capture_config = self.runtime_config.capture
+        if not capture_config.enabled:
+            return None
+        return CaptureEngine(
+            grab=self.desktop.grab,
+            fps=capture_config.fps,
+            ring_size=capture_config.ring_size,
+            downscale=capture_config.downscale,
+            tile_size=capture_config.tile_size,
+            pixel_threshold=capture_config.pixel_threshold,
+        )
+
+    def _build_page_cache(self) -> PageContentCache | None:
+        page_cache_config = self.runtime_config.page_cache
+        if not page_cache_config.enabled:
+            return None
+        return PageContentCache(
+            db_path=page_cache_config.sqlite_path,
+            ttl_seconds=page_cache_config.ttl_seconds,
+            max_pages=page_cache_config.max_pages,
+        )
+
+    def _build_browser_service(self, headless: bool) -> BrowserService | None:
+        service_config = self.runtime_config.browser_service
+        if not service_config.enabled:
+            return None
+        return BrowserService(
+            state_path=service_config.state_path,
+            port=service_config.port,
+            profile_dir=service_config.profile_dir,
+            headless=headless or service_config.headless,
+            warm_pages=service_config.warm_pages,
+        )
+
+    def _browser_screenshot(self):
+        """Marked screenshot plus its element index; plain screenshot if marking fails."""
+        marks_config = self.runtime_config.set_of_marks
+        if marks_config.enabled:
+            try:
+                return self.browser.get_marked_screenshot(max_elements=marks_config.max_elements)
+            except Exception as exc:
+                self.logger.warning(f"Element index failed, sending unmarked screenshot: {exc}")
+        return self.browser.get_screenshot(), None
+
+    def _plan_from_accessibility_tree(
+        self,
+        instruction: str,
+        current_url: str,
+        memory_hints: list[str],
+        acted_on: str = "",
+    ) -> tuple[dict | None, str]:
+        """Text-only planning over the pruned AX tree; a ``None`` plan means take a screenshot.
+
+        Also returns the serialized tree the plan was made from. ``acted_on`` is
+        the tree the last executed action was planned from; if the page still
+        serializes the same, that action changed nothing and its cached plan
+        must not be replayed.
+        """
+        ax_config = self.runtime_config.ax_planning
+        with trace_span("goal_loop.ax_tree") as span:
+            try:
+                elements = self.browser.get_ax_elements(max_nodes=ax_config.max_nodes)
+            except Exception as exc:
+                self.logger.warning(f"Accessibility snapshot failed: {exc}")
+                return None, ""
+            span.set(elements=len(elements))
+            if not is_tree_sufficient(elements, min_interactive=ax_config.min_interactive):
+                span.set(sufficient=False)
+                return None, ""
+
+        serialized = serialize_elements(elements)
+        action_plan = self.vision.plan_from_accessibility_tree(
+            instruction,
+            serialized,
+            known_element_ids={element.element_id for element in elements if element.interactive},
+            current_url=current_url,
+            memory_hints=memory_hints,
+            state_changed=serialized != acted_on,
+        )
+        if action_plan is not None and action_plan.get("action") == "fail":
+            return None, serialized
+        return action_plan, serialized
+
     def _execute_goal_loop_step(self, step: PlanStep, state: ExecutionState) -> tuple[bool, dict[str, object], str]:
         instruction = str(step.params.get("instruction", ""))
         original_instruction = instruction
@@ -225,34 +506,50 @@ class UltragravityAgent:
 
         consecutive_failures = 0
         wait_streak = 0
+        # AX tree the last executed action was planned from; empty after screenshot plans.
+        ax_acted_on = ""
+
+        for iteration in range(max_iterations):
+            with trace_span("goal_loop.iteration", iteration=iteration + 1, mode=self.mode):
+                current_url = ""
+                if self.mode == "BROWSER" and self.browser.page:
+                    current_url = self.browser.page.url
+
+                runtime_instruction = self._rewrite_runtime_instruction(instruction, current_url)
+
+                for skill in self.skills:
+                    confidence = skill.can_handle(runtime_instruction)
+                    if confidence <= 0.8:
+                        continue
+
+                    self.logger.info(f"Skill '{skill.name}' matched with confidence {confidence}")
+                    print(colored(f"⚡ Fast Path: Executing {skill.name}...", "cyan"))
+                    skill_action = self._build_skill_action(skill.name, instruction)
+
+                    skill_cache_key = build_tool_cache_key(
+                        "skill",
+                        skill.name,
+                        {"instruction": runtime_instruction, "mode": self.mode},
+                    )
 
-        for _ in range(max_iterations):
-            current_url = ""
-            if self.mode == "BROWSER" and self.browser.page:
-                current_url = self.browser.page.url
-
-            runtime_instruction = self._rewrite_runtime_instruction(instruction, current_url)
-
-            for skill in self.skills:
-                confidence = skill.can_handle(runtime_instruction)
-                if confidence <= 0.8:
-                    continue
-
-                self.logger.info(f"Skill '{skill.name}' matched with confidence {confidence}")
-                print(colored(f"⚡ Fast Path: Executing {skill.name}...", "cyan"))
-                skill_action = self._build_skill_action(skill.name, instruction)
-
-                skill_cache_key = build_tool_cache_key(
-                    "skill",
-                    skill.name,
-                    {"instruction": runtime_instruction, "mode": self.mode},
-                )
-
-                if skill_action.risk_level == RiskLevel.R0 and self.runtime_config.call_reduction.enabled:
-                    cached_skill_result = self.tool_outcome_cache.get(skill_cache_key)
-                    if cached_skill_result is not None:
-                        self.logger.info(f"Tool cache hit for {skill.name}")
-                        result = cached_skill_result
+                    if skill_action.risk_level == RiskLevel.R0 and self.runtime_config.call_reduction.enabled:
+                        cached_skill_result = self.tool_outcome_cache.get(skill_cache_key)
+                        if cached_skill_result is not None:
+                            self.logger.info(f"Tool cache hit for {skill.name}")
+                            result = cached_skill_result
+                        else:
+                            tool_result = self.tool_orchestrator.execute(
+                                tool_name="skill",
+                                operation="execute",
+                                params={"skill": skill.name, "instruction": runtime_instruction},
+                                scope=[self.mode.lower(), skill.name],
+                                reason=f"Fast-path skill execution for {skill.name}",
+                            )
+                            if not tool_result.success:
+                                return False, {"reason": tool_result.error or "Skill failed"}, "Skill failed"
+                            result = tool_result.payload
+                            if isinstance(result, dict) and result.get("status") == "success":
+                                self.tool_outcome_cache.set(skill_cache_key, result)
                     else:
                         tool_result = self.tool_orchestrator.execute(
                             tool_name="skill",
@@ -264,134 +561,241 @@ class UltragravityAgent:
                         if not tool_result.success:
                             return False, {"reason": tool_result.error or "Skill failed"}, "Skill failed"
                         result = tool_result.payload
-                        if isinstance(result, dict) and result.get("status") == "success":
-                            self.tool_outcome_cache.set(skill_cache_key, result)
-                else:
-                    tool_result = self.tool_orchestrator.execute(
-                        tool_name="skill",
-                        operation="execute",
-                        params={"skill": skill.name, "instruction": runtime_instruction},
-                        scope=[self.mode.lower(), skill.name],
-                        reason=f"Fast-path skill execution for {skill.name}",
+
+                    if result["status"] == "success":
+                        print(colored(f"✅ Skill Completed: {result.get('message', 'Done')}", "green"))
+
+                        if "content" in result:
+                            print(colored("📄 Content Extracted. Generating Summary...", "cyan"))
+                            ranked_chunks = None
+                            if result.get("ranked_chunks"):
+                                ranked_chunks = [SummaryChunk(**chunk) for chunk in result["ranked_chunks"]]
+                            summary = self.vision.summarize_content(
+                                result["content"],
+                                instruction,
+                                ranked_chunks=ranked_chunks,
+                                total_chunks=int(result.get("total_chunks", 0)),
+                            )
+                            print(colored("\n" + "=" * 40, "green"))
+                            print(colored("REPORT / SUMMARY", "green"))
+                            print(colored("=" * 40 + "\n", "green"))
+                            print(summary)
+                            print(colored("\n" + "=" * 40, "green"))
+                            print(colored("✅ Task Completed via Extraction!", "green"))
+                            return True, {"completed_by": skill.name}, ""
+
+                        if not runtime_instruction.lower().startswith("verify"):
+                            instruction = "Verify the result matches the goal: " + runtime_instruction
+
+                        break
+
+                    print(colored(f"⚠️ Skill Failed: {result.get('reason')}", "yellow"))
+
+                print(colored(f"👀 Observing ({self.mode})...", "yellow"))
+                current_url = ""
+                if self.mode == "BROWSER" and self.browser.page:
+                    current_url = self.browser.page.url
+
+                external_state_changed = current_url != previous_url if self.mode == "BROWSER" else False
+                previous_url = current_url
+
+                print(colored("🧠 Analyzing...", "magenta"))
+                with trace_span("goal_loop.memory_retrieval"):
+                    memory_hints = self.memory.retrieve_relevant_facts(
+                        query=runtime_instruction,
+                        top_k=self.runtime_config.memory.retrieval_top_k,
                     )
-                    if not tool_result.success:
-                        return False, {"reason": tool_result.error or "Skill failed"}, "Skill failed"
-                    result = tool_result.payload
-
-                if result["status"] == "success":
-                    print(colored(f"✅ Skill Completed: {result.get('message', 'Done')}", "green"))
-
-                    if "content" in result:
-                        print(colored("📄 Content Extracted. Generating Summary...", "cyan"))
-                        summary = self.vision.summarize_content(result["content"], instruction)
-                        print(colored("\n" + "=" * 40, "green"))
-                        print(colored("REPORT / SUMMARY", "green"))
-                        print(colored("=" * 40 + "\n", "green"))
-                        print(summary)
-                        print(colored("\n" + "=" * 40, "green"))
-                        print(colored("✅ Task Completed via Extraction!", "green"))
-                        return True, {"completed_by": skill.name}, ""
-
-                    if not runtime_instruction.lower().startswith("verify"):
-                        instruction = "Verify the result matches the goal: " + runtime_instruction
-
-                    break
-
-                print(colored(f"⚠️ Skill Failed: {result.get('reason')}", "yellow"))
-
-            print(colored(f"👀 Observing ({self.mode})...", "yellow"))
-            current_url = ""
-            if self.mode == "BROWSER" and self.browser.page:
-                current_url = self.browser.page.url
-
-            if self.mode == "BROWSER":
-                screenshot_path = self.browser.get_screenshot()
-            else:
-                screenshot_path = self.desktop.get_screenshot()
-
-            external_state_changed = current_url != previous_url if self.mode == "BROWSER" else False
-            previous_url = current_url
-
-            print(colored("🧠 Analyzing...", "magenta"))
-            memory_hints = self.memory.retrieve_relevant_facts(
-                query=runtime_instruction,
-                top_k=self.runtime_config.memory.retrieval_top_k,
-            )
-            action_plan = self.vision.analyze_image(
-                screenshot_path,
-                runtime_instruction,
-                mode=self.mode,
-                current_url=current_url,
-                external_state_changed=external_state_changed,
-                memory_hints=memory_hints,
-                wait_streak=wait_streak,
-            )
-            print(colored(f"💡 Plan: {json.dumps(action_plan, indent=2)}", "green"))
-
-            if action_plan.get("action") == "done":
-                print(colored("✅ Task Completed!", "green"))
-                self.memory.remember(
-                    kind="task_success",
-                    content=f"Goal completed: {original_instruction}",
-                    metadata={"mode": self.mode, "completion_source": "vision_done"},
-                )
-                return True, {"completed_by": "vision_done"}, ""
-
-            if action_plan.get("action") == "fail":
-                consecutive_failures += 1
-                if consecutive_failures >= 3:
-                    return False, {"current_url": current_url}, "Vision failed to determine action repeatedly"
-                time.sleep(1)
-                continue
-
-            if action_plan.get("action") == "wait":
-                wait_streak += 1
-                if wait_streak >= 3:
-                    print(colored("🛠️ Wait-streak breaker activated (forcing scroll)", "cyan"))
-                    breaker_success, breaker_error = self._execute_wait_breaker(current_url)
-                    if not breaker_success:
-                        consecutive_failures += 1
-                        if consecutive_failures >= 3:
-                            return False, {"current_url": current_url}, breaker_error or "Wait breaker failed repeatedly"
-                    else:
-                        consecutive_failures = 0
-                    time.sleep(2)
+
+                action_plan = None
+                ax_elements = ""
+                if self.mode == "BROWSER" and self.browser.page and self.runtime_config.ax_planning.enabled:
+                    action_plan, ax_elements = self._plan_from_accessibility_tree(
+                        runtime_instruction, current_url, memory_hints, acted_on=ax_acted_on
+                    )
+                    if action_plan is None:
+                        ax_elements = ""
+                ax_acted_on = ""
+
+                if action_plan is None:
+                    element_index = None
+                    screenshot_path = None
+                    screenshot_frame = None
+                    with trace_span("goal_loop.screenshot") as span:
+                        if self.mode == "BROWSER":
+                            screenshot_path, element_index = self._browser_screenshot()
+                            span.set(marks=len(element_index.elements) if element_index else 0)
+                        else:
+                            self.desktop.start_capture()
+                            screenshot_frame = self.desktop.capture()
+                            span.set(dirty_regions=len(self.desktop.last_dirty_regions))
+
+                    action_plan = self.vision.analyze_image(
+                        screenshot_path,
+                        runtime_instruction,
+                        mode=self.mode,
+                        current_url=current_url,
+                        external_state_changed=external_state_changed,
+                        memory_hints=memory_hints,
+                        wait_streak=wait_streak,
+                        element_index=element_index,
+                        frame=screenshot_frame,
+                    )
+                print(colored(f"💡 Plan: {json.dumps(action_plan, indent=2)}", "green"))
+
+                if action_plan.get("action") == "done":
+                    print(colored("✅ Task Completed!", "green"))
+                    self.memory.remember(
+                        kind="task_success",
+                        content=f"Goal completed: {original_instruction}",
+                        metadata={"mode": self.mode, "completion_source": "vision_done"},
+                    )
+                    return True, {"completed_by": "vision_done"}, ""
+
+                if action_plan.get("action") == "fail":
+                    consecutive_failures += 1
+                    if consecutive_failures >= 3:
+                        return False, {"current_url": current_url}, "Vision failed to determine action repeatedly"
+                    self._idle(1)
                     continue
-                print(colored("⏳ Waiting...", "blue"))
-                time.sleep(2)
-                continue
-
-            wait_streak = 0
-
-            plan_action = self._build_plan_action(action_plan, instruction)
-            if self.mode == "BROWSER":
-                execution_result = self.tool_orchestrator.execute(
-                    tool_name="browser",
-                    operation="execute_action",
-                    params={"action_plan": action_plan},
-                    scope=plan_action.scope,
-                    reason=plan_action.reason,
-                )
-            else:
-                execution_result = self.tool_orchestrator.execute(
-                    tool_name="desktop",
-                    operation="execute_action",
-                    params={"action_plan": action_plan},
-                    scope=plan_action.scope,
-                    reason=plan_action.reason,
-                )
 
-            if not execution_result.success:
-                consecutive_failures += 1
-                if consecutive_failures >= 3:
-                    return False, {"current_url": current_url}, execution_result.error or "Action execution failed repeatedly"
-                continue
+                if action_plan.get("action") == "wait":
+                    wait_streak += 1
+                    if wait_streak >= 3:
+                        print(colored("🛠️ Wait-streak breaker activated (forcing scroll)", "cyan"))
+                        breaker_success, breaker_error = self._execute_wait_breaker(current_url)
+                        if not breaker_success:
+                            consecutive_failures += 1
+                            if consecutive_failures >= 3:
+                                return False, {"current_url": current_url}, breaker_error or "Wait breaker failed repeatedly"
+                        else:
+                            consecutive_failures = 0
+                        self._settle(2.0)
+                        continue
+                    print(colored("⏳ Waiting...", "blue"))
+                    self._settle(2.0)
+                    continue
 
-            consecutive_failures = 0
-            time.sleep(5)
+                wait_streak = 0
+
+                plan_action = self._build_plan_action(action_plan, instruction)
+                if self.mode == "BROWSER":
+                    execution_result = self.tool_orchestrator.execute(
+                        tool_name="browser",
+                        operation="execute_action",
+                        params={"action_plan": action_plan},
+                        scope=plan_action.scope,
+                        reason=plan_action.reason,
+                    )
+                else:
+                    execution_result = self.tool_orchestrator.execute(
+                        tool_name="desktop",
+                        operation="execute_action",
+                        params={"action_plan": action_plan},
+                        scope=plan_action.scope,
+                        reason=plan_action.reason,
+                    )
+
+                # Worked or not, the next AX plan is checked against the tree this action came from.
+                ax_acted_on = ax_elements
+                if not execution_result.success:
+                    consecutive_failures += 1
+                    if consecutive_failures >= 3:
+                        return False, {"current_url": current_url}, execution_result.error or "Action execution failed repeatedly"
+                    continue
+
+                consecutive_failures = 0
+                self._settle(5.0)
 
         return False, {"current_url": previous_url}, "Max iterations reached without completion"
 
+    def _step_handlers(self) -> dict:
+        return {
+            StepType.START_BROWSER: self._execute_start_browser_step,
+            StepType.NAVIGATE_URL: self._execute_navigate_step,
+            StepType.EXECUTE_GOAL_LOOP: self._execute_goal_loop_step,
+        }
+
+    def _finish_plan(self, plan: ExecutionPlan, instruction: str) -> None:
+        self.checkpointer.finish(plan, self.execution_state)
+
+        if self.execution_state.completed:
+            self.session_state.transition_to(SessionPhase.COMPLETED)
+            self.memory.remember(
+                kind="task_success",
+                content=f"Plan completed successfully for goal: {instruction}",
+                metadata={"mode": self.mode, "plan_id": plan.id},
+            )
+            print(colored("✅ Plan completed successfully.", "green"))
+            return
+
+        self.session_state.transition_to(SessionPhase.RECOVERY)
+        reason = str(self.execution_state.recovery_context.get("reason", "Unknown failure"))
+        failed_step = str(self.execution_state.recovery_context.get("last_failed_step", "unknown"))
+        self.memory.remember(
+            kind="task_failure",
+            content=f"Plan aborted for goal '{instruction}' at step '{failed_step}'",
+            metadata={"mode": self.mode, "plan_id": plan.id, "reason": reason},
+        )
+        print(colored(f"❌ Plan aborted at step '{failed_step}': {reason} (resume with: ultragravity resume {plan.id})", "red"))
+        self.session_state.transition_to(SessionPhase.ABORTED)
+
+    def resume_session(self, plan_id: str) -> bool:
+        loaded = self.checkpointer.load(plan_id)
+        if loaded is None:
+            print(colored(f"No resumable checkpoint found for plan '{plan_id}'.", "red"))
+            return False
+
+        plan, state = loaded
+        if state.completed:
+            print(colored(f"Plan '{plan_id}' already completed; nothing to resume.", "green"))
+            return True
+
+        self.mode = plan.mode
+        print(colored(f"Resuming plan [{plan.id[:8]}] in {self.mode} mode", "cyan"))
+        print(colored(self.planner.render_plan(plan), "cyan"))
+
+        # Browser start and navigation only produce process-local state, so a new
+        # process has to redo them; navigation resumes at the last known URL.
+        last_url = str(state.recovery_context.get("current_url", ""))
+        for step in plan.steps:
+            if step.step_type in {StepType.START_BROWSER, StepType.NAVIGATE_URL} and step.id in state.records:
+                state.records[step.id] = StepExecutionRecord(step_id=step.id)
+        plan = ExecutionPlan(
+            id=plan.id,
+            goal=plan.goal,
+            mode=plan.mode,
+            created_at=plan.created_at,
+            steps=[
+                PlanStep(
+                    id=step.id,
+                    title=step.title,
+                    step_type=step.step_type,
+                    risk_level=step.risk_level,
+                    checkpoint_required=step.checkpoint_required,
+                    params={**step.params, "url": last_url} if step.step_type == StepType.NAVIGATE_URL and last_url else step.params,
+                    retry_policy=step.retry_policy,
+                    depends_on=step.depends_on,
+                )
+                for step in plan.steps
+            ],
+        )
+
+        instruction = self._strip_memory_from_instruction(plan.goal)
+        try:
+            self.session_state.transition_to(SessionPhase.PLANNING)
+            self.session_state.transition_to(SessionPhase.EXECUTING)
+            with trace_span("session.resume", trace_id=plan.id, plan_id=plan.id, mode=self.mode):
+                self.execution_state = self.plan_executor.resume(plan=plan, handlers=self._step_handlers(), state=state)
+            self._finish_plan(plan, instruction)
+        except KeyboardInterrupt:
+            print("Stopping agent...")
+        finally:
+            self.browser.stop()
+            self.desktop.stop_capture()
+            self.audit_logger.flush()
+            self._stop_metrics_exporters()
+        return bool(self.execution_state and self.execution_state.completed)
+
     def start_session(self, url: str, instruction: str):
         print(colored("Starting Ultragravity Agent...", "cyan"))
 
@@ -425,62 +829,22 @@ class UltragravityAgent:
                 retry_backoff_seconds=self.runtime_config.planner.retry_backoff_seconds,
             )
             print(colored(self.planner.render_plan(plan), "cyan"))
-
-            handlers = {
-                StepType.START_BROWSER: self._execute_start_browser_step,
-                StepType.NAVIGATE_URL: self._execute_navigate_step,
-                StepType.EXECUTE_GOAL_LOOP: self._execute_goal_loop_step,
-            }
+            print(colored(f"Plan ID: {plan.id}", "cyan"))
 
             self.session_state.transition_to(SessionPhase.EXECUTING)
-            self.execution_state = self.plan_executor.execute(plan=plan, handlers=handlers, state=self.execution_state)
-
-            if self.execution_state is not None:
-                serializable_state = {
-                    "plan_id": self.execution_state.plan_id,
-                    "current_step_index": self.execution_state.current_step_index,
-                    "aborted": self.execution_state.aborted,
-                    "completed": self.execution_state.completed,
-                    "recovery_context": self.execution_state.recovery_context,
-                    "records": {
-                        key: {
-                            "status": value.status,
-                            "attempts": value.attempts,
-                            "error": value.error,
-                            "started_at": value.started_at,
-                            "finished_at": value.finished_at,
-                        }
-                        for key, value in self.execution_state.records.items()
-                    },
-                }
-                self.memory.save_execution_state(plan.id, serializable_state)
-
-            if self.execution_state.completed:
-                self.session_state.transition_to(SessionPhase.COMPLETED)
-                self.memory.remember(
-                    kind="task_success",
-                    content=f"Plan completed successfully for goal: {instruction}",
-                    metadata={"mode": self.mode, "plan_id": plan.id},
-                )
-                print(colored("✅ Plan completed successfully.", "green"))
-                return
-
-            self.session_state.transition_to(SessionPhase.RECOVERY)
-            reason = str(self.execution_state.recovery_context.get("reason", "Unknown failure"))
-            failed_step = str(self.execution_state.recovery_context.get("last_failed_step", "unknown"))
-            self.memory.remember(
-                kind="task_failure",
-                content=f"Plan aborted for goal '{instruction}' at step '{failed_step}'",
-                metadata={"mode": self.mode, "plan_id": plan.id, "reason": reason},
-            )
-            print(colored(f"❌ Plan aborted at step '{failed_step}': {reason}", "red"))
-            self.session_state.transition_to(SessionPhase.ABORTED)
-            return
+            self.execution_state = ExecutionState(plan_id=plan.id)
+            self.checkpointer.begin(plan, self.execution_state)
+            with trace_span("session.execute", trace_id=plan.id, plan_id=plan.id, mode=self.mode):
+                self.execution_state = self.plan_executor.execute(plan=plan, handlers=self._step_handlers(), state=self.execution_state)
+            self._finish_plan(plan, instruction)
                 
         except KeyboardInterrupt:
             print("Stopping agent...")
         finally:
             self.browser.stop()
+            self.desktop.stop_capture()
+            self.audit_logger.flush()
+            self._stop_metrics_exporters()
 
 if __name__ == "__main__":
     # Test stub
@@ -1,17 +1,35 @@
 
 import logging
+import threading
 import time
 import mss
 import pyautogui
 import os
-from PIL import Image
 from agent.humanizer import generate_human_path, random_sleep, typing_delay
+from ultragravity.capture import CaptureEngine, CapturedFrame, Frame, Region
+from ultragravity.input_speed import InputSpeed, InputSpeedPolicy
+from ultragravity.settle import FrameSettleDetector, SettleResult
 
 logger = logging.getLogger("DesktopAgent")
 
 class DesktopAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        settle_detector: FrameSettleDetector | None = None,
+        input_speed_policy: InputSpeedPolicy | None = None,
+        capture_engine: CaptureEngine | None = None,
+    ):
         self.sct = mss.mss()
+        # mss handles are per thread on Windows and X11; the capture thread gets its own.
+        self._local = threading.local()
+        self._local.sct = self.sct
+        self.capture_engine = capture_engine
+        self.max_frame_age_seconds = 0.5
+        self._last_frame_sequence = 0
+        self.last_dirty_regions: list[Region] = []
+        self._region: Region | None = None
+        self.input_speed_policy = input_speed_policy or InputSpeedPolicy()
+        self.settle_detector = settle_detector or FrameSettleDetector(capture=self.capture_frame)
         # PyAutoGUI safety settings
         pyautogui.FAILSAFE = True # Move mouse to corner to abort
         pyautogui.PAUSE = 0.1
@@ -29,18 +47,100 @@ class DesktopAgent:
         except Exception as e:
             logger.warning(f"Could not determine screen scaling: {e}")
         
+    def _thread_sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = mss.mss()
+        return sct
+
+    def grab(self, region: Region | None = None) -> Frame:
+        """Grabs ``region`` (physical pixels), or the whole primary monitor, as a view of mss's BGRA buffer."""
+        sct = self._thread_sct()
+        monitor = region.as_monitor() if region is not None else sct.monitors[1]
+        sct_img = sct.grab(monitor)
+        return Frame.from_bgra(sct_img.raw, sct_img.width, sct_img.height)
+
+    @property
+    def region(self) -> Region | None:
+        return self.capture_engine.region if self.capture_engine is not None else self._region
+
+    def focus_region(self, region: Region | None) -> None:
+        """Restricts screenshots to ``region`` (e.g. one app window); ``None`` captures the monitor again."""
+        self._region = region
+        if self.capture_engine is not None:
+            self.capture_engine.set_region(region)
+
+    def focus_window(self, title: str) -> Region | None:
+        """Captures only the first window whose title contains ``title``, where the platform can list windows."""
+        find_windows = getattr(pyautogui, "getWindowsWithTitle", None)
+        if find_windows is None:
+            logger.warning("Window lookup is not supported on this platform; capturing the full monitor.")
+            return None
+        windows = [window for window in find_windows(title) if window.width > 0 and window.height > 0]
+        if not windows:
+            return None
+        window = windows[0]
+        # Window geometry is in logical points; mss grabs physical pixels.
+        monitor = self.sct.monitors[1]
+        scale_x = monitor["width"] / self.screen_width
+        scale_y = monitor["height"] / self.screen_height
+        region = Region(
+            left=monitor["left"] + int(window.left * scale_x),
+            top=monitor["top"] + int(window.top * scale_y),
+            width=int(window.width * scale_x),
+            height=int(window.height * scale_y),
+        )
+        self.focus_region(region)
+        return region
+
+    def start_capture(self) -> None:
+        if self.capture_engine is not None:
+            self.capture_engine.start()
+
+    def stop_capture(self) -> None:
+        if self.capture_engine is not None:
+            self.capture_engine.stop()
+
+    def take_frame(self) -> CapturedFrame | None:
+        """The capture thread's latest frame and what changed since the previous call, if it is fresh."""
+        if self.capture_engine is None or not self.capture_engine.running:
+            return None
+        frame = self.capture_engine.latest(max_age_seconds=self.max_frame_age_seconds)
+        if frame is None:
+            return None
+        self.last_dirty_regions = self.capture_engine.dirty_since(self._last_frame_sequence)
+        self._last_frame_sequence = frame.sequence
+        return frame
+
+    def capture(self) -> Frame:
+        """The desktop (or the focused region) in memory, reusing the capture thread's frame when fresh."""
+        captured = self.take_frame()
+        return captured.frame if captured is not None else self.grab(self.region)
+
     def get_screenshot(self, path: str = "desktop_screenshot.png") -> str:
-        """Captures the full desktop."""
-        monitor = self.sct.monitors[1] # Primary monitor
-        sct_img = self.sct.grab(monitor)
-        
-        # Convert to PIL Image and save
-        img = Image.frombytes("RGB", sct_img.size, sct_img.bgra, "raw", "BGRX")
-        img.save(path)
-        return path
+        """Captures and writes a PNG; the goal loop uses ``capture`` and encodes only on upload."""
+        return self.capture().save(path)
+
+    def capture_frame(self) -> Frame:
+        """Grabs the primary monitor (or the focused region) without writing it to disk."""
+        return self.grab(self.region)
+
+    def wait_for_settle(self, timeout_seconds: float | None = None) -> SettleResult:
+        """Returns once consecutive frames stop changing."""
+        result = self.settle_detector.wait(timeout_seconds=timeout_seconds)
+        logger.debug(f"Desktop settle: {result.reason} after {result.elapsed_ms}ms")
+        return result
 
     def human_click(self, x: int, y: int):
         """Simulate human mouse movement and click on Desktop."""
+        speed = self.input_speed_policy.resolve("desktop")
+        if speed is not InputSpeed.HUMAN:
+            if speed is InputSpeed.FAST:
+                pyautogui.moveTo(x, y, duration=0.05, _pause=False)
+            pyautogui.click(x, y)
+            logger.info(f"Desktop Clicked at ({x}, {y}) [{speed.value}]")
+            return
+
         start_x, start_y = pyautogui.position()
         
         path = generate_human_path((start_x, start_y), (x, y))
@@ -59,6 +159,13 @@ class DesktopAgent:
     def human_type(self, text: str):
         """Simulate human typing on Desktop."""
         if not text: return
+
+        speed = self.input_speed_policy.resolve("desktop")
+        if speed is not InputSpeed.HUMAN:
+            # One call for the whole string; pyautogui presses Enter for newlines.
+            pyautogui.write(text, interval=0.0 if speed is InputSpeed.INSTANT else 0.01)
+            logger.info(f"Desktop Typed text: {text} [{speed.value}]")
+            return
         
         for char in text:
             pyautogui.write(char) # PyAutoGUI has its own delay, but we want ours
@@ -66,6 +173,16 @@ class DesktopAgent:
             
         logger.info(f"Desktop Typed text: {text}")
 
+    def _to_screen_point(self, coords) -> tuple[int, int]:
+        """Screenshot pixels (relative to the focused region, if any) to PyAutoGUI's logical points."""
+        monitor = self.sct.monitors[1]
+        scale_x = self.screen_width / monitor["width"]
+        scale_y = self.screen_height / monitor["height"]
+        region = self.region
+        offset_x = region.left - monitor["left"] if region is not None else 0
+        offset_y = region.top - monitor["top"] if region is not None else 0
+        return int((coords[0] + offset_x) * scale_x), int((coords[1] + offset_y) * scale_y)
+
     def execute_action(self, action_plan: dict):
         """Executes the action on the Desktop."""
         action = action_plan.get("action")
@@ -83,12 +200,7 @@ class DesktopAgent:
                 # Wait, better fix:
                 # If screenshot is 2560x1600 but pyautogui.size() is 1280x800, we divide by 2.
                 
-                scale_x = self.screen_width / self.sct.monitors[1]["width"]
-                scale_y = self.screen_height / self.sct.monitors[1]["height"]
-                
-                true_x = int(coords[0] * scale_x)
-                true_y = int(coords[1] * scale_y)
-                
+                true_x, true_y = self._to_screen_point(coords)
                 self.human_click(true_x, true_y)
             else:
                 logger.warning("Desktop Click action requested but no coordinates provided.")
@@ -96,11 +208,9 @@ class DesktopAgent:
         elif action == "type":
             text = action_plan.get("value", "")
             if coords:
-                 scale_x = self.screen_width / self.sct.monitors[1]["width"]
-                 scale_y = self.screen_height / self.sct.monitors[1]["height"]
-                 self.human_click(int(coords[0]*scale_x), int(coords[1]*scale_y))
+                 self.human_click(*self._to_screen_point(coords))
                  
             self.human_type(text)
             
         elif action == "wait":
-            random_sleep(2, 4)
+            self.wait_for_settle()
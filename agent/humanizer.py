@@ -1,67 +1,90 @@
 
-import time
-import random
+import functools
 import math
+import random
+import time
+
 import numpy as np
 from typing import Tuple, List
 
+TEMPLATE_COUNT = 16
+MIN_PATH_POINTS = 12
+MAX_PATH_POINTS = 80
+CONTROL_DEVIATION = 0.2
+# Per-move offset of the two inner control points, on top of the template blend.
+CONTROL_JITTER = 0.05
+
+_rng = np.random.default_rng()
+
+
+@functools.lru_cache(maxsize=32)
+def _bernstein_weights(num_points: int) -> np.ndarray:
+    """Cubic Bernstein weights over eased time, shape ``(num_points, 4)``.
+
+    The ease-in-out profile gives realistic velocity (slow start/end, fast middle).
+    """
+    t_linear = np.linspace(0.0, 1.0, num_points)
+    t = np.where(t_linear < 0.5, 2 * t_linear**2, 1 - (-2 * t_linear + 2) ** 2 / 2)
+    u = 1 - t
+    weights = np.stack([u**3, 3 * u**2 * t, 3 * u * t**2, t**3], axis=1)
+    weights.setflags(write=False)
+    return weights
+
+
 def bezier_curve(start: Tuple[int, int], end: Tuple[int, int], control_points: List[Tuple[int, int]], num_points: int = 100) -> List[Tuple[int, int]]:
-    """Calculates points along a Bezier curve."""
-    trajectory = []
-    n = len(control_points) + 1 # Degree of curve + 1
-    # Simple Quadratic or Cubic logic manually or general formula
-    # For mouse, cubic is usually good (start, control1, control2, end)
-    
-    # Let's assume start and end are part of the points passed to general algo if we want, 
-    # but here we'll do a Cubic Bezier explicit for simplicity
-    
-    p0 = start
-    p1 = control_points[0]
-    p2 = control_points[1]
-    p3 = end
-    
-    p3 = end
-    
-    # Easing function for realistic movement (slow start/end, fast middle)
-    def ease_in_out_quad(x):
-        return 2 * x * x if x < 0.5 else 1 - pow(-2 * x + 2, 2) / 2
+    """Calculates points along a cubic Bezier curve in one matrix product."""
+    points = np.array([start, control_points[0], control_points[1], end], dtype=float)
+    trajectory = _bernstein_weights(max(2, num_points)) @ points
+    return [tuple(point) for point in trajectory.tolist()]
+
+
+def path_point_count(distance: float) -> int:
+    """Point count grows with the log of distance, like movement time under Fitts' law."""
+    count = MIN_PATH_POINTS + 8 * math.log2(1 + distance / 25)
+    # Quantized so the template cache holds a handful of sizes.
+    return int(min(MAX_PATH_POINTS, max(MIN_PATH_POINTS, round(count / 4) * 4)))
+
+
+@functools.lru_cache(maxsize=16)
+def _path_templates(num_points: int) -> np.ndarray:
+    """Random normalized paths from (0, 0) to (1, 0), shape ``(TEMPLATE_COUNT, num_points, 2)``."""
+    rng = np.random.default_rng()
+    controls = np.empty((TEMPLATE_COUNT, 4, 2))
+    controls[:, 0] = (0.0, 0.0)
+    controls[:, 3] = (1.0, 0.0)
+    controls[:, 1] = (0.33, 0.0)
+    controls[:, 2] = (0.66, 0.0)
+    controls[:, 1:3] += rng.uniform(-CONTROL_DEVIATION, CONTROL_DEVIATION, size=(TEMPLATE_COUNT, 2, 2))
+    templates = np.einsum("pk,tkd->tpd", _bernstein_weights(num_points), controls)
+    templates.setflags(write=False)
+    return templates
+
+
+def human_path_array(start: Tuple[int, int], end: Tuple[int, int]) -> np.ndarray:
+    """A blend of two cached templates, jittered, then rotated and scaled onto ``start -> end``.
+
+    The cached templates only save the Bernstein products; every move gets its
+    own shape from a random blend weight plus control-point jitter, which stays
+    cheap because a Bezier curve is linear in its control points.
+    """
+    origin = np.asarray(start, dtype=float)
+    delta = np.asarray(end, dtype=float) - origin
+    num_points = path_point_count(float(np.hypot(*delta)))
+    templates = _path_templates(num_points)
+    first, second = random.sample(range(len(templates)), 2)
+    # Written as an offset from one template so both endpoints stay exact.
+    template = templates[second] + random.random() * (templates[first] - templates[second])
+    jitter = _rng.uniform(-CONTROL_JITTER, CONTROL_JITTER, size=(2, 2))
+    template = template + _bernstein_weights(num_points)[:, 1:3] @ jitter
+    sign = random.choice((-1.0, 1.0))
+    # Rows map the template's x axis onto delta and its y axis onto the (mirrored) normal.
+    basis = np.array([delta, sign * np.array([-delta[1], delta[0]])])
+    return origin + template @ basis
 
-    for i in range(num_points):
-        t_linear = i / (num_points - 1)
-        t = ease_in_out_quad(t_linear)
-        
-        x = (1-t)**3 * p0[0] + 3*(1-t)**2 * t * p1[0] + 3*(1-t) * t**2 * p2[0] + t**3 * p3[0]
-        y = (1-t)**3 * p0[1] + 3*(1-t)**2 * t * p1[1] + 3*(1-t) * t**2 * p2[1] + t**3 * p3[1]
-        trajectory.append((x, y))
-        
-    return trajectory
 
 def generate_human_path(start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
     """Generates a list of coordinates representing a human-like mouse path."""
-    dist = math.hypot(end[0] - start[0], end[1] - start[1])
-    
-    # Random control points
-    # Control points should be somewhat along the path but deviated
-    # P1 is closer to start, P2 is closer to end
-    
-    dev_x = dist * 0.2
-    dev_y = dist * 0.2
-    
-    ctrl1 = (
-        start[0] + (end[0] - start[0]) * 0.33 + random.uniform(-dev_x, dev_x),
-        start[1] + (end[1] - start[1]) * 0.33 + random.uniform(-dev_y, dev_y)
-    )
-    
-    ctrl2 = (
-        start[0] + (end[0] - start[0]) * 0.66 + random.uniform(-dev_x, dev_x),
-        start[1] + (end[1] - start[1]) * 0.66 + random.uniform(-dev_y, dev_y)
-    )
-    
-    # Calculate number of steps based on distance/speed
-    # Speed isn't constant in human movement (Fitt's Law), but linear for now is okay with ease-in/out in timing
-    steps = max(20, int(dist / 5)) 
-    
-    return bezier_curve(start, end, [ctrl1, ctrl2], steps)
+    return [tuple(point) for point in human_path_array(start, end).tolist()]
 
 def random_sleep(min_seconds=0.1, max_seconds=0.5):
     """Sleeps for a random duration."""
@@ -3,7 +3,7 @@ import json
 import os
 import time
 import warnings
-from typing import Any
+from typing import Any, Callable
 
 import PIL
 import google.generativeai as genai
@@ -14,14 +14,21 @@ from ultragravity.call_reduction import (
     DeterministicRouter,
     StateChangeDetector,
     TTLCache,
+    build_marked_vision_cache_key,
     build_summary_cache_key,
     build_vision_cache_key,
+    normalize_instruction,
 )
+from ultragravity.capture import Frame, Region
 from ultragravity.config import AppRuntimeConfig, load_runtime_config
-from ultragravity.context_shaper import ContextShaper
+from ultragravity.context_shaper import ContextShaper, SummaryChunk, plan_tree_reduce
+from ultragravity.element_index import ElementIndex
+from ultragravity.page_cache import PageContentCache, chunk_hash
+from ultragravity.perception import LocalPerception, PerceptionResult, perception_from_plan, resolve_perception
 from ultragravity.prompt_library import PromptLibrary
 from ultragravity.scheduler import ProviderCallRequest, ProviderScheduler
 from ultragravity.telemetry import ProviderTelemetry
+from ultragravity.tracing import parallel_map, trace_span, traced
 
 # Mistral imports
 try:
@@ -84,6 +91,19 @@ class VisionAgent:
             ttl_seconds=self.call_reduction_config.summary_cache.ttl_seconds,
             max_entries=self.call_reduction_config.summary_cache.max_entries,
         )
+        # Map results by chunk hash: in memory for this process, and persistently
+        # (see ``PageContentCache``) when the agent core sets a store.
+        self.chunk_summary_cache = TTLCache(
+            ttl_seconds=self.call_reduction_config.summary_cache.ttl_seconds,
+            max_entries=self.call_reduction_config.summary_cache.max_entries * 8,
+        )
+        self.chunk_summary_store: PageContentCache | None = None
+        self.perception_config = self.runtime_config.perception
+        self.perception = LocalPerception(
+            template_dir=self.perception_config.template_dir,
+            ocr_language=self.perception_config.ocr_language,
+            match_downscale=self.perception_config.match_downscale,
+        )
         self.last_action: str | None = None
         self.call_reduction_stats = {
             "vision_cache_hits": 0,
@@ -91,6 +111,12 @@ class VisionAgent:
             "deterministic_shortcuts": 0,
             "state_unchanged_shortcuts": 0,
             "hierarchical_summary_chunks": 0,
+            "ax_text_plans": 0,
+            "marked_element_plans": 0,
+            "chunk_summary_cache_hits": 0,
+            "summary_reduce_calls": 0,
+            "local_perception_hits": 0,
+            "perception_escalations": 0,
         }
         
         # Initialize Gemini
@@ -119,10 +145,13 @@ class VisionAgent:
         return False
 
     @staticmethod
-    def _estimate_tokens(prompt: str, image_path: str | None = None) -> int:
+    def _estimate_tokens(prompt: str, image_path: str | None = None, frame: Frame | None = None) -> int:
         prompt_tokens = max(50, len(prompt) // 4)
         image_tokens = 0
-        if image_path and os.path.exists(image_path):
+        if frame is not None:
+            # No encoded size before upload; a desktop PNG runs about three pixels per byte.
+            image_tokens = max(200, int(frame.width * frame.height / 1000))
+        elif image_path and os.path.exists(image_path):
             image_bytes = os.path.getsize(image_path)
             image_tokens = max(200, int(image_bytes / 350))
         return prompt_tokens + image_tokens
@@ -241,6 +270,8 @@ class VisionAgent:
         if action in {"wait", "done", "fail", "scroll"}:
             coords = []
 
+        element_id = str(target.get("element_id", "") or "")[:32] if action in {"click", "type"} else ""
+
         value = candidate.get("value", "")
         value_text = str(value)[:500]
         reasoning = str(candidate.get("reasoning", ""))[:240]
@@ -252,35 +283,134 @@ class VisionAgent:
             "target_element": {
                 "description": description,
                 "coordinates": coords,
+                **({"element_id": element_id} if element_id else {}),
             },
             "value": value_text,
             "reasoning": reasoning,
         }
 
+    def _resolve_marks(self, plan: dict[str, Any], element_index: ElementIndex | None) -> dict[str, Any]:
+        """Canonicalizes mark ids to ``m<n>``; drops ids the index does not contain."""
+        target = plan["target_element"]
+        if element_index is None or not target.get("element_id"):
+            return plan
+        element = element_index.get(target["element_id"])
+        if element is None:
+            target["element_id"] = ""
+            return plan
+        target["element_id"] = element.element_id
+        if not target.get("description"):
+            target["description"] = f"{element.role} {element.text}".strip()
+        self.call_reduction_stats["marked_element_plans"] += 1
+        return plan
+
     def _encode_image(self, image_path: str) -> str:
         with open(image_path, "rb") as image_file:
             return base64.b64encode(image_file.read()).decode('utf-8')
 
+    def _request_vision_plan(
+        self,
+        prompt_text: str,
+        image_path: str | None,
+        frame: Frame | None,
+        operation: str,
+    ) -> tuple[dict[str, Any] | None, list[str]]:
+        """One screenshot + prompt through the provider chain; the normalized plan, or ``None`` and the errors."""
+        estimated_tokens = self._estimate_tokens(prompt_text, image_path, frame)
+        errors: list[str] = []
+
+        if self._provider_enabled("gemini"):
+            img = frame.to_image() if frame is not None else PIL.Image.open(image_path)
+            gemini_result = self._schedule_call(
+                provider="gemini",
+                model=self.model_name,
+                operation=operation,
+                estimated_tokens=estimated_tokens,
+                call=lambda: self.model.generate_content(
+                    [prompt_text, img],
+                    generation_config={
+                        "temperature": 0.1,
+                        "max_output_tokens": self.prompt_config.max_output_tokens_action,
+                    },
+                ),
+                token_extractor=self._extract_gemini_tokens,
+            )
+            if gemini_result.success and gemini_result.result is not None:
+                return self._normalize_action_plan(self._parse_json(gemini_result.result.text)), errors
+            errors.append(f"Gemini: {gemini_result.error}")
+
+        if self._provider_enabled("mistral"):
+            if frame is not None:
+                base64_img = base64.b64encode(frame.encode("JPEG")).decode("utf-8")
+            else:
+                base64_img = self._encode_image(image_path)
+            messages = [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": prompt_text},
+                        {"type": "image_url", "image_url": f"data:image/jpeg;base64,{base64_img}"}
+                    ]
+                }
+            ]
+            mistral_result = self._schedule_call(
+                provider="mistral",
+                model=self.pixtral_model,
+                operation=operation,
+                estimated_tokens=estimated_tokens,
+                call=lambda: self.mistral_client.chat.complete(
+                    model=self.pixtral_model,
+                    messages=messages,
+                    response_format={"type": "json_object"},
+                    max_tokens=self.prompt_config.max_output_tokens_action,
+                    temperature=0.1,
+                ),
+                token_extractor=self._extract_mistral_tokens,
+            )
+            if mistral_result.success and mistral_result.result is not None and mistral_result.result.choices:
+                return self._normalize_action_plan(self._parse_json(mistral_result.result.choices[0].message.content)), errors
+            errors.append(f"Mistral: {mistral_result.error}")
+
+        return None, errors
+
+    @traced("vision.analyze_image")
     def analyze_image(
         self,
-        image_path: str,
+        image_path: str | None,
         instruction: str,
         mode: str = "BROWSER",
         current_url: str = "",
         external_state_changed: bool = False,
         memory_hints: list[str] | None = None,
         wait_streak: int = 0,
+        element_index: ElementIndex | None = None,
+        frame: Frame | None = None,
     ) -> dict[str, Any]:
-        """Analyze screenshot and return a strict action plan."""
-        if not os.path.exists(image_path):
+        """Analyze screenshot and return a strict action plan.
+
+        With ``element_index`` the screenshot is expected to carry its numbered
+        marks; the model answers with a mark id and the plan is cached by DOM hash and screenshot hash.
+        A desktop ``frame`` replaces ``image_path``; it is hashed in memory and
+        encoded only if a provider call is actually made.
+        """
+        if frame is None and not (image_path and os.path.exists(image_path)):
             return {"action": "fail", "reasoning": f"Screenshot not found at {image_path}"}
 
-        snapshot = self.state_detector.inspect(
-            image_path=image_path,
-            mode=mode,
-            url=current_url,
-            external_signal_changed=external_state_changed,
-        )
+        with trace_span("vision.state_hash"):
+            if frame is not None:
+                snapshot = self.state_detector.inspect_frame(
+                    frame,
+                    mode=mode,
+                    url=current_url,
+                    external_signal_changed=external_state_changed,
+                )
+            else:
+                snapshot = self.state_detector.inspect(
+                    image_path=image_path,
+                    mode=mode,
+                    url=current_url,
+                    external_signal_changed=external_state_changed,
+                )
 
         delta_context = self.context_shaper.build_delta_context(
             state_changed=snapshot.changed,
@@ -291,11 +421,20 @@ class VisionAgent:
             memory_hints=memory_hints,
         )
 
-        prompt_text = self.prompts.build_action_prompt(
-            goal=instruction,
-            mode=mode,
-            delta_context=delta_context,
-        )
+        if element_index is not None and element_index.elements:
+            prompt_text = self.prompts.build_marked_action_prompt(
+                goal=instruction,
+                mode=mode,
+                delta_context=delta_context,
+                legend=element_index.legend(),
+            )
+        else:
+            element_index = None
+            prompt_text = self.prompts.build_action_prompt(
+                goal=instruction,
+                mode=mode,
+                delta_context=delta_context,
+            )
 
         allow_wait_shortcuts = wait_streak < 2
 
@@ -315,7 +454,12 @@ class VisionAgent:
                 self.last_action = normalized.get("action")
                 return normalized
 
-        cache_key = build_vision_cache_key(instruction, snapshot)
+        if element_index is not None:
+            cache_key = build_marked_vision_cache_key(
+                instruction, mode, current_url, element_index.dom_hash, snapshot.image_hash
+            )
+        else:
+            cache_key = build_vision_cache_key(instruction, snapshot)
         if self.call_reduction_config.enabled:
             cached_action_plan = self.vision_cache.get(cache_key)
             if cached_action_plan is not None:
@@ -325,72 +469,166 @@ class VisionAgent:
                     self.last_action = cached_action_plan.get("action")
                     return cached_action_plan
 
-        estimated_tokens = self._estimate_tokens(prompt_text, image_path)
-        errors: list[str] = []
-
-        if self._provider_enabled("gemini"):
-            img = PIL.Image.open(image_path)
-            gemini_result = self._schedule_call(
-                provider="gemini",
-                model=self.model_name,
-                operation="analyze_image",
-                estimated_tokens=estimated_tokens,
-                call=lambda: self.model.generate_content(
-                    [prompt_text, img],
-                    generation_config={
-                        "temperature": 0.1,
-                        "max_output_tokens": self.prompt_config.max_output_tokens_action,
-                    },
-                ),
-                token_extractor=self._extract_gemini_tokens,
-            )
-            if gemini_result.success and gemini_result.result is not None:
-                parsed = self._normalize_action_plan(self._parse_json(gemini_result.result.text))
-                self.last_action = parsed.get("action")
-                if self.call_reduction_config.enabled:
-                    self.vision_cache.set(cache_key, parsed)
-                return parsed
-            errors.append(f"Gemini: {gemini_result.error}")
-
-        if self._provider_enabled("mistral"):
-            base64_img = self._encode_image(image_path)
-            messages = [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt_text},
-                        {"type": "image_url", "image_url": f"data:image/jpeg;base64,{base64_img}"}
-                    ]
-                }
-            ]
-            mistral_result = self._schedule_call(
-                provider="mistral",
-                model=self.pixtral_model,
-                operation="analyze_image",
-                estimated_tokens=estimated_tokens,
-                call=lambda: self.mistral_client.chat.complete(
-                    model=self.pixtral_model,
-                    messages=messages,
-                    response_format={"type": "json_object"},
-                    max_tokens=self.prompt_config.max_output_tokens_action,
-                    temperature=0.1,
-                ),
-                token_extractor=self._extract_mistral_tokens,
-            )
-            if mistral_result.success and mistral_result.result is not None and mistral_result.result.choices:
-                parsed = self._normalize_action_plan(self._parse_json(mistral_result.result.choices[0].message.content))
-                self.last_action = parsed.get("action")
-                if self.call_reduction_config.enabled:
-                    self.vision_cache.set(cache_key, parsed)
-                return parsed
-            errors.append(f"Mistral: {mistral_result.error}")
+        parsed, errors = self._request_vision_plan(prompt_text, image_path, frame, operation="analyze_image")
+        if parsed is not None:
+            parsed = self._resolve_marks(parsed, element_index)
+            self.last_action = parsed.get("action")
+            if self.call_reduction_config.enabled:
+                self.vision_cache.set(cache_key, parsed)
+            return parsed
 
         failed_response = {"action": "fail", "reasoning": "All vision providers exhausted", "errors": errors}
         self.last_action = "fail"
         return failed_response
 
-    def summarize_content(self, content: str, instruction: str) -> str:
-        """Hierarchical summarization with chunk ranking and compact prompts."""
+    def verify_text(
+        self,
+        frame: Frame,
+        expected: str,
+        region: Region | None = None,
+        mode: str = "DESKTOP",
+    ) -> PerceptionResult:
+        """Is ``expected`` shown (inside ``region``)? OCR first, the vision model only when OCR is unsure."""
+        local = self.perception.find_text(frame, expected, region) if self.perception_config.enabled else None
+        return self._settle_perception(local, frame, f'the text "{expected}"', region, mode, locate=False)
+
+    def locate_text(
+        self,
+        frame: Frame,
+        text: str,
+        region: Region | None = None,
+        mode: str = "DESKTOP",
+    ) -> PerceptionResult:
+        """Where is ``text``? The result's ``center`` is in frame pixels."""
+        local = self.perception.find_text(frame, text, region) if self.perception_config.enabled else None
+        return self._settle_perception(local, frame, f'the text "{text}"', region, mode, locate=True)
+
+    def locate_template(
+        self,
+        frame: Frame,
+        template: str,
+        description: str,
+        region: Region | None = None,
+        mode: str = "DESKTOP",
+    ) -> PerceptionResult:
+        """Where is the button/icon saved as ``template``? ``description`` is what the vision model is asked for."""
+        local = self.perception.locate_template(frame, template, region) if self.perception_config.enabled else None
+        return self._settle_perception(local, frame, description, region, mode, locate=True)
+
+    def _settle_perception(
+        self,
+        local: PerceptionResult | None,
+        frame: Frame,
+        description: str,
+        region: Region | None,
+        mode: str,
+        locate: bool,
+    ) -> PerceptionResult:
+        result = resolve_perception(
+            local,
+            min_confidence=self.perception_config.min_confidence,
+            ask_vision=(lambda: self._ask_vision_perception(frame, description, region, mode, locate))
+            if self.perception_config.escalate
+            else None,
+        )
+        if result.source == "vision":
+            self.call_reduction_stats["perception_escalations"] += 1
+        elif result.found:
+            self.call_reduction_stats["local_perception_hits"] += 1
+        return result
+
+    @traced("vision.perception_escalation")
+    def _ask_vision_perception(
+        self,
+        frame: Frame,
+        description: str,
+        region: Region | None,
+        mode: str,
+        locate: bool,
+    ) -> PerceptionResult:
+        """Asks the vision model directly: no state detector, router, action cache or ``last_action`` update,
+        so a perception query leaves the goal loop's view of the screen untouched."""
+        view = frame.crop(region) if region is not None else frame
+        prompt_text = self.prompts.build_action_prompt(
+            goal=self.prompts.build_perception_goal(description, locate=locate),
+            mode=mode,
+            delta_context="perception query",
+        )
+        plan, _ = self._request_vision_plan(prompt_text, None, view, operation="perception")
+        return perception_from_plan(plan, description, locate=locate, region=region)
+
+    @traced("vision.plan_from_accessibility_tree")
+    def plan_from_accessibility_tree(
+        self,
+        instruction: str,
+        elements: str,
+        known_element_ids: set[str],
+        current_url: str = "",
+        memory_hints: list[str] | None = None,
+        state_changed: bool = True,
+    ) -> dict[str, Any] | None:
+        """Plans the next action from serialized AX elements with a text-only call.
+
+        Returns ``None`` when the screenshot path should be used instead: the model
+        asked for a screenshot, referenced an unknown element id, or every text
+        provider failed. ``state_changed=False`` means the last action left the
+        tree as it was, so the cached plan for it is skipped and a fresh one asked for.
+        """
+        delta_context = self.context_shaper.build_delta_context(
+            state_changed=state_changed,
+            changed_by_url=False,
+            changed_by_image=False,
+            last_action=self.last_action,
+            current_url=current_url,
+            memory_hints=memory_hints,
+        )
+        prompt_text = self.prompts.build_ax_action_prompt(goal=instruction, elements=elements, delta_context=delta_context)
+
+        cache_key = build_summary_cache_key(elements, f"ax:{current_url}:{instruction}")
+        if self.call_reduction_config.enabled and state_changed:
+            cached_action_plan = self.vision_cache.get(cache_key)
+            if cached_action_plan is not None and cached_action_plan.get("action") != "wait":
+                self.call_reduction_stats["vision_cache_hits"] += 1
+                self.last_action = cached_action_plan.get("action")
+                return cached_action_plan
+
+        response_text, _ = self._generate_text_with_fallback(
+            operation="plan_ax_action",
+            prompt=prompt_text,
+            max_output_tokens=self.prompt_config.max_output_tokens_action,
+        )
+        if response_text is None:
+            return None
+
+        candidate = self._parse_json(response_text)
+        if str(candidate.get("action", "")).lower() == "need_screenshot":
+            return None
+        parsed = self._normalize_action_plan(candidate)
+        if parsed["action"] in {"click", "type"} and parsed["target_element"].get("element_id") not in known_element_ids:
+            return None
+
+        self.call_reduction_stats["ax_text_plans"] += 1
+        self.last_action = parsed.get("action")
+        if self.call_reduction_config.enabled:
+            self.vision_cache.set(cache_key, parsed)
+        return parsed
+
+    @traced("vision.summarize_content")
+    def summarize_content(
+        self,
+        content: str,
+        instruction: str,
+        ranked_chunks: list[SummaryChunk] | None = None,
+        total_chunks: int = 0,
+    ) -> str:
+        """Hierarchical summarization with chunk ranking and compact prompts.
+
+        ``ranked_chunks`` lets a caller that already chunked and ranked the
+        content while extracting it (see ``ExtractionSkill``) skip that pass.
+        In ``tree`` reduce mode the whole document is chunked here instead: the
+        token budget decides how many chunks are covered, and their summaries
+        are merged ``summary_fan_in`` at a time, level by level.
+        """
 
         cache_key = build_summary_cache_key(content, instruction)
         if self.call_reduction_config.enabled:
@@ -399,61 +637,147 @@ class VisionAgent:
                 self.call_reduction_stats["summary_cache_hits"] += 1
                 return cached_summary
 
-        chunks = self.context_shaper.chunk_text(
-            content,
-            chunk_chars=self.prompt_config.summary_chunk_chars,
-            overlap_chars=self.prompt_config.summary_overlap_chars,
-        )
-
-        if not chunks:
+        tree_mode = self.prompt_config.summary_reduce == "tree"
+        if ranked_chunks is None or tree_mode:
+            chunks = self.context_shaper.chunk_content(
+                content,
+                chunk_chars=self.prompt_config.summary_chunk_chars,
+                overlap_chars=self.prompt_config.summary_overlap_chars,
+                mode=self.prompt_config.summary_chunking,
+            )
+            top_k = self.prompt_config.summary_top_k_chunks
+            if tree_mode:
+                plan = plan_tree_reduce(
+                    total_chunks=len(chunks),
+                    chunk_tokens=self._estimate_tokens("x" * self.prompt_config.summary_chunk_chars),
+                    map_output_tokens=self.prompt_config.max_output_tokens_summary_chunk,
+                    merge_output_tokens=self.prompt_config.max_output_tokens_summary_merge,
+                    fan_in=self.prompt_config.summary_fan_in,
+                    token_budget=self.prompt_config.summary_token_budget,
+                    min_chunks=top_k,
+                )
+                top_k = plan.chunk_count
+            ranked = self.context_shaper.rank_chunks(chunks, query=instruction, top_k=top_k) if chunks else []
+            if tree_mode:
+                # Reduce groups neighbours, so leaves go back into document order.
+                ranked.sort(key=lambda chunk: chunk.index)
+            total_chunks = len(chunks)
+        else:
+            ranked = ranked_chunks
+            total_chunks = max(total_chunks, len(ranked))
+
+        if not ranked:
             return "No content available to summarize."
-
-        ranked = self.context_shaper.rank_chunks(
-            chunks,
-            query=instruction,
-            top_k=self.prompt_config.summary_top_k_chunks,
-        )
         self.call_reduction_stats["hierarchical_summary_chunks"] = len(ranked)
 
-        chunk_summaries: list[str] = []
-        total_chunks = len(chunks)
+        chunk_summaries = self._map_chunks(instruction, ranked, total_chunks)
+        if not chunk_summaries:
+            return "Failed to summarize chunks from all providers."
+
+        if tree_mode:
+            merged_summary, merge_errors = self._tree_reduce(instruction, chunk_summaries)
+        else:
+            merge_prompt = self.prompts.build_merge_summary_prompt(
+                goal=instruction,
+                chunk_summaries=chunk_summaries,
+            )
+            merged_summary, merge_errors = self._generate_text_with_fallback(
+                operation="summarize_merge",
+                prompt=merge_prompt,
+                max_output_tokens=self.prompt_config.max_output_tokens_summary_merge,
+            )
 
-        for ranked_chunk in ranked:
+        if merged_summary is None:
+            return f"Failed to merge summary from all providers. Errors: {merge_errors}"
+
+        if self.call_reduction_config.enabled:
+            self.summary_cache.set(cache_key, merged_summary)
+        return merged_summary
+
+    def _run_parallel(self, work: Callable[[Any], Any], items: list[Any]) -> list[Any]:
+        """Runs ``work`` over ``items`` on up to ``summary_max_workers`` threads, keeping order."""
+        return parallel_map(work, items, self.prompt_config.summary_max_workers, thread_name_prefix="summarize")
+
+    def _map_chunks(self, instruction: str, chunks: list[SummaryChunk], total_chunks: int) -> list[str]:
+        summaries: list[str | None] = [None] * len(chunks)
+        stored_summaries = self._stored_chunk_summaries([chunk_hash(chunk.text) for chunk in chunks], instruction)
+        pending: list[int] = []
+        for position, chunk in enumerate(chunks):
+            # Unchanged chunks of a revisited document keep their map summary; only new text is summarized.
+            stored = stored_summaries.get(chunk_hash(chunk.text))
+            if stored is not None:
+                self.call_reduction_stats["chunk_summary_cache_hits"] += 1
+                summaries[position] = stored
+            else:
+                pending.append(position)
+
+        def summarize(position: int) -> tuple[str | None, list[str]]:
+            chunk = chunks[position]
             map_prompt = self.prompts.build_chunk_summary_prompt(
                 goal=instruction,
-                chunk=ranked_chunk.text,
-                chunk_index=ranked_chunk.index,
+                chunk=chunk.text,
+                chunk_index=chunk.index,
                 total_chunks=total_chunks,
             )
-            map_summary, map_errors = self._generate_text_with_fallback(
+            return self._generate_text_with_fallback(
                 operation="summarize_chunk",
                 prompt=map_prompt,
                 max_output_tokens=self.prompt_config.max_output_tokens_summary_chunk,
             )
+
+        # Results are applied on this thread; stats and the chunk store are not shared with workers.
+        for position, (map_summary, map_errors) in zip(pending, self._run_parallel(summarize, pending)):
+            chunk = chunks[position]
             if map_summary:
-                chunk_summaries.append(map_summary)
+                summaries[position] = map_summary
+                self._store_chunk_summary(chunk_hash(chunk.text), instruction, map_summary)
             elif map_errors:
-                chunk_summaries.append(f"[chunk-{ranked_chunk.index+1} unavailable: {map_errors}]")
-
-        if not chunk_summaries:
-            return "Failed to summarize chunks from all providers."
-
-        merge_prompt = self.prompts.build_merge_summary_prompt(
-            goal=instruction,
-            chunk_summaries=chunk_summaries,
-        )
-        merged_summary, merge_errors = self._generate_text_with_fallback(
-            operation="summarize_merge",
-            prompt=merge_prompt,
-            max_output_tokens=self.prompt_config.max_output_tokens_summary_merge,
-        )
-
-        if merged_summary is None:
-            return f"Failed to merge summary from all providers. Errors: {merge_errors}"
+                summaries[position] = f"[chunk-{chunk.index+1} unavailable: {map_errors}]"
+        return [summary for summary in summaries if summary]
+
+    def _tree_reduce(self, instruction: str, summaries: list[str]) -> tuple[str | None, list[str]]:
+        """Merges ``summary_fan_in`` summaries per call, level by level; each level's groups run concurrently."""
+        fan_in = max(2, self.prompt_config.summary_fan_in)
+        level = summaries
+        while True:
+            groups = [level[start : start + fan_in] for start in range(0, len(level), fan_in)]
+            final = len(groups) == 1
+
+            def reduce(group: list[str]) -> tuple[str | None, list[str]]:
+                return self._generate_text_with_fallback(
+                    operation="summarize_merge" if final else "summarize_reduce",
+                    prompt=self.prompts.build_merge_summary_prompt(goal=instruction, chunk_summaries=group, partial=not final),
+                    max_output_tokens=self.prompt_config.max_output_tokens_summary_merge,
+                )
+
+            results = self._run_parallel(reduce, groups)
+            self.call_reduction_stats["summary_reduce_calls"] += len(groups)
+            if final:
+                return results[0]
+            level = [
+                summary if summary else f"[section-{index+1} unavailable: {errors}]"
+                for index, (summary, errors) in enumerate(results)
+            ]
 
-        if self.call_reduction_config.enabled:
-            self.summary_cache.set(cache_key, merged_summary)
-        return merged_summary
+    def _stored_chunk_summaries(self, hashes: list[str], instruction: str) -> dict[str, str]:
+        if not self.call_reduction_config.enabled:
+            return {}
+        found: dict[str, str] = {}
+        for digest in hashes:
+            summary = self.chunk_summary_cache.get(f"{digest}:{normalize_instruction(instruction)}")
+            if summary is not None:
+                found[digest] = summary
+        missing = [digest for digest in hashes if digest not in found]
+        if missing and self.chunk_summary_store is not None:
+            found.update(self.chunk_summary_store.get_chunk_summaries(missing, instruction))
+        return found
+
+    def _store_chunk_summary(self, digest: str, instruction: str, summary: str) -> None:
+        if not self.call_reduction_config.enabled:
+            return
+        self.chunk_summary_cache.set(f"{digest}:{normalize_instruction(instruction)}", summary)
+        if self.chunk_summary_store is not None:
+            self.chunk_summary_store.put_chunk_summary(digest, instruction, summary)
 
     def _parse_json(self, text: str) -> dict[str, Any]:
         try:
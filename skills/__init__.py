@@ -3,5 +3,6 @@ from .search import SearchSkill
 from .navigation import NavigationSkill
 from .extraction import ExtractionSkill
 from .whatsapp import WhatsAppSkill
+from .research import ResearchSkill
 
-__all__ = ["Skill", "SearchSkill", "NavigationSkill", "ExtractionSkill", "WhatsAppSkill"]
+__all__ = ["Skill", "SearchSkill", "NavigationSkill", "ExtractionSkill", "WhatsAppSkill", "ResearchSkill"]
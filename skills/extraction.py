@@ -1,4 +1,8 @@
 from .base import Skill
+from dataclasses import asdict
+from ultragravity.context_shaper import ChunkRanker, ContextShaper
+from ultragravity.page_cache import PAGE_FINGERPRINT_SCRIPT
+from ultragravity.page_content import BODY_TEXT_SCRIPT, FALLBACK_PREFIX, MIN_EXTRACTED_CHARS, ContentFilter, iter_page_markdown
 from typing import Dict, Any, Optional
 import json
 
@@ -35,76 +39,90 @@ class ExtractionSkill(Skill):
     def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
         self.logger.info("Executing ExtractionSkill...")
         page = self.agent.browser.page
-        
-        # Inject a script to extract main text. 
-        # We'll use a simple heuristic: standard block elements, ignoring scripts/styles/navs if possible.
-        # Fallback to body.innerText if heuristic fails.
-        
-        extraction_script = """
-        () => {
-            function isVisible(elem) {
-                return !!( elem.offsetWidth || elem.offsetHeight || elem.getClientRects().length );
-            }
-            
-            function getReadableText(root) {
-                // Clone to not mess up the page
-                let clone = root.cloneNode(true);
-                
-                // Remove clutter
-                const clutter = ['script', 'style', 'noscript', 'iframe', 'svg', 'header', 'footer', 'nav', 'aside'];
-                clutter.forEach(tag => {
-                    const elements = clone.querySelectorAll(tag);
-                    elements.forEach(el => el.remove());
-                });
-                
-                // Extract headings and paragraphs
-                let markdown = "";
-                const blocks = clone.querySelectorAll('h1, h2, h3, h4, h5, h6, p, li, blockquote, pre');
-                
-                blocks.forEach(el => {
-                    if (!isVisible(el)) return;
-                    
-                    let text = el.innerText.trim();
-                    if (!text) return;
-                    
-                    const tag = el.tagName.toLowerCase();
-                    if (tag.startsWith('h')) {
-                        const level = parseInt(tag.charAt(1));
-                        markdown += '#'.repeat(level) + ' ' + text + '\\n\\n';
-                    } else if (tag === 'li') {
-                        markdown += '- ' + text + '\\n';
-                    } else if (tag === 'pre') {
-                        markdown += '```\\n' + text + '\\n```\\n\\n';
-                    } else if (tag === 'blockquote') {
-                        markdown += '> ' + text + '\\n\\n';
-                    } else {
-                        markdown += text + '\\n\\n';
-                    }
-                });
-                
-                return markdown;
-            }
-            
-            let content = getReadableText(document.body);
-            if (!content || content.length < 50) {
-                 // Fallback
-                 return "FALLBACK_TEXT_ONLY:\\n" + document.body.innerText;
-            }
-            return content;
-        }
-        """
-        
+        prompt_config = self.agent.vision.prompt_config
+        instruction = params.get("instruction", "")
+        page_cache = self.agent.page_cache
+
         try:
-            markdown_content = page.evaluate(extraction_script)
-            # Truncate if too huge to prevent token explosion in downstream tasks, 
-            # though Gemini 1.5/2.5 Flash has huge context.
+            validator = ""
+            fingerprint = ""
+            if page_cache is not None:
+                # An unchanged rendered-text fingerprint (or, without one, ETag/Last-Modified) skips extraction.
+                validator = self.agent.browser.document_validator(page.url)
+                fingerprint = str(page.evaluate(PAGE_FINGERPRINT_SCRIPT) or "")
+                cached = page_cache.get_page(page.url, validator=validator, fingerprint=fingerprint)
+                if cached is not None:
+                    ranker = ChunkRanker(instruction, prompt_config.summary_top_k_chunks)
+                    for chunk in cached.chunks:
+                        ranker.add(chunk)
+                    self.logger.info(f"Page content cache hit for {cached.url} ({len(cached.markdown)} chars)")
+                    return {
+                        "status": "success",
+                        "content": cached.markdown,
+                        "length": len(cached.markdown),
+                        "ranked_chunks": [asdict(chunk) for chunk in ranker.ranked()],
+                        "total_chunks": ranker.total,
+                        "kept_chars": int(cached.meta.get("kept_chars", len(cached.markdown))),
+                        "dropped_chars": int(cached.meta.get("dropped_chars", 0)),
+                        "page_cache": "hit",
+                    }
+
+            # Standard block elements as Markdown, ignoring scripts/styles/navs, read from the
+            # live DOM in bounded batches. Blocks are scored as main content or boilerplate and
+            # near-duplicates dropped; each batch is then chunked and ranked as it arrives, so
+            # summarization only has to summarize the kept chunks once extraction ends.
+            content_filter = ContentFilter()
+            # Content-defined boundaries keep unchanged chunks byte-identical across revisits,
+            # so their cached map summaries still match after the page changes elsewhere.
+            chunker = ContextShaper.make_chunker(
+                prompt_config.summary_chunk_chars, prompt_config.summary_overlap_chars, prompt_config.summary_chunking
+            )
+            ranker = ChunkRanker(instruction, prompt_config.summary_top_k_chunks)
+            batches = []
+            chunks = []
+            for batch in iter_page_markdown(
+                page, batch_chars=prompt_config.summary_chunk_chars * 4, content_filter=content_filter
+            ):
+                batches.append(batch)
+                chunks.extend(chunker.feed(batch))
+            markdown_content = "".join(batches)
+            if len(markdown_content) < MIN_EXTRACTED_CHARS:
+                # Fallback to body.innerText if the block heuristic finds too little.
+                markdown_content = FALLBACK_PREFIX + (page.evaluate(BODY_TEXT_SCRIPT) or "")
+                chunker = ContextShaper.make_chunker(
+                    prompt_config.summary_chunk_chars, prompt_config.summary_overlap_chars, prompt_config.summary_chunking
+                )
+                chunks = chunker.feed(markdown_content)
+            chunks.extend(chunker.flush())
+            for chunk in chunks:
+                ranker.add(chunk)
+
+            if page_cache is not None:
+                page_cache.put_page(
+                    page.url,
+                    markdown_content,
+                    chunks,
+                    validator=validator,
+                    fingerprint=fingerprint,
+                    meta={"kept_chars": content_filter.kept_chars, "dropped_chars": content_filter.dropped_chars},
+                )
+
             preview = markdown_content[:200] + "..." if len(markdown_content) > 200 else markdown_content
-            self.logger.info(f"Extracted {len(markdown_content)} chars. Preview: {preview}")
-            
+            self.logger.info(
+                f"Extracted {len(markdown_content)} chars in {len(batches)} batches "
+                f"(kept {content_filter.kept_chars}, dropped {content_filter.dropped_chars} "
+                f"{content_filter.dropped_by_reason}). Preview: {preview}"
+            )
+
             return {
-                "status": "success", 
+                "status": "success",
                 "content": markdown_content,
-                "length": len(markdown_content)
+                "length": len(markdown_content),
+                "ranked_chunks": [asdict(chunk) for chunk in ranker.ranked()],
+                "total_chunks": ranker.total,
+                "kept_chars": content_filter.kept_chars,
+                "dropped_chars": content_filter.dropped_chars,
+                "page_cache": "miss" if page_cache is not None else "disabled",
             }
         except Exception as e:
             return {"status": "fail", "reason": str(e)}
@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Any, List
+from urllib.parse import parse_qs, quote_plus, urlparse
+
+from .base import Skill
+from .search import SearchSkill
+
+RESULTS_URL = "https://html.duckduckgo.com/html/?q={query}"
+RESULT_LINK_SELECTOR = "a.result__a"
+
+
+class ResearchSkill(Skill):
+    """
+    Skill for "research X and summarize" tasks.
+    Reads the top search results in parallel browser tabs instead of visiting each
+    source through its own vision loop, and returns the combined Markdown for summarization.
+    """
+
+    @staticmethod
+    def result_urls(hrefs: List[str], limit: int) -> List[str]:
+        """Unwraps DuckDuckGo redirect links, drops ads and duplicates."""
+        urls: List[str] = []
+        for href in hrefs:
+            parsed = urlparse(href if "//" in href else f"https:{href}")
+            if parsed.netloc.endswith("duckduckgo.com"):
+                target = parse_qs(parsed.query).get("uddg", [""])[0]
+                if not target or "duckduckgo.com/y.js" in target:
+                    continue
+            else:
+                target = href
+            if target.startswith("http") and target not in urls:
+                urls.append(target)
+            if len(urls) >= limit:
+                break
+        return urls
+
+    def can_handle(self, instruction: str) -> float:
+        """
+        High confidence for research-style goals that want several sources merged.
+        """
+        lower_instr = instruction.lower()
+        if re.search(r"\bresearch\b", lower_instr) or any(
+            phrase in lower_instr for phrase in ("compare sources", "multiple sources", "across sources")
+        ):
+            return 0.95
+        return 0.1
+
+    def execute(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        instruction = params.get("instruction", "")
+        query = params.get("query") or SearchSkill.rewrite_query(re.sub(r"^\s*research\s+", "", instruction, flags=re.IGNORECASE))
+        if not query:
+            return {"status": "fail", "reason": "No research query provided."}
+
+        config = self.agent.runtime_config.research
+        browser = self.agent.browser
+        if not browser.page:
+            return {"status": "fail", "reason": "Browser is not running."}
+        self.logger.info(f"Executing ResearchSkill with query: '{query}'")
+        try:
+            browser.page.goto(RESULTS_URL.format(query=quote_plus(query)), wait_until="domcontentloaded")
+            hrefs = browser.page.eval_on_selector_all(
+                RESULT_LINK_SELECTOR, "links => links.map(link => link.getAttribute('href') || '')"
+            )
+        except Exception as e:
+            return {"status": "fail", "reason": f"Search failed: {e}"}
+
+        urls = self.result_urls(hrefs, config.max_sources)
+        if not urls:
+            return {"status": "fail", "reason": f"No results found for '{query}'."}
+
+        pages = browser.fetch_pages(urls, max_concurrency=config.max_concurrency, timeout_seconds=config.tab_timeout_seconds)
+        readable = [page for page in pages if page.ok and page.content.strip()]
+        if not readable:
+            return {"status": "fail", "reason": "None of the result pages could be read."}
+
+        sections = [
+            f"## Source: {page.title or page.final_url or page.url}\n{page.final_url or page.url}\n\n"
+            f"{page.content[: config.max_chars_per_source]}"
+            for page in readable
+        ]
+        dropped = sum(page.dropped_chars for page in readable)
+        self.logger.info(f"Read {len(readable)}/{len(pages)} sources in parallel for '{query}' ({dropped} chars of page chrome dropped)")
+        return {
+            "status": "success",
+            "message": f"Read {len(readable)} sources for '{query}'",
+            "content": "\n\n".join(sections),
+            "sources": [page.final_url or page.url for page in readable],
+        }
@@ -7,9 +7,10 @@ menu-bar clicks and blind keystrokes via ``bridge_applescript``.
 
 Optional vision verification
 -----------------------------
-When the agent has a ``DesktopAgent`` attached (``self.agent.desktop``),
-this skill can take a screenshot after composing the draft to let the
-caller (or a VLM) confirm the correct chat is open before sending.
+When the agent has a ``DesktopAgent`` and ``VisionAgent`` attached
+(``self.agent.desktop`` / ``self.agent.vision``), this skill checks the chat
+header after composing the draft with local OCR, falling back to the vision
+model only when OCR is unsure, to confirm the correct chat is open.
 """
 
 import os
@@ -21,6 +22,7 @@ from typing import Dict, Any
 from skills.base import Skill
 from skills.contact_map import WHATSAPP_CONTACT_MAP
 from agent.bridge_applescript import whatsapp_send_message, whatsapp_send_message_by_phone, open_app
+from ultragravity.capture import Region
 try:
     from termcolor import colored
 except Exception:  # pragma: no cover - optional dependency fallback
@@ -29,6 +31,9 @@ except Exception:  # pragma: no cover - optional dependency fallback
 
 logger = logging.getLogger("WhatsAppSkill")
 
+# (left, top, width, height) of the chat header as fractions of the captured frame.
+CHAT_HEADER_BOUNDS = (0.3, 0.0, 0.7, 0.15)
+
 
 class WhatsAppSkill(Skill):
     """Skill for sending WhatsApp messages via the native macOS app."""
@@ -272,19 +277,31 @@ class WhatsAppSkill(Skill):
                 return True
         return False
 
+    @staticmethod
+    def _chat_header_region(frame) -> Region:
+        """The open chat's header: top strip of the conversation pane, right of the chat list."""
+        left, top, width, height = CHAT_HEADER_BOUNDS
+        return Region(
+            left=int(frame.width * left),
+            top=int(frame.height * top),
+            width=int(frame.width * width),
+            height=int(frame.height * height),
+        )
+
     def _vision_verify(self, expected_contact: str) -> bool:
-        """Take a desktop screenshot and check if the chat header matches."""
+        """Check that the open chat's header shows the contact: local OCR first, vision model if unsure."""
         desktop = getattr(self.agent, "desktop", None)
-        if desktop is None:
+        vision = getattr(self.agent, "vision", None)
+        if desktop is None or vision is None:
             return False
 
         try:
-            path = desktop.get_screenshot("whatsapp_verify.png")
-            logger.info(f"📸 Verification screenshot saved to {path}")
-            # For now we return True (screenshot taken but no VLM call).
-            # A future enhancement can feed this to analyze_image() with
-            # a prompt like "Does the WhatsApp chat header say <contact>?"
-            return True
+            frame = desktop.capture()
+            result = vision.verify_text(frame, expected_contact, region=self._chat_header_region(frame))
+            logger.info(
+                f"🔎 Chat header check via {result.source}: found={result.found} confidence={result.confidence:.2f}"
+            )
+            return result.found
         except Exception as e:
             logger.warning(f"Vision verify failed: {e}")
             return False
@@ -82,3 +82,50 @@ def test_applescript_bridge_denied_by_gateway(monkeypatch):
     assert output is None
 
     bridge_applescript.set_action_gateway(None)
+
+
+def test_buffered_audit_logger_keeps_order_and_flushes_on_close(tmp_path):
+    import json
+
+    logger = AuditLogger(log_dir=tmp_path / "audit", buffered=True, batch_size=7, flush_interval_seconds=0.05, fsync_policy="batch")
+    for index in range(50):
+        logger.write_event("action_executed", {"index": index})
+    logger.close()
+
+    lines = []
+    for path in sorted((tmp_path / "audit").glob("actions-*.jsonl")):
+        lines.extend(path.read_text(encoding="utf-8").splitlines())
+    assert [json.loads(line)["index"] for line in lines] == list(range(50))
+
+    logger.write_event("after_close", {"index": 50})
+    lines = []
+    for path in sorted((tmp_path / "audit").glob("actions-*.jsonl")):
+        lines.extend(path.read_text(encoding="utf-8").splitlines())
+    assert json.loads(lines[-1])["event_type"] == "after_close"
+
+
+def test_buffered_audit_logger_flush_drains_queue(tmp_path):
+    logger = AuditLogger(log_dir=tmp_path / "audit", buffered=True, flush_interval_seconds=0.05)
+    logger.write_event("policy_decision", {"value": 1})
+    logger.flush()
+    assert any(path.read_text(encoding="utf-8") for path in (tmp_path / "audit").glob("actions-*.jsonl"))
+    logger.close()
+
+
+def test_buffered_audit_logger_survives_bad_payloads(tmp_path):
+    import json
+
+    class Unprintable:
+        def __str__(self):
+            raise RuntimeError("no text form")
+
+    logger = AuditLogger(log_dir=tmp_path / "audit", buffered=True, queue_size=2, batch_size=1, flush_interval_seconds=0.05)
+    logger.write_event("odd_payload", {"value": object()})
+    logger.write_event("broken_payload", {"value": Unprintable()})
+    for index in range(5):
+        logger.write_event("action_executed", {"index": index})
+    logger.close()
+
+    records = [json.loads(line) for path in (tmp_path / "audit").glob("actions-*.jsonl") for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records[0]["value"].startswith("<object object")
+    assert [record["index"] for record in records[1:]] == list(range(5))
@@ -125,3 +125,213 @@ def test_scheduler_waits_for_budget_window_then_executes(tmp_path):
     assert result.result == "ok-after-wait"
     assert len(sleep_calls) >= 1
     assert sum(sleep_calls) >= 59.0
+
+
+def test_latency_histogram_percentiles_are_bounded_and_mergeable():
+    from ultragravity.latency import LatencyHistogram
+
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    assert abs(histogram.percentile(0.50) - 500) / 500 < 0.05
+    assert abs(histogram.percentile(0.99) - 990) / 990 < 0.05
+    assert len(histogram.counts) < 200
+
+    other = LatencyHistogram()
+    other.record(5000)
+    histogram.merge(other)
+    restored = LatencyHistogram.from_dict(histogram.to_dict())
+    assert restored.total == 1001
+    assert restored.percentile(1.0) == 5000
+
+
+def test_telemetry_exports_series_percentiles_and_error_classes(tmp_path):
+    from ultragravity.telemetry_store import TelemetryStore
+
+    telemetry = ProviderTelemetry(log_dir=tmp_path / "telemetry")
+    for latency in (100, 200, 300, 400):
+        telemetry.record("gemini", "flash", "analyze_image", 100, 200, latency, True)
+    telemetry.record("gemini", "flash", "analyze_image", 100, 0, 50, False, error="429 rate limit exceeded")
+    telemetry.record("gemini", "flash", "summarize_chunk", 100, 0, 70, False, error="Request timed out")
+
+    series = {row["operation"]: row for row in telemetry.export()["series"]}
+    image = series["analyze_image"]
+    assert image["requests"] == 5
+    assert image["error_classes"] == {"rate_limit": 1}
+    assert 180 <= image["latency_ms_p50"] <= 220
+    assert image["tokens_per_second"] == 800 / 1.0
+    assert series["summarize_chunk"]["error_classes"] == {"timeout": 1}
+    assert telemetry.snapshot()["gemini"]["latency_ms_p99"] >= 380
+
+    telemetry.close()
+    persisted = TelemetryStore(tmp_path / "telemetry").latency_summaries()
+    assert persisted["gemini|flash|analyze_image"]["requests"] == 5
+
+
+def test_metrics_registry_exposes_budget_cache_and_gateway_counters(tmp_path):
+    import urllib.request
+
+    from ultragravity.call_reduction import TTLCache
+    from ultragravity.metrics import (
+        MetricsRegistry,
+        MetricsServer,
+        budget_collector,
+        cache_collector,
+        counters_collector,
+        telemetry_collector,
+    )
+
+    now = [1000.0]
+    manager = BudgetManager(
+        limits_by_provider={"gemini": ProviderBudgetLimits(rpm_limit=10, tpm_limit=1000, daily_request_limit=50)},
+        clock=lambda: now[0],
+    )
+    manager.reserve("gemini", 120)
+    telemetry = ProviderTelemetry(log_dir=tmp_path / "telemetry")
+    telemetry.record("gemini", "flash", "analyze_image", 100, 80, 400, True)
+    cache = TTLCache(ttl_seconds=60, max_entries=10)
+    cache.set("k", "v")
+    cache.get("k")
+    cache.get("missing")
+
+    registry = MetricsRegistry()
+    registry.register(telemetry_collector(telemetry))
+    registry.register(budget_collector(manager, ["gemini"]))
+    registry.register(cache_collector({"vision": cache}))
+    registry.register(counters_collector("gateway_decisions", "Gateway outcomes.", "outcome", lambda: {"executed": 2}))
+
+    text = registry.render()
+    assert 'ultragravity_budget_daily_remaining{provider="gemini"} 49' in text
+    assert 'ultragravity_budget_tpm_current{provider="gemini"} 120' in text
+    assert 'ultragravity_cache_hits_total{cache="vision"} 1' in text
+    assert 'ultragravity_cache_misses_total{cache="vision"} 1' in text
+    assert 'ultragravity_gateway_decisions_total{outcome="executed"} 2' in text
+    assert 'ultragravity_provider_requests_total{provider="gemini"} 1' in text
+    assert text.endswith("# EOF\n")
+
+    assert "# TYPE ultragravity_gateway_decisions counter" in text
+
+    written = registry.write_textfile(tmp_path / "metrics" / "ultragravity.prom")
+    textfile = written.read_text(encoding="utf-8")
+    assert textfile == registry.render_text()
+    # node_exporter's textfile collector reads the classic format: TYPE names the sample.
+    assert "# TYPE ultragravity_gateway_decisions_total counter" in textfile
+    assert 'ultragravity_gateway_decisions_total{outcome="executed"} 2' in textfile
+    assert "# EOF" not in textfile
+
+    server = MetricsServer(registry, port=0)
+    server.start()
+    try:
+        host, port = server.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        assert "ultragravity_budget_rpm_current" in body
+    finally:
+        server.stop()
+        telemetry.close()
+
+
+def test_scheduler_never_reserves_past_the_budget_from_concurrent_callers(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    manager = BudgetManager(
+        limits_by_provider={
+            "gemini": ProviderBudgetLimits(rpm_limit=3, tpm_limit=100000, daily_request_limit=100, soft_cap_ratio=1.0)
+        },
+        clock=lambda: 1000.0,
+    )
+    telemetry = ProviderTelemetry(log_dir=tmp_path / "telemetry")
+    scheduler = ProviderScheduler(manager, telemetry, lambda seconds: None)
+
+    def call(index: int):
+        return scheduler.execute(
+            ProviderCallRequest(
+                provider="gemini",
+                model="gemini-2.5-flash",
+                operation="summarize_chunk",
+                estimated_tokens=10,
+                call=lambda: f"summary-{index}",
+                max_retries=1,
+            )
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(call, range(24)))
+
+    assert sum(result.success for result in results) == 3
+    assert telemetry.snapshot()["gemini"]["requests"] == 3
+    telemetry.close()
+
+
+def test_telemetry_snapshots_stay_consistent_while_workers_record(tmp_path):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    telemetry = ProviderTelemetry(log_dir=tmp_path / "telemetry", rollup_flush_every=10_000)
+    done = threading.Event()
+    failures = []
+
+    def scrape():
+        while not done.is_set():
+            try:
+                for provider in telemetry.snapshot().values():
+                    assert provider["successes"] + provider["failures"] == provider["requests"]
+                telemetry.latency_snapshot()
+            except Exception as exc:  # pragma: no cover - the failure being guarded against
+                failures.append(exc)
+                return
+
+    def record(index: int):
+        telemetry.record(
+            provider=f"provider-{index % 3}",
+            model="model",
+            operation=f"op-{index}",
+            estimated_tokens=10,
+            actual_tokens=10,
+            latency_ms=index % 50,
+            success=index % 7 != 0,
+            error=None if index % 7 else "429 rate limit",
+        )
+
+    scraper = threading.Thread(target=scrape)
+    scraper.start()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(record, range(600)))
+    done.set()
+    scraper.join()
+
+    assert failures == []
+    assert sum(provider["requests"] for provider in telemetry.snapshot().values()) == 600
+    assert len(telemetry.latency_snapshot()) == 600
+    telemetry.close()
+
+
+def test_agent_shutdown_stops_metrics_exporters_and_writes_final_values(tmp_path):
+    import socket
+    from types import SimpleNamespace
+
+    import pytest
+
+    pytest.importorskip("google.generativeai")
+    pytest.importorskip("playwright")
+    from agent.core import UltragravityAgent
+    from ultragravity.metrics import MetricsRegistry, MetricsServer, TextfileWriter, counters_collector
+
+    executed = {"executed": 1}
+    registry = MetricsRegistry()
+    registry.register(counters_collector("gateway_decisions", "Gateway outcomes.", "outcome", lambda: dict(executed)))
+    server = MetricsServer(registry, port=0)
+    server.start()
+    textfile = TextfileWriter(registry, tmp_path / "ultragravity.prom", interval_seconds=3600)
+    textfile.start()
+    agent = SimpleNamespace(metrics_server=server, metrics_textfile=textfile)
+    address = server.address
+
+    executed["executed"] = 7
+    UltragravityAgent._stop_metrics_exporters(agent)
+
+    assert agent.metrics_server is None and agent.metrics_textfile is None
+    assert 'ultragravity_gateway_decisions_total{outcome="executed"} 7' in (tmp_path / "ultragravity.prom").read_text(encoding="utf-8")
+    with pytest.raises(OSError):
+        socket.create_connection(address, timeout=1).close()
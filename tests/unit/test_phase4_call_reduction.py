@@ -6,10 +6,12 @@ from ultragravity.call_reduction import (
     DeterministicRouter,
     StateChangeDetector,
     TTLCache,
+    build_marked_vision_cache_key,
     build_summary_cache_key,
     build_tool_cache_key,
     build_vision_cache_key,
 )
+from ultragravity.element_index import ElementIndexCache, build_element_index, draw_marks, parse_mark
 
 
 def _make_image(path, color):
@@ -90,3 +92,327 @@ def test_cache_keys_are_deterministic_and_distinct(tmp_path):
 
     assert tool_key_1 == tool_key_2
     assert tool_key_1 != tool_key_3
+
+
+def test_frame_settle_detector_returns_once_frames_stop_changing():
+    from ultragravity.settle import FrameSettleDetector
+
+    now = [0.0]
+    frames = [
+        Image.linear_gradient("L").rotate(angle)
+        for angle in (0, 90, 180)
+    ] + [Image.new("L", (64, 64), color=128)] * 5
+    captured = iter(frames)
+
+    detector = FrameSettleDetector(
+        capture=lambda: next(captured),
+        timeout_seconds=5.0,
+        poll_interval_ms=100,
+        stable_frames=2,
+        clock=lambda: now[0],
+        sleep_fn=lambda seconds: now.__setitem__(0, now[0] + seconds),
+    )
+    result = detector.wait()
+
+    assert result.settled is True
+    assert result.reason == "frames_stable"
+    assert result.elapsed_ms < 1000
+
+
+def test_page_settle_detector_waits_for_network_then_dom_quiet_and_honours_timeout():
+    from ultragravity.settle import PageSettleDetector
+
+    class FakePage:
+        def __init__(self, network_idle: bool):
+            self.network_idle = network_idle
+            self.calls: list[tuple[str, object]] = []
+
+        def evaluate(self, script):
+            self.calls.append(("evaluate", None))
+            return True
+
+        def wait_for_load_state(self, state, timeout):
+            self.calls.append(("load_state", state))
+            if not self.network_idle:
+                raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+        def wait_for_function(self, script, arg, timeout, polling):
+            self.calls.append(("quiet_window", arg))
+
+    idle_page = FakePage(network_idle=True)
+    result = PageSettleDetector(quiet_window_ms=250).wait(idle_page)
+    assert result.settled is True
+    assert ("load_state", "networkidle") in idle_page.calls
+    assert ("quiet_window", 250) in idle_page.calls
+
+    busy_page = FakePage(network_idle=False)
+    result = PageSettleDetector().wait(busy_page, timeout_seconds=0.5)
+    assert result.settled is False
+    assert result.reason == "network_busy"
+    assert not any(name == "quiet_window" for name, _ in busy_page.calls)
+
+
+def test_element_index_marks_resolve_and_cache_key_survives_layout_shift(tmp_path):
+    raw = [
+        {"role": "input", "text": "Search", "selector": "#q", "box": [10, 10, 200, 24]},
+        {"role": "button", "text": "Go", "selector": "button[name=\"go\"]", "box": [220, 10, 40, 24]},
+    ]
+    shifted = [dict(item, box=[item["box"][0], item["box"][1] + 30, item["box"][2], item["box"][3]]) for item in raw]
+
+    index = build_element_index("https://example.com", raw)
+    moved = build_element_index("https://example.com", shifted)
+    assert index.dom_hash == moved.dom_hash
+    assert build_marked_vision_cache_key("Search cats", "BROWSER", index.url, index.dom_hash, "abc") == build_marked_vision_cache_key(
+        "search  cats", "BROWSER", moved.url, moved.dom_hash, "abc"
+    )
+    # Same marks but a different screenshot (a toggled checkbox) must not replay the old plan.
+    assert build_marked_vision_cache_key("Search cats", "BROWSER", index.url, index.dom_hash, "abc") != build_marked_vision_cache_key(
+        "Search cats", "BROWSER", index.url, index.dom_hash, "abd"
+    )
+    assert build_element_index("https://example.com", raw[:1]).dom_hash != index.dom_hash
+
+    assert parse_mark(2) == parse_mark("2") == parse_mark("m2") == 2
+    assert parse_mark("e1a2b3c") is None
+    assert index.get("m2").center == (240, 22)
+    assert index.get("7") is None
+    assert '2 button "Go"' in index.legend()
+
+    cache = ElementIndexCache()
+    cache.put(index, stamp="doc1:0:0:0:1280:720")
+    cache.put(moved)
+    assert cache.get(index.url, index.dom_hash).elements[0].box[1] == 40
+    assert cache.lookup(index.url, "doc1:0:0:0:1280:720") is index
+    assert cache.lookup(index.url, "doc1:1:0:0:1280:720") is None
+    assert cache.lookup(index.url, "") is None
+
+    screenshot = tmp_path / "screen.png"
+    Image.new("RGB", (600, 100), color=(255, 255, 255)).save(screenshot)
+    marked = draw_marks(str(screenshot), index, str(tmp_path / "marked.png"), scale=2.0)
+    with Image.open(marked) as image:
+        assert image.getpixel((20, 20)) != (255, 255, 255)
+        assert image.getpixel((300, 90)) == (255, 255, 255)
+
+
+def test_capture_engine_reports_dirty_regions_and_honours_region_of_interest():
+    from PIL import ImageDraw
+
+    from ultragravity.capture import CaptureEngine, Region
+
+    grabbed_regions = []
+    screens = []
+
+    def grab(region):
+        grabbed_regions.append(region)
+        return screens.pop(0)
+
+    def screen(box=None):
+        image = Image.new("RGB", (640, 480), color=(30, 30, 30))
+        if box:
+            ImageDraw.Draw(image).rectangle(box, fill=(250, 250, 250))
+        return image
+
+    engine = CaptureEngine(grab=grab, ring_size=3, downscale=8, tile_size=4, pixel_threshold=12)
+    screens.extend([screen(), screen((100, 100, 140, 130)), screen((100, 100, 140, 130))])
+
+    first = engine.capture_once()
+    assert first.dirty_regions == (Region(0, 0, 640, 480),)
+    second = engine.capture_once()
+    assert len(second.dirty_regions) == 1
+    dirty = second.dirty_regions[0]
+    assert dirty.left <= 100 and dirty.top <= 100
+    assert dirty.left + dirty.width >= 140 and dirty.top + dirty.height >= 130
+    assert dirty.width * dirty.height < 640 * 480 / 10
+    assert engine.capture_once().dirty_regions == ()
+    assert engine.dirty_since(first.sequence) == [dirty]
+    assert engine.latest().sequence == 3
+
+    window = Region(left=50, top=40, width=200, height=120)
+    engine.set_region(window)
+    screens.append(Image.new("RGB", (200, 120)))
+    framed = engine.capture_once()
+    assert grabbed_regions[-1] == window and framed.region == window
+    assert framed.dirty_regions == (Region(0, 0, 200, 120),)
+    # The ring no longer covers frame 1, so everything since then counts as dirty.
+    assert engine.dirty_since(0) == [Region(0, 0, 200, 120)]
+
+    screens.extend([screen()] * 50)
+    engine.set_region(None)
+    engine.interval_seconds = 0.01
+    engine.start()
+    deadline = time.monotonic() + 2.0
+    while engine.latest().sequence < 6 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    engine.stop()
+    assert not engine.running
+    assert engine.latest().sequence >= 6
+
+
+def test_frame_views_the_bgra_buffer_and_hashes_without_encoding():
+    import io
+
+    import numpy as np
+
+    from ultragravity.capture import Frame
+
+    image = Image.linear_gradient("L").resize((320, 200)).convert("RGB")
+    rgb = np.asarray(image)
+    raw = bytearray(np.dstack([rgb[..., ::-1], np.full(rgb.shape[:2], 255, dtype=np.uint8)]).tobytes())
+
+    frame = Frame.from_bgra(raw, 320, 200)
+    assert np.shares_memory(frame.bgra, np.frombuffer(raw, dtype=np.uint8))
+    assert frame.size == (320, 200)
+
+    expected = np.asarray(image.convert("L").reduce(8), dtype=np.float64)
+    assert np.abs(frame.gray_small(8) - expected).max() <= 1.0
+    assert StateChangeDetector.dhash_frame(frame) == StateChangeDetector.dhash_image(image)
+
+    detector = StateChangeDetector(image_distance_threshold=2)
+    assert detector.inspect_frame(frame, mode="DESKTOP").changed is True
+    assert detector.inspect_frame(Frame.from_bgra(bytes(raw), 320, 200), mode="DESKTOP").changed is False
+    flipped = Frame.from_image(image.rotate(90))
+    assert detector.inspect_frame(flipped, mode="DESKTOP").changed_by_image is True
+
+    decoded = Image.open(io.BytesIO(frame.encode("PNG")))
+    assert decoded.size == (320, 200) and decoded.convert("RGB").tobytes() == image.tobytes()
+    assert frame.encode("JPEG")[:2] == b"\xff\xd8"
+
+
+def test_local_perception_matches_ocr_text_and_templates_with_confidence():
+    import numpy as np
+
+    from ultragravity.capture import Frame, Region
+    from ultragravity.perception import LocalPerception, TextMatch, normalized_cross_correlation
+
+    seen_sizes = []
+
+    def fake_ocr(image):
+        seen_sizes.append(image.size)
+        return [
+            TextMatch("Chats", Region(4, 6, 40, 12), 0.95),
+            TextMatch("Ayush", Region(60, 6, 40, 12), 0.93),
+            TextMatch("Benny", Region(104, 6, 40, 12), 0.91),
+        ]
+
+    rng = np.random.default_rng(3)
+    screen = rng.integers(0, 255, size=(240, 320, 3), dtype=np.uint8)
+    frame = Frame.from_image(Image.fromarray(screen))
+    perception = LocalPerception(ocr=fake_ocr, match_downscale=2)
+
+    header = Region(left=100, top=0, width=200, height=40)
+    match = perception.find_text(frame, "ayush benny", region=header)
+    assert seen_sizes == [(200, 40)]
+    assert match.found and match.text == "Ayush Benny"
+    assert 0.9 <= match.confidence <= 0.91
+    assert match.box == Region(160, 6, 84, 12)
+    assert perception.find_text(frame, "Priya", region=header).confidence < 0.5
+
+    def missing_binary(image):
+        raise OSError("tesseract is not installed or it's not in your PATH")
+
+    assert LocalPerception(ocr=missing_binary).find_text(frame, "Ayush").source == "unavailable"
+
+    button = Image.fromarray(screen[150:182, 210:258])
+    located = perception.locate_template(frame, button)
+    assert located.confidence > 0.99
+    assert located.box == Region(210, 150, 48, 32)
+    assert located.center == (234, 166)
+
+    flat = np.full((40, 60), 7.0)
+    assert not normalized_cross_correlation(flat, rng.random((8, 8))).any()
+
+
+def test_perception_escalation_reads_model_answers_and_never_routes_on_the_description():
+    from ultragravity.capture import Region
+    from ultragravity.perception import PerceptionResult, perception_from_plan, resolve_perception
+
+    confident = PerceptionResult(found=True, confidence=0.92, source="ocr", text="Send")
+    asked = []
+
+    def ask():
+        asked.append(True)
+        return perception_from_plan({"action": "done"}, 'the text "Please wait"', locate=False)
+
+    assert resolve_perception(confident, min_confidence=0.8, ask_vision=ask) is confident
+    assert asked == []
+
+    unsure = PerceptionResult(found=True, confidence=0.4, source="ocr", text="Pleas wai")
+    # A description containing "wait" still reaches the model; nothing turns it into a wait plan.
+    escalated = resolve_perception(unsure, min_confidence=0.8, ask_vision=ask)
+    assert asked == [True]
+    assert escalated.found and escalated.source == "vision"
+
+    kept = resolve_perception(unsure, min_confidence=0.8, ask_vision=None)
+    assert not kept.found and kept.source == "ocr"
+    assert resolve_perception(None, min_confidence=0.8, ask_vision=None).source == "unavailable"
+
+    header = Region(left=100, top=20, width=200, height=40)
+    located = perception_from_plan(
+        {"action": "click", "target_element": {"coordinates": [30, 12]}}, "the Send button", locate=True, region=header
+    )
+    assert located.found and located.center == (130, 32)
+    assert not perception_from_plan({"action": "fail"}, "the Send button", locate=True).found
+    assert perception_from_plan(None, "the Send button", locate=False).confidence == 0.0
+
+
+def test_vision_agent_perception_escalation_leaves_goal_loop_state_alone(monkeypatch, tmp_path):
+    import pytest
+
+    pytest.importorskip("google.generativeai")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+    from agent.vision import VisionAgent
+    from ultragravity.capture import Frame
+    from ultragravity.config import AppRuntimeConfig
+
+    vision = VisionAgent(runtime_config=AppRuntimeConfig())
+    vision.perception.ocr = None
+    prompts = []
+
+    def fake_request(prompt_text, image_path, frame, operation):
+        prompts.append((prompt_text, operation))
+        return {"action": "done", "target_element": {"description": "", "coordinates": []}, "value": "", "reasoning": ""}, []
+
+    monkeypatch.setattr(vision, "_request_vision_plan", fake_request)
+    vision.last_action = "type"
+    frame = Frame.from_image(Image.new("RGB", (64, 64), color=(20, 20, 20)))
+
+    result = vision.verify_text(frame, "Please wait")
+
+    assert result.found and result.source == "vision"
+    assert len(prompts) == 1 and "Please wait" in prompts[0][0] and prompts[0][1] == "perception"
+    assert vision.last_action == "type"
+    assert vision.state_detector._last_by_mode == {}
+    assert vision.call_reduction_stats["deterministic_shortcuts"] == 0
+    assert vision.vision_cache.stats()["entries"] == 0
+
+
+def test_ax_plan_cache_is_skipped_when_the_last_action_left_the_tree_unchanged(monkeypatch, tmp_path):
+    import json
+
+    import pytest
+
+    pytest.importorskip("google.generativeai")
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    monkeypatch.chdir(tmp_path)
+    from agent.vision import VisionAgent
+    from ultragravity.config import AppRuntimeConfig
+
+    vision = VisionAgent(runtime_config=AppRuntimeConfig())
+    calls = []
+
+    def fake_generate(operation, prompt, max_output_tokens):
+        calls.append(operation)
+        element_id = "e1" if len(calls) == 1 else "e2"
+        return json.dumps({"action": "click", "target_element": {"element_id": element_id}}), []
+
+    monkeypatch.setattr(vision, "_generate_text_with_fallback", fake_generate)
+    elements = '[e1] button "Send"\n[e2] button "Retry"'
+
+    def plan(**kwargs):
+        return vision.plan_from_accessibility_tree("send it", elements, {"e1", "e2"}, **kwargs)
+
+    assert plan()["target_element"]["element_id"] == "e1"
+    assert plan()["target_element"]["element_id"] == "e1" and len(calls) == 1
+    # Clicking e1 changed nothing: ask again instead of replaying it, and cache the new answer.
+    assert plan(state_changed=False)["target_element"]["element_id"] == "e2" and len(calls) == 2
+    assert plan()["target_element"]["element_id"] == "e2" and len(calls) == 2
@@ -60,3 +60,178 @@ def test_context_shaper_delta_context_includes_state_signals():
     assert "changed_by_image=True" in delta
     assert "last_action=scroll" in delta
     assert "url=https://example.com" in delta
+
+
+def test_accessibility_tree_pruned_to_stable_ids_and_rendered_into_text_prompt():
+    from ultragravity.ax_tree import find_element, flatten_accessibility_tree, is_tree_sufficient, serialize_elements
+
+    snapshot = {
+        "role": "WebArea",
+        "name": "Search",
+        "children": [
+            {"role": "heading", "name": "Results"},
+            {"role": "generic", "name": "", "children": [{"role": "link", "name": "Docs"}, {"role": "link", "name": "Docs"}]},
+            {"role": "searchbox", "name": "Query", "value": "python"},
+            {"role": "button", "name": "Search"},
+            {"role": "StaticText", "name": "lots of body text"},
+        ],
+    }
+
+    elements = flatten_accessibility_tree(snapshot)
+    assert [(element.role, element.name, element.nth) for element in elements] == [
+        ("heading", "Results", 0),
+        ("link", "Docs", 0),
+        ("link", "Docs", 1),
+        ("searchbox", "Query", 0),
+        ("button", "Search", 0),
+    ]
+    assert [element.element_id for element in flatten_accessibility_tree(snapshot)] == [
+        element.element_id for element in elements
+    ]
+    assert len({element.element_id for element in elements}) == len(elements)
+    assert is_tree_sufficient(elements, min_interactive=3)
+    assert not is_tree_sufficient(flatten_accessibility_tree({"role": "WebArea", "children": [{"role": "canvas"}]}))
+
+    button = elements[-1]
+    assert find_element(elements, button.element_id) == button
+    serialized = serialize_elements(elements)
+    assert f'[{button.element_id}] button "Search"' in serialized
+    assert 'value="python"' in serialized
+    assert "lots of body text" not in serialized
+
+    prompt = PromptLibrary().build_ax_action_prompt(goal="Search docs", elements=serialized, delta_context="url=x")
+    assert "need_screenshot" in prompt
+    assert prompt.endswith(serialized)
+
+
+def test_prompt_library_marked_prompt_asks_for_mark_id_and_lists_legend():
+    library = PromptLibrary(debug_reasoning=False)
+    prompt = library.build_marked_action_prompt(
+        goal="Open settings",
+        mode="BROWSER",
+        delta_context="State changed",
+        legend='1 button "Settings"\n2 a "Help"',
+    )
+
+    assert "element_id" in prompt
+    assert "numbered boxes" in prompt
+    assert prompt.endswith('Marks:\n1 button "Settings"\n2 a "Help"')
+
+
+def test_streamed_extraction_batches_chunk_and_rank_like_the_whole_text():
+    from ultragravity.context_shaper import ChunkRanker
+    from ultragravity.page_content import iter_page_markdown
+
+    def blocks_for(index):
+        return [
+            {"tag": "h2", "text": f"Section {index}", "main": True},
+            {"tag": "p", "text": f"Paragraph {index} about {'pricing' if index % 7 == 0 else 'history'} " * 6, "main": True},
+        ]
+
+    pages = [[block for index in range(start, start + 9) for block in blocks_for(index)] for start in range(0, 60, 9)]
+
+    class FakePage:
+        def __init__(self):
+            self.calls = []
+
+        def evaluate(self, script, options):
+            self.calls.append(options)
+            index = len(self.calls) - 1
+            return {"blocks": pages[index], "done": index == len(pages) - 1}
+
+    page = FakePage()
+    batches = list(iter_page_markdown(page, batch_chars=4000))
+    assert len(batches) == len(pages) and batches[0].startswith("## Section 0\n\nParagraph 0 about pricing")
+    assert page.calls[0]["reset"] is True and all(call["reset"] is False for call in page.calls[1:])
+
+    shaper = ContextShaper()
+    whole = shaper.chunk_text("".join(batches), chunk_chars=900, overlap_chars=120)
+    assert list(shaper.stream_chunks(iter(batches), chunk_chars=900, overlap_chars=120)) == whole
+
+    ranker = ChunkRanker("pricing plans", top_k=3)
+    for chunk in shaper.stream_chunks(batches, chunk_chars=900, overlap_chars=120):
+        ranker.add(chunk)
+    assert ranker.total == len(whole)
+    assert ranker.ranked() == shaper.rank_chunks(whole, query="pricing plans", top_k=3)
+
+
+def test_content_filter_keeps_main_text_and_drops_boilerplate_and_near_duplicates():
+    from ultragravity.page_content import ContentFilter, iter_page_markdown
+
+    article = "The council approved the new transit budget on Tuesday, adding three bus lines and longer evening service."
+    blocks = [
+        {"tag": "h1", "text": "Transit budget approved", "main": True, "depth": 4},
+        {"tag": "p", "text": article, "main": True, "depth": 5},
+        {"tag": "p", "text": article.replace("Tuesday", "Tuesday,"), "main": True, "depth": 5},
+        {"tag": "p", "text": "We use cookies to improve your experience. Accept all cookies?", "boilerplate": True, "depth": 3},
+        {"tag": "li", "text": "Ten things to do this weekend", "linkChars": 29, "depth": 6},
+        {"tag": "table", "text": "Line\tRoute", "main": True, "depth": 5, "rows": [["Line", "Route"], ["12", "Airport | Centre"]]},
+    ]
+
+    class FakePage:
+        def evaluate(self, script, options):
+            return {"blocks": blocks, "done": True}
+
+    content_filter = ContentFilter()
+    markdown = "".join(iter_page_markdown(FakePage(), content_filter=content_filter))
+
+    assert markdown == (
+        "# Transit budget approved\n\n"
+        f"{article}\n\n"
+        "| Line | Route |\n| --- | --- |\n| 12 | Airport \\| Centre |\n\n"
+    )
+    assert content_filter.dropped_by_reason == {"duplicate": len(blocks[2]["text"]), "boilerplate": 62, "link_dense": 29}
+    assert content_filter.kept_chars + content_filter.dropped_chars == sum(len(block["text"]) for block in blocks)
+
+
+def test_content_defined_chunks_survive_edits_elsewhere_in_the_document():
+    import random
+
+    from ultragravity.context_shaper import ContentDefinedChunker
+
+    rng = random.Random(7)
+    words = ["".join(rng.choice("abcdefghijklmnop") for _ in range(rng.randint(2, 9))) for _ in range(12000)]
+    text = " ".join(words)
+    shaper = ContextShaper()
+
+    chunks = shaper.chunk_content(text, chunk_chars=2000, overlap_chars=200, mode="content_defined")
+    assert all(1000 <= len(chunk) <= 4000 for chunk in chunks[:-1])
+    assert " ".join(chunks).split() == words
+
+    edited = text[:30000] + " a freshly inserted sentence " + text[30000:]
+    edited_chunks = shaper.chunk_content(edited, chunk_chars=2000, overlap_chars=200, mode="content_defined")
+    unchanged = set(chunks) & set(edited_chunks)
+    # Only the chunk(s) around the edit differ; fixed-size chunking would shift every later chunk.
+    assert len(unchanged) >= len(chunks) - 2
+    fixed = set(shaper.chunk_text(text, 2000, 200)) & set(shaper.chunk_text(edited, 2000, 200))
+    assert len(fixed) < len(unchanged) / 2
+
+    pieces = [" ".join(words[start : start + 250]) for start in range(0, len(words), 250)]
+    chunker = ContentDefinedChunker(2000)
+    streamed = [chunk for piece in pieces for chunk in chunker.feed(piece)] + chunker.flush()
+    assert streamed == chunks
+
+
+def test_tree_reduce_plan_bounds_fan_in_and_grows_coverage_with_budget():
+    from ultragravity.context_shaper import plan_tree_reduce
+
+    def plan(budget: int, total: int = 200):
+        return plan_tree_reduce(
+            total_chunks=total,
+            chunk_tokens=875,
+            map_output_tokens=220,
+            merge_output_tokens=420,
+            fan_in=6,
+            token_budget=budget,
+            min_chunks=6,
+        )
+
+    small, large = plan(20_000), plan(120_000)
+    assert 6 <= small.chunk_count < large.chunk_count <= 200
+    assert small.estimated_tokens <= 20_000 and large.estimated_tokens <= 120_000
+    # Each level divides the width by the fan-in: 36 leaves -> 6 -> 1.
+    assert plan(10**9, total=36).levels == 2
+    assert plan(10**9, total=37).levels == 3
+    assert plan(10**9, total=1).calls == 2
+    # The flat mode's top-k is kept even when it alone is over budget.
+    assert plan(100).chunk_count == 6
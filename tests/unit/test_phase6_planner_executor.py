@@ -122,3 +122,69 @@ def test_executor_stops_when_dependency_not_satisfied():
     assert state.aborted is True
     assert state.completed is False
     assert state.records["step1"].status == StepStatus.FAILED
+
+
+def test_executor_checkpoints_deltas_and_resume_skips_succeeded_steps(tmp_path):
+    from ultragravity.checkpoint import ExecutionCheckpointer
+    from ultragravity.memory import MemoryManager, SQLiteMemoryRepository
+    from ultragravity.planner import ExecutionPlan
+
+    steps = [
+        PlanStep(
+            id=f"step{index}",
+            title=f"Step {index}",
+            step_type=StepType.EXECUTE_GOAL_LOOP if index == 3 else StepType.NAVIGATE_URL,
+            risk_level=RiskLevel.R1,
+            checkpoint_required=False,
+            params={"index": index},
+        )
+        for index in (1, 2, 3)
+    ]
+    plan = ExecutionPlan(id="plan-resume", goal="resume-goal", mode="DESKTOP", created_at="now", steps=steps)
+
+    memory = MemoryManager(SQLiteMemoryRepository(db_path=str(tmp_path / "memory.db"), max_events=100))
+    checkpointer = ExecutionCheckpointer(memory)
+    executor = PlanExecutor(checkpoint_broker=CheckpointBroker(input_func=lambda _: "y"), sleep_fn=lambda _: None, checkpointer=checkpointer)
+
+    calls: list[str] = []
+
+    def navigate(step, state):
+        calls.append(step.id)
+        return True, {"current_url": f"https://example.com/{step.id}"}, ""
+
+    def crash(step, state):
+        raise RuntimeError("simulated crash")
+
+    state = ExecutionState(plan_id=plan.id)
+    checkpointer.begin(plan, state)
+    try:
+        executor.execute(plan, {StepType.NAVIGATE_URL: navigate, StepType.EXECUTE_GOAL_LOOP: crash}, state=state)
+    except RuntimeError:
+        pass
+
+    deltas = memory.load_execution_deltas(plan.id)
+    assert deltas
+    assert all("plan" not in delta for delta in deltas)
+
+    fresh = ExecutionCheckpointer(memory)
+    loaded = fresh.load(plan.id)
+    assert loaded is not None
+    restored_plan, restored_state = loaded
+    assert [step.id for step in restored_plan.steps] == ["step1", "step2", "step3"]
+    assert restored_state.records["step1"].status == StepStatus.SUCCEEDED
+    assert restored_state.records["step3"].status == StepStatus.RUNNING
+    assert restored_state.recovery_context["current_url"] == "https://example.com/step2"
+
+    calls.clear()
+    resumed_executor = PlanExecutor(checkpoint_broker=CheckpointBroker(input_func=lambda _: "y"), sleep_fn=lambda _: None, checkpointer=fresh)
+    final = resumed_executor.resume(
+        restored_plan,
+        {StepType.NAVIGATE_URL: navigate, StepType.EXECUTE_GOAL_LOOP: lambda step, state: (True, {}, "")},
+        restored_state,
+    )
+    fresh.finish(restored_plan, final)
+
+    assert calls == []
+    assert final.completed is True
+    assert memory.load_execution_deltas(plan.id) == []
+    assert memory.load_execution_state(plan.id)["state"]["completed"] is True
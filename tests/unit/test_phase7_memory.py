@@ -56,3 +56,96 @@ def test_execution_snapshot_roundtrip(tmp_path):
     assert loaded is not None
     assert loaded["plan_id"] == "plan-123"
     assert loaded["current_step_index"] == 2
+
+
+def test_sqlite_repository_shares_pool_and_migrates_once(tmp_path, monkeypatch):
+    db_path = tmp_path / "memory.db"
+    first = SQLiteMemoryRepository(db_path=str(db_path), max_events=100)
+    second = SQLiteMemoryRepository(db_path=str(db_path), max_events=100)
+    assert first._pool is second._pool
+
+    calls = {"count": 0}
+    original = SQLiteMemoryRepository._apply_migrations
+
+    def counting_migrations(connection):
+        calls["count"] += 1
+        original(connection)
+
+    monkeypatch.setattr(SQLiteMemoryRepository, "_apply_migrations", staticmethod(counting_migrations))
+    first.initialize()
+    second.initialize()
+    assert calls["count"] == 1
+
+    mode = first._connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode.lower() == "wal"
+    first.close()
+    # Closing one repository must not pull connections out from under another.
+    assert second.get_preference("missing") is None
+    second.close()
+
+
+def test_sqlite_repository_supports_concurrent_worker_threads(tmp_path):
+    import threading
+
+    db_path = tmp_path / "memory.db"
+    repo = SQLiteMemoryRepository(db_path=str(db_path), max_events=1000)
+    repo.initialize()
+    errors: list[Exception] = []
+
+    def worker(worker_id: int) -> None:
+        try:
+            for index in range(20):
+                repo.add_event(
+                    session_id=f"worker-{worker_id}",
+                    kind="task_success",
+                    content=f"worker {worker_id} event {index}",
+                    metadata={},
+                )
+            repo.set_preference(f"worker-{worker_id}", "done")
+        except Exception as exc:  # pragma: no cover - surfaced by assertion below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(worker_id,)) for worker_id in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(repo.list_recent_events(limit=500)) == 80
+    assert repo.get_preference("worker-3") == "done"
+    # Worker connections are closed as their threads exit; only this thread's remains.
+    assert repo._pool.open_connections == 1
+    repo.close()
+    assert repo._pool.open_connections == 0
+
+
+def test_page_content_cache_prefers_fingerprint_over_validator_and_keeps_chunk_summaries(tmp_path):
+    from ultragravity.page_cache import PageContentCache, chunk_hash, normalize_url, validator_from_headers
+
+    assert normalize_url("HTTPS://Example.com:443/docs/?b=2&utm_source=x&a=1#intro") == "https://example.com/docs?a=1&b=2"
+    assert validator_from_headers({"ETag": 'W/"v1"', "Last-Modified": "Mon"}) == 'etag:W/"v1"'
+
+    now = {"value": 1000.0}
+    cache = PageContentCache(tmp_path / "page_cache.db", ttl_seconds=60, max_pages=2, clock=lambda: now["value"])
+    cache.put_page("https://example.com/docs#top", "# Docs", ["chunk one", "chunk two"], validator='etag:"v1"', fingerprint="abc:6")
+
+    assert cache.get_page("https://example.com/docs", validator='etag:"v1"').chunks == ["chunk one", "chunk two"]
+    assert cache.get_page("https://example.com/docs", validator='etag:"v2"', fingerprint="abc:6").markdown == "# Docs"
+    # Same shell ETag, different rendered text: the page changed client-side.
+    assert cache.get_page("https://example.com/docs", validator='etag:"v1"', fingerprint="def:9") is None
+
+    cache.put_chunk_summary(chunk_hash("chunk one"), "Summarize  the docs", "one")
+    changed = [chunk_hash("chunk one"), chunk_hash("chunk two, edited")]
+    assert cache.get_chunk_summaries(changed, "summarize the docs") == {chunk_hash("chunk one"): "one"}
+    assert cache.get_chunk_summaries(changed, "other goal") == {}
+
+    now["value"] += 1
+    cache.put_page("https://example.com/a", "a", [], fingerprint="a")
+    now["value"] += 1
+    cache.put_page("https://example.com/b", "b", [], fingerprint="b")
+    assert cache.get_page("https://example.com/docs", fingerprint="abc:6") is None
+    now["value"] += 120
+    assert cache.get_page("https://example.com/b", fingerprint="b") is None
+    assert cache.stats() == {"hits": 2, "misses": 3}
+    cache.close()
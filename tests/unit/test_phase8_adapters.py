@@ -1,3 +1,8 @@
+import numpy as np
+
+from agent.humanizer import bezier_curve, generate_human_path, human_path_array, path_point_count
+from ultragravity.config import InputSpeedConfig
+from ultragravity.input_speed import InputSpeed, InputSpeedPolicy
 from ultragravity.tools import BrowserAdapter, DesktopAdapter, SkillAdapter
 
 
@@ -56,6 +61,25 @@ def test_browser_adapter_fallback_on_missing_coordinates():
     assert result.payload.get("fallback") == "wait"
 
 
+def test_browser_adapter_accepts_element_id_target_without_coordinates():
+    browser = MockBrowser()
+    adapter = BrowserAdapter(browser)
+
+    result = adapter.execute(
+        "execute_action",
+        {
+            "action_plan": {
+                "action": "click",
+                "target_element": {"description": "Search", "coordinates": [], "element_id": "e1a2b3c"},
+            }
+        },
+    )
+
+    assert result.success is True
+    assert result.payload == {"action": "click"}
+    assert browser.actions[0]["target_element"]["element_id"] == "e1a2b3c"
+
+
 def test_desktop_adapter_requires_coordinates_for_interactive_actions():
     adapter = DesktopAdapter(MockDesktop())
 
@@ -78,3 +102,213 @@ def test_skill_adapter_executes_named_skill():
     result = adapter.execute("execute", {"skill": "SearchSkill", "instruction": "test query"})
     assert result.success is True
     assert result.payload["status"] == "success"
+
+
+def test_input_speed_policy_prefers_longest_site_match_then_tool_then_default():
+    policy = InputSpeedPolicy.from_config(
+        InputSpeedConfig(
+            default="human",
+            tools={"desktop": "fast"},
+            sites={"example.com": "fast", "intranet.example.com": "instant"},
+        )
+    )
+
+    assert policy.resolve("browser", "https://intranet.example.com/login") is InputSpeed.INSTANT
+    assert policy.resolve("browser", "https://www.example.com/") is InputSpeed.FAST
+    assert policy.resolve("browser", "https://notexample.com/") is InputSpeed.HUMAN
+    assert policy.resolve("browser") is InputSpeed.HUMAN
+    assert policy.resolve("desktop") is InputSpeed.FAST
+
+
+def test_humanizer_paths_are_vectorized_distance_scaled_and_end_on_target():
+    assert path_point_count(5) < path_point_count(400) < path_point_count(3000)
+    assert path_point_count(10_000) == path_point_count(100_000)
+
+    curve = bezier_curve((0, 0), (100, 0), [(30, 0), (60, 0)], num_points=5)
+    assert curve[0] == (0.0, 0.0)
+    assert curve[-1] == (100.0, 0.0)
+    assert len(curve) == 5
+
+    for _ in range(20):
+        path = human_path_array((10, 20), (410, 320))
+        assert path.shape == (path_point_count(500), 2)
+        assert tuple(path[0]) == (10.0, 20.0)
+        assert tuple(path[-1]) == (410.0, 320.0)
+
+    assert generate_human_path((5, 5), (5, 5))[-1] == (5.0, 5.0)
+
+    # Cached templates must not cap the variety of shapes for moves of similar length.
+    shapes = {tuple(np.round(human_path_array((0, 0), (500, 0))[:, 1], 3)) for _ in range(100)}
+    assert len(shapes) == 100
+
+
+def test_fetch_pages_bounds_open_tabs_applies_per_tab_timeout_and_keeps_order():
+    from skills.research import ResearchSkill
+    from ultragravity.page_content import BODY_TEXT_SCRIPT, FALLBACK_PREFIX, fetch_pages
+
+    class TimeoutError(Exception):
+        pass
+
+    class FakePage:
+        def __init__(self, context):
+            self.context = context
+            self.url = ""
+            context.open_pages += 1
+            context.peak = max(context.peak, context.open_pages)
+
+        def evaluate(self, script, arg=None):
+            if isinstance(arg, str):
+                # Starting a navigation returns at once; only the collect phase waits.
+                self.target = arg
+                self.context.events.append(("start", arg))
+                return None
+            if script == BODY_TEXT_SCRIPT:
+                return "plain text"
+            if "a.test/4" in self.url:
+                return {"blocks": [], "done": True}
+            article = f"Findings reported at {self.url} about the transit budget and its schedule."
+            return {
+                "blocks": [
+                    {"tag": "h1", "text": self.url, "main": True},
+                    {"tag": "p", "text": article, "main": True},
+                    {"tag": "p", "text": "Subscribe to our newsletter for more updates today", "boilerplate": True},
+                ],
+                "done": True,
+            }
+
+        def wait_for_url(self, predicate, wait_until, timeout):
+            self.context.timeouts.append(timeout)
+            self.context.events.append(("wait", self.target))
+            if "slow" in self.target:
+                raise TimeoutError("load timed out")
+            self.url = "chrome-error://chromewebdata/" if "broken" in self.target else self.target
+            assert predicate(self.url)
+
+        def title(self):
+            return self.url.rsplit("/", 1)[-1]
+
+        def close(self):
+            self.context.open_pages -= 1
+
+    class FakeContext:
+        def __init__(self):
+            self.open_pages = 0
+            self.peak = 0
+            self.timeouts = []
+
+            self.events = []
+
+        def new_page(self):
+            if len([event for event in self.events if event[0] == "start"]) == 5:
+                raise RuntimeError("Target closed")
+            return FakePage(self)
+
+    context = FakeContext()
+    urls = ["https://a.test/1", "https://slow.test/2", "https://broken.test/3", "https://a.test/4", "https://a.test/5", "https://a.test/6"]
+    pages = fetch_pages(context, urls, max_concurrency=2, timeout_seconds=3.0)
+
+    assert [page.url for page in pages] == urls
+    assert [page.status for page in pages] == ["ok", "timeout", "error", "ok", "ok", "error"]
+    # Both tabs of the window were navigating before the first one was waited on.
+    assert context.events[:3] == [("start", urls[0]), ("start", urls[1]), ("wait", urls[0])]
+    # Sources go through the scored block filter: chrome is dropped and counted.
+    assert pages[0].content.startswith("# https://a.test/1\n") and "transit budget" in pages[0].content
+    assert "newsletter" not in pages[0].content and pages[0].title == "1"
+    assert pages[0].kept_chars > 0 and pages[0].dropped_chars > 0
+    assert pages[3].content == FALLBACK_PREFIX + "plain text"
+    assert context.peak == 2 and context.open_pages == 0
+    assert all(timeout <= 3000 for timeout in context.timeouts)
+
+    hrefs = [
+        "//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fa&rut=x",
+        "//duckduckgo.com/l/?uddg=https%3A%2F%2Fduckduckgo.com%2Fy.js%3Fad",
+        "https://example.org/b",
+        "//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fa",
+        "https://example.net/c",
+    ]
+    assert ResearchSkill.result_urls(hrefs, limit=2) == ["https://example.com/a", "https://example.org/b"]
+
+
+def test_request_router_blocks_by_preset_and_serves_repeat_assets_from_disk(tmp_path):
+    from types import SimpleNamespace
+
+    from ultragravity.request_policy import HttpAssetCache, RequestPolicy, RequestRouter
+
+    reader = RequestPolicy.from_preset("reader", extra_blocked_domains=["ads.example"], allowed_domains=["cdn.trusted.com"])
+    assert reader.should_block("image", "https://site.test/a.png")
+    assert reader.should_block("script", "https://stats.g.doubleclick.net/x.js")
+    assert reader.should_block("script", "https://pixel.ads.example/t.js")
+    assert not reader.should_block("image", "https://img.cdn.trusted.com/a.png")
+    assert not reader.should_block("document", "https://site.test/")
+    assert not RequestPolicy.from_preset("full").should_block("image", "https://doubleclick.net/a.png")
+
+    class FakeRoute:
+        def __init__(self, url, resource_type, cache_control="max-age=600"):
+            self.request = SimpleNamespace(url=url, resource_type=resource_type, method="GET")
+            self.cache_control = cache_control
+            self.outcome = None
+            self.fetched = False
+
+        def abort(self, reason):
+            self.outcome = ("abort", reason)
+
+        def continue_(self):
+            self.outcome = ("continue",)
+
+        def fetch(self):
+            self.fetched = True
+            return SimpleNamespace(status=200, headers={"content-type": "text/css", "cache-control": self.cache_control}, body=lambda: b"body{}")
+
+        def fulfill(self, **kwargs):
+            self.outcome = ("fulfill", kwargs.get("body"))
+
+    router = RequestRouter(RequestPolicy.from_preset("balanced"), HttpAssetCache(tmp_path / "http_cache"))
+    first = FakeRoute("https://site.test/app.css", "stylesheet")
+    second = FakeRoute("https://site.test/app.css", "stylesheet")
+    uncacheable = FakeRoute("https://site.test/live.css", "stylesheet", cache_control="no-store")
+    tracker = FakeRoute("https://www.google-analytics.com/analytics.js", "script")
+    document = FakeRoute("https://site.test/", "document")
+    for route in (first, second, uncacheable, FakeRoute("https://site.test/live.css", "stylesheet", "no-store"), tracker, document):
+        router.handle(route)
+    # Network bytes come from requestfinished for every request; the cache-served one is skipped.
+    for route, body_size in ((first, 6), (second, 6), (document, 1000)):
+        route.request.sizes = lambda size=body_size: {"responseBodySize": size}
+        router.on_request_finished(route.request)
+
+    assert first.fetched and first.outcome == ("fulfill", b"body{}")
+    assert not second.fetched and second.outcome == ("fulfill", b"body{}")
+    assert tracker.outcome == ("abort", "blockedbyclient")
+    assert document.outcome == ("continue",)
+    assert router.stats.as_counters() == {
+        "requests": 6,
+        "blocked": 1,
+        "cache_hits": 1,
+        "cache_stores": 1,
+        "bytes_from_cache": 6,
+        "cache_miss_bytes": 18,
+        "bytes_downloaded": 1006,
+    }
+
+    small = HttpAssetCache(tmp_path / "small", max_bytes=10)
+    small.put("https://a.test/1.js", 200, {}, b"12345678")
+    small.put("https://a.test/2.js", 200, {}, b"12345678")
+    assert small.get("https://a.test/1.js") is None
+    assert small.get("https://a.test/2.js")[2] == b"12345678"
+
+
+def test_browser_execute_action_fails_when_an_element_id_cannot_be_resolved():
+    import pytest
+
+    pytest.importorskip("playwright")
+    from agent.browser import BrowserAgent
+
+    browser = BrowserAgent()
+    clicks = []
+    browser.human_click = lambda x, y: clicks.append((x, y))
+
+    with pytest.raises(LookupError):
+        browser.execute_action({"action": "click", "target_element": {"element_id": "e404", "coordinates": []}})
+    assert clicks == []
+
+    browser.execute_action({"action": "click", "target_element": {"element_id": "e404", "coordinates": [4, 5]}})
+    assert clicks == [(4, 5)]
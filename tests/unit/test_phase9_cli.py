@@ -92,3 +92,272 @@ def test_policy_command_invalid_value(tmp_path):
 
     code = _handle_policy_command("invalid-profile", str(config_path))
     assert code == 2
+
+
+def test_collect_telemetry_stats_reads_binary_segments_and_rollups(tmp_path):
+    from ultragravity.telemetry import ProviderTelemetry
+    from ultragravity.telemetry_store import TelemetryStore
+
+    telemetry_dir = tmp_path / "telemetry"
+    telemetry = ProviderTelemetry(log_dir=telemetry_dir, rollup_flush_every=3)
+    for index in range(5):
+        telemetry.record(
+            provider="gemini",
+            model="gemini-2.5-flash",
+            operation="analyze_image",
+            estimated_tokens=100,
+            actual_tokens=90,
+            latency_ms=200 + index,
+            success=index != 4,
+            error="429 rate limit" if index == 4 else None,
+        )
+
+    assert not list(telemetry_dir.glob("*.jsonl"))
+    rollups = TelemetryStore(telemetry_dir).load_rollups()
+    assert rollups["totals"]["gemini"]["requests"] == 3
+
+    stats = _collect_telemetry_stats(telemetry_dir)
+    assert stats["gemini"]["requests"] == 5
+    assert stats["gemini"]["failures"] == 1
+    assert stats["gemini"]["actual_tokens"] == 450
+
+    telemetry.close()
+    tail = TelemetryStore(telemetry_dir).read_tail(2)
+    assert [record.latency_ms for _, record in tail] == [203, 204]
+    assert tail[-1][1].error == "429 rate limit"
+    assert TelemetryStore(telemetry_dir).load_rollups()["totals"]["gemini"]["requests"] == 5
+
+
+def test_trace_spans_nest_through_scheduler_and_render_flame_summary(tmp_path, capsys):
+    from ultragravity.budget import BudgetManager, ProviderBudgetLimits
+    from ultragravity.cli import _print_trace
+    from ultragravity.scheduler import ProviderCallRequest, ProviderScheduler
+    from ultragravity.telemetry import ProviderTelemetry
+    from ultragravity.tracing import JsonlSpanExporter, Tracer, flame_summary, get_tracer, load_trace, set_tracer, trace_span
+
+    previous = get_tracer()
+    exporter = JsonlSpanExporter(tmp_path / "traces")
+    set_tracer(Tracer(exporter))
+    try:
+        scheduler = ProviderScheduler(
+            budget_manager=BudgetManager(
+                limits_by_provider={"gemini": ProviderBudgetLimits(rpm_limit=10, tpm_limit=10000, daily_request_limit=10)},
+                clock=lambda: 1000.0,
+            ),
+            telemetry=ProviderTelemetry(log_dir=tmp_path / "telemetry"),
+            sleep_fn=lambda _: None,
+        )
+        with trace_span("session.execute", trace_id="plan123"):
+            for iteration in range(2):
+                with trace_span("goal_loop.iteration", iteration=iteration + 1):
+                    scheduler.execute(
+                        ProviderCallRequest(
+                            provider="gemini",
+                            model="flash",
+                            operation="analyze_image",
+                            estimated_tokens=10,
+                            call=lambda: "ok",
+                        )
+                    )
+        scheduler.telemetry.close()
+    finally:
+        set_tracer(previous)
+
+    spans = load_trace(exporter.trace_path("plan123"))
+    assert {span["trace_id"] for span in spans} == {"plan123"}
+    rows = {row["path"]: row for row in flame_summary(spans)}
+    assert rows[("session.execute", "goal_loop.iteration")]["count"] == 2
+    assert rows[("session.execute", "goal_loop.iteration", "scheduler.execute", "provider.call")]["count"] == 2
+
+    assert _print_trace("plan1", tmp_path / "traces") == 0
+    output = capsys.readouterr().out
+    assert "Trace plan123" in output
+    assert "      provider.call" in output
+    assert _print_trace("missing", tmp_path / "traces") == 1
+
+
+def test_approval_stats_index_resumes_from_offset_and_tail_reads_backwards(tmp_path):
+    from ultragravity.log_index import tail_lines
+
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir(parents=True)
+    log_path = audit_dir / "actions-20260301.jsonl"
+    approved = '{"event_type":"permission_outcome","permission":{"approved":true}}\n'
+    log_path.write_text(approved * 3, encoding="utf-8")
+
+    assert _collect_approval_stats(audit_dir)["approved"] == 3
+    assert (audit_dir / ".approval_index.json").exists()
+
+    with log_path.open("a", encoding="utf-8") as output:
+        output.write('{"event_type":"permission_outcome","permission":{"approved":false}}\n')
+        output.write('{"event_type":"permission_outcome"')
+    stats = _collect_approval_stats(audit_dir)
+    assert stats == {"prompted": 4, "approved": 3, "denied": 1}
+
+    with log_path.open("a", encoding="utf-8") as output:
+        output.write(',"permission":{"approved":true}}\n')
+    assert _collect_approval_stats(audit_dir)["approved"] == 4
+
+    log_path.write_text(approved, encoding="utf-8")
+    assert _collect_approval_stats(audit_dir)["prompted"] == 1
+
+    numbered = tmp_path / "numbered.log"
+    numbered.write_text("".join(f"line-{index}\n" for index in range(1000)), encoding="utf-8")
+    assert tail_lines(numbered, 3, block_size=16) == ["line-997", "line-998", "line-999"]
+    assert tail_lines(numbered, 5000)[0] == "line-0"
+
+
+def test_print_logs_tails_newest_files_first(tmp_path, monkeypatch, capsys):
+    import os
+
+    import ultragravity.cli as cli
+
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir()
+    older = audit_dir / "actions-20260301.jsonl"
+    newer = audit_dir / "actions-20260302.jsonl"
+    older.write_text("".join(f'{{"n":{index}}}\n' for index in range(5)), encoding="utf-8")
+    newer.write_text('{"n":5}\n{"n":6}\n', encoding="utf-8")
+    os.utime(older, (1_000, 1_000))
+    monkeypatch.setattr(cli, "DEFAULT_AUDIT_LOG_DIR", audit_dir)
+
+    assert cli._print_logs("audit", 3) == 0
+    output = capsys.readouterr().out.splitlines()
+    assert output == [
+        '[actions-20260301.jsonl] {"n":4}',
+        '[actions-20260302.jsonl] {"n":5}',
+        '[actions-20260302.jsonl] {"n":6}',
+    ]
+
+
+def test_log_retention_compresses_expires_and_stays_readable(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from ultragravity.audit import AuditLogger
+    from ultragravity.log_index import tail_lines
+    from ultragravity.log_retention import LogRetentionPolicy, apply_log_retention
+    from ultragravity.telemetry_store import TelemetryRecord, TelemetryStore
+
+    audit_dir = tmp_path / "audit"
+    audit_dir.mkdir()
+    approved = '{"event_type":"permission_outcome","permission":{"approved":true}}\n'
+    (audit_dir / "actions-20260101.jsonl").write_text(approved, encoding="utf-8")
+    (audit_dir / "actions-20260309.jsonl").write_text(approved * 2, encoding="utf-8")
+    (audit_dir / "actions-20260310.jsonl").write_text(approved, encoding="utf-8")
+    assert _collect_approval_stats(audit_dir)["approved"] == 4
+
+    policy = LogRetentionPolicy(compression="gzip", compress_after_days=1, retention_days=30)
+    report = apply_log_retention(audit_dir, "actions-", policy, now=datetime(2026, 3, 10, 12, tzinfo=timezone.utc))
+    assert report["deleted"] == 1
+    assert report["compressed"] == 1
+    assert sorted(path.name for path in audit_dir.glob("actions-*")) == [
+        "actions-20260309.jsonl.gz",
+        "actions-20260310.jsonl",
+    ]
+    assert _collect_approval_stats(audit_dir)["approved"] == 3
+    assert len(tail_lines(audit_dir / "actions-20260309.jsonl.gz", 10)) == 2
+
+    logger = AuditLogger(log_dir=tmp_path / "rotating", max_segment_bytes=200)
+    for index in range(10):
+        logger.write_event("tick", {"index": index, "padding": "x" * 40})
+    parts = sorted((tmp_path / "rotating").glob("actions-*.jsonl"))
+    assert len(parts) > 1
+    assert sum(len(path.read_text(encoding="utf-8").splitlines()) for path in parts) == 10
+
+    store = TelemetryStore(tmp_path / "telemetry")
+    store.append(TelemetryRecord(1.0, "gemini", "flash", "analyze_image", 10, 12, 300, True))
+    store.close()
+    segment = store.segments()[0]
+    assert store.is_folded(segment)
+    later = datetime.now(timezone.utc) + timedelta(days=2)
+    apply_log_retention(store.log_dir, "provider-", policy, can_compress=store.is_folded, now=later)
+    assert not segment.exists()
+    assert [record.latency_ms for _, record in store.read_tail(5)] == [300]
+    assert store.provider_totals()["gemini"]["requests"] == 1
+
+
+def test_log_retention_size_cap_never_deletes_unfolded_segments(tmp_path):
+    from datetime import datetime, timezone
+
+    from ultragravity.log_retention import LogRetentionPolicy, apply_log_retention
+
+    for day in ("20260301", "20260302", "20260303", "20260304"):
+        (tmp_path / f"provider-{day}.bin").write_bytes(b"x" * 100)
+    unfolded = {"provider-20260301.bin", "provider-20260303.bin"}
+
+    policy = LogRetentionPolicy(compression="none", retention_days=2, max_total_bytes=250)
+    report = apply_log_retention(
+        tmp_path,
+        "provider-",
+        policy,
+        can_compress=lambda path: path.name not in unfolded,
+        now=datetime(2026, 3, 5, tzinfo=timezone.utc),
+    )
+
+    # Both folded segments go (one by age, one by size); the unfolded ones wait for their rollup.
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(unfolded)
+    assert report["deleted"] == 2
+
+def test_browser_service_status_reports_running_service_and_clears_stale_state(tmp_path, capsys):
+    import json
+    import os
+
+    from ultragravity.browser_service import BrowserService
+    from ultragravity.cli import _handle_browser_command
+    from ultragravity.config import AppRuntimeConfig
+
+    state_path = tmp_path / "browser_service.json"
+    config = AppRuntimeConfig.model_validate({"browser_service": {"state_path": str(state_path)}})
+
+    assert _handle_browser_command("status", config) == 1
+    assert "not running" in capsys.readouterr().out
+
+    info = {
+        "pid": os.getpid(),
+        "port": 9333,
+        "endpoint": "http://127.0.0.1:9333",
+        "profile_dir": "data/browser_profile",
+        "headless": True,
+        "started_at": "2026-01-01T00:00:00+00:00",
+    }
+    state_path.write_text(json.dumps(info), encoding="utf-8")
+    live = BrowserService(state_path=state_path, probe=lambda endpoint: True)
+    assert live.endpoint() == "http://127.0.0.1:9333"
+    assert live.start().pid == os.getpid()
+
+    dead = BrowserService(state_path=state_path, probe=lambda endpoint: False)
+    assert dead.endpoint() is None
+    assert not state_path.exists()
+    assert dead.stop() is False
+
+    # A stale state file whose pid now belongs to another process (here: this test) is never signalled.
+    state_path.write_text(json.dumps(info), encoding="utf-8")
+    assert dead.owns_process(dead.read_info()) is False
+    assert dead.stop() is False
+    assert not state_path.exists()
+
+
+def test_parallel_map_keeps_worker_spans_in_the_callers_trace(tmp_path):
+    from ultragravity.tracing import JsonlSpanExporter, Tracer, get_tracer, load_trace, parallel_map, set_tracer, trace_span
+
+    previous = get_tracer()
+    exporter = JsonlSpanExporter(tmp_path / "traces")
+    set_tracer(Tracer(exporter))
+
+    def summarize(index: int) -> str:
+        with trace_span("vision.summarize_chunk", index=index):
+            with trace_span("provider.call"):
+                return f"summary-{index}"
+
+    try:
+        with trace_span("vision.summarize_content", trace_id="run42") as root:
+            results = parallel_map(summarize, list(range(6)), max_workers=3, thread_name_prefix="summarize")
+    finally:
+        set_tracer(previous)
+
+    assert results == [f"summary-{index}" for index in range(6)]
+    assert [path.name for path in (tmp_path / "traces").iterdir()] == ["trace-run42.jsonl"]
+    spans = load_trace(exporter.trace_path("run42"))
+    assert len(spans) == 13
+    chunk_spans = [span for span in spans if span["name"] == "vision.summarize_chunk"]
+    assert {span["parent_id"] for span in chunk_spans} == {root.span_id}
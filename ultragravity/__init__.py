@@ -8,6 +8,7 @@ from .call_reduction import (
 	StateChangeDetector,
 	StateSnapshot,
 	TTLCache,
+	build_marked_vision_cache_key,
 	build_summary_cache_key,
 	build_tool_cache_key,
 	build_vision_cache_key,
@@ -20,6 +21,7 @@ from .planner import ExecutionPlan, PlanStep, Planner, StepRetryPolicy, StepType
 from .policy import PolicyEngine, PolicyProfile
 from .scheduler import ProviderCallRequest, ProviderCallResult, ProviderScheduler
 from .executor import CheckpointBroker, ExecutionState, PlanExecutor, StepExecutionRecord, StepStatus
+from .checkpoint import ExecutionCheckpointer
 from .state_machine import SessionPhase, SessionStateMachine
 from .telemetry import ProviderTelemetry
 from .prompt_library import PromptLibrary
@@ -60,6 +62,7 @@ __all__ = [
 	"DeterministicRouter",
 	"TTLCache",
 	"build_vision_cache_key",
+	"build_marked_vision_cache_key",
 	"build_summary_cache_key",
 	"build_tool_cache_key",
 	"PermissionBroker",
@@ -73,6 +76,7 @@ __all__ = [
 	"ExecutionState",
 	"StepExecutionRecord",
 	"StepStatus",
+	"ExecutionCheckpointer",
 	"SessionPhase",
 	"SessionStateMachine",
 	"PolicyEngine",
@@ -1,25 +1,157 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import os
+import queue
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+FSYNC_POLICIES = {"never", "batch", "always"}
+
+logger = logging.getLogger("AuditLogger")
+
 
 class AuditLogger:
-    def __init__(self, log_dir: str | Path = "logs/audit"):
+    def __init__(
+        self,
+        log_dir: str | Path = "logs/audit",
+        buffered: bool = False,
+        queue_size: int = 1000,
+        batch_size: int = 64,
+        flush_interval_seconds: float = 0.5,
+        fsync_policy: str = "never",
+        max_segment_bytes: int = 0,
+    ):
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown audit fsync policy: {fsync_policy}")
+        self.fsync_policy = fsync_policy
+        self.max_segment_bytes = max(0, max_segment_bytes)
+        self.buffered = buffered
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = max(0.01, flush_interval_seconds)
+        self._queue: queue.Queue[tuple[str, dict[str, Any]] | None] = queue.Queue(maxsize=max(1, queue_size))
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        # Held across the closed check and the enqueue so no record lands behind close()'s sentinel.
+        self._state_lock = threading.Lock()
+        if buffered:
+            self._writer = threading.Thread(target=self._drain, name="AuditLoggerWriter", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
 
-    def _log_path(self) -> Path:
-        stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    def _log_path(self, stamp: str | None = None) -> Path:
+        stamp = stamp or datetime.now(timezone.utc).strftime("%Y%m%d")
         return self.log_dir / f"actions-{stamp}.jsonl"
 
+    def _rotate_if_full(self, path: Path) -> None:
+        """Renames a day file past ``max_segment_bytes`` to the next free ``.N`` part."""
+        if not self.max_segment_bytes:
+            return
+        try:
+            if path.stat().st_size < self.max_segment_bytes:
+                return
+        except OSError:
+            return
+        stem = path.name[: -len(".jsonl")]
+        part = 1
+        while any(path.with_name(f"{stem}.{part}.jsonl{suffix}").exists() for suffix in ("", ".gz", ".zst")):
+            part += 1
+        path.rename(path.with_name(f"{stem}.{part}.jsonl"))
+
     def write_event(self, event_type: str, payload: dict[str, Any]) -> None:
+        now = datetime.now(timezone.utc)
         record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": now.isoformat(),
             "event_type": event_type,
             **payload,
         }
-        with self._log_path().open("a", encoding="utf-8") as output:
-            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        item = (now.strftime("%Y%m%d"), record)
+        if self._writer is None:
+            self._write_batch([item])
+            return
+        with self._state_lock:
+            # Waits while the queue is full (audit records are never dropped), but
+            # falls back to writing inline once the writer is closed or has died.
+            while not self._closed and self._writer.is_alive():
+                try:
+                    self._queue.put(item, timeout=self.flush_interval_seconds)
+                    return
+                except queue.Full:
+                    continue
+        self._write_batch([item])
+
+    def _write_batch(self, batch: list[tuple[str, dict[str, Any]]]) -> None:
+        lines_by_stamp: dict[str, list[str]] = {}
+        for stamp, record in batch:
+            lines_by_stamp.setdefault(stamp, []).append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+        for stamp, lines in lines_by_stamp.items():
+            path = self._log_path(stamp)
+            self._rotate_if_full(path)
+            with path.open("a", encoding="utf-8") as output:
+                if self.fsync_policy == "always":
+                    for line in lines:
+                        output.write(line)
+                        output.flush()
+                        os.fsync(output.fileno())
+                    continue
+                output.write("".join(lines))
+                if self.fsync_policy == "batch":
+                    output.flush()
+                    os.fsync(output.fileno())
+
+    def _drain(self) -> None:
+        stop = False
+        while not stop:
+            try:
+                item = self._queue.get(timeout=self.flush_interval_seconds)
+            except queue.Empty:
+                continue
+
+            batch: list[tuple[str, dict[str, Any]]] = []
+            taken = 1
+            if item is None:
+                stop = True
+            else:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is None:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+            except Exception:
+                # One bad batch (full disk, unserializable payload) must not stop the writer.
+                logger.exception("Failed to write %d audit records", len(batch))
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+
+    def flush(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        with self._state_lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._writer.is_alive():
+                self._queue.put(None)
+        self._writer.join()
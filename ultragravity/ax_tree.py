@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any
+
+INTERACTIVE_ROLES = {
+    "button",
+    "checkbox",
+    "combobox",
+    "link",
+    "listbox",
+    "menuitem",
+    "menuitemcheckbox",
+    "menuitemradio",
+    "option",
+    "radio",
+    "searchbox",
+    "slider",
+    "spinbutton",
+    "switch",
+    "tab",
+    "textbox",
+    "treeitem",
+}
+CONTEXT_ROLES = {"heading", "dialog", "alert", "alertdialog"}
+TEXT_INPUT_ROLES = {"textbox", "searchbox", "combobox", "spinbutton"}
+
+
+@dataclass(frozen=True)
+class AXElement:
+    element_id: str
+    role: str
+    name: str
+    nth: int
+    role_nth: int = 0
+    value: str = ""
+    depth: int = 0
+    checked: str = ""
+    disabled: bool = False
+
+    @property
+    def interactive(self) -> bool:
+        return self.role in INTERACTIVE_ROLES
+
+    def to_line(self, max_name_chars: int = 80) -> str:
+        parts = [f"[{self.element_id}]" if self.interactive else "-", self.role, f'"{self.name[:max_name_chars]}"']
+        if self.value:
+            parts.append(f'value="{self.value}"')
+        if self.checked:
+            parts.append(f"checked={self.checked}")
+        if self.disabled:
+            parts.append("disabled")
+        return "  " * min(self.depth, 4) + " ".join(parts)
+
+
+def _element_id(role: str, name: str, nth: int) -> str:
+    # Derived from what the locator matches on, so ids survive re-renders.
+    digest = hashlib.sha1(f"{role}|{name}|{nth}".encode("utf-8")).hexdigest()
+    return f"e{digest[:6]}"
+
+
+def flatten_accessibility_tree(snapshot: dict[str, Any] | None, max_nodes: int = 150) -> list[AXElement]:
+    """Prunes a Playwright accessibility snapshot to interactive and named landmark nodes.
+
+    ``nth`` counts earlier nodes with the same role and name so that
+    ``page.get_by_role(role, name=name, exact=True).nth(nth)`` resolves to the
+    same element the model picked; ``role_nth`` does the same for unnamed nodes.
+    """
+    elements: list[AXElement] = []
+    seen: dict[tuple[str, str], int] = {}
+    seen_roles: dict[str, int] = {}
+    if not snapshot:
+        return elements
+
+    stack: list[tuple[dict[str, Any], int]] = [(snapshot, 0)]
+    while stack and len(elements) < max_nodes:
+        node, depth = stack.pop()
+        role = str(node.get("role") or "")
+        name = " ".join(str(node.get("name") or "").split())
+        if role in INTERACTIVE_ROLES or (role in CONTEXT_ROLES and name):
+            nth = seen.get((role, name), 0)
+            seen[(role, name)] = nth + 1
+            role_nth = seen_roles.get(role, 0)
+            seen_roles[role] = role_nth + 1
+            checked = node.get("checked")
+            elements.append(
+                AXElement(
+                    element_id=_element_id(role, name, nth),
+                    role=role,
+                    name=name,
+                    nth=nth,
+                    role_nth=role_nth,
+                    value=str(node.get("value") or "")[:80],
+                    depth=depth,
+                    checked="" if checked is None else str(checked).lower(),
+                    disabled=bool(node.get("disabled")),
+                )
+            )
+        children = node.get("children") or []
+        for child in reversed(children):
+            if isinstance(child, dict):
+                stack.append((child, depth + 1))
+    return elements
+
+
+def serialize_elements(elements: list[AXElement]) -> str:
+    return "\n".join(element.to_line() for element in elements)
+
+
+def is_tree_sufficient(elements: list[AXElement], min_interactive: int = 1) -> bool:
+    """False for canvas-heavy or unlabeled pages where only a screenshot helps."""
+    named_interactive = [element for element in elements if element.interactive and element.name]
+    return len(named_interactive) >= max(1, min_interactive)
+
+
+def find_element(elements: list[AXElement], element_id: str) -> AXElement | None:
+    for element in elements:
+        if element.element_id == element_id:
+            return element
+    return None
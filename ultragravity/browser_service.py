@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+import os
+import signal
+import subprocess
+import time
+import urllib.request
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+BLANK_PAGE = "about:blank"
+
+# True for exactly one caller per blank document; navigating the tab away resets it.
+CLAIM_PAGE_SCRIPT = """
+() => {
+    if (window.__ultragravityClaimed) { return false; }
+    window.__ultragravityClaimed = true;
+    return true;
+}
+"""
+
+
+@dataclass(frozen=True)
+class BrowserServiceInfo:
+    pid: int
+    port: int
+    endpoint: str
+    profile_dir: str
+    headless: bool
+    started_at: str
+
+
+def probe_cdp_endpoint(endpoint: str, timeout_seconds: float = 1.0) -> bool:
+    """True when a Chromium DevTools endpoint answers ``/json/version``."""
+    try:
+        with urllib.request.urlopen(f"{endpoint}/json/version", timeout=timeout_seconds) as response:
+            return response.status == 200 and "webSocketDebuggerUrl" in json.loads(response.read() or b"{}")
+    except Exception:
+        return False
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _process_command_line(pid: int) -> str:
+    try:
+        return Path(f"/proc/{pid}/cmdline").read_bytes().replace(b"\0", b" ").decode("utf-8", "replace")
+    except OSError:
+        pass
+    try:
+        return subprocess.run(
+            ["ps", "-p", str(pid), "-o", "command="], capture_output=True, text=True, timeout=2.0
+        ).stdout
+    except Exception:
+        return ""
+
+
+def _default_executable() -> str:
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as playwright:
+        return playwright.chromium.executable_path
+
+
+class BrowserService:
+    """A long-lived Chromium that runs attach to over CDP instead of launching their own.
+
+    The state file records the process and its DevTools endpoint; that loopback
+    endpoint is the control channel. ``warm_pages`` blank tabs are opened at
+    launch and handed back blank after each run, so an attaching task starts on
+    a ready page. With a ``profile_dir`` logins and the HTTP cache persist
+    across runs.
+    """
+
+    def __init__(
+        self,
+        state_path: str | Path = "data/browser_service.json",
+        port: int = 9333,
+        profile_dir: str | Path = "data/browser_profile",
+        headless: bool = False,
+        warm_pages: int = 2,
+        executable_path: str | None = None,
+        probe: Callable[[str], bool] = probe_cdp_endpoint,
+    ):
+        self.state_path = Path(state_path)
+        self.port = port
+        self.profile_dir = Path(profile_dir)
+        self.headless = headless
+        self.warm_pages = max(1, warm_pages)
+        self.executable_path = executable_path
+        self.probe = probe
+
+    def read_info(self) -> BrowserServiceInfo | None:
+        try:
+            return BrowserServiceInfo(**json.loads(self.state_path.read_text(encoding="utf-8")))
+        except Exception:
+            return None
+
+    def _write_info(self, info: BrowserServiceInfo) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(asdict(info), indent=2), encoding="utf-8")
+        os.replace(temp_path, self.state_path)
+
+    def is_alive(self, info: BrowserServiceInfo | None) -> bool:
+        return info is not None and _pid_alive(info.pid) and self.probe(info.endpoint)
+
+    def endpoint(self) -> str | None:
+        """The running service's endpoint; a stale state file is removed."""
+        info = self.read_info()
+        if info is None:
+            return None
+        if not self.is_alive(info):
+            self.state_path.unlink(missing_ok=True)
+            return None
+        return info.endpoint
+
+    def start(self, timeout_seconds: float = 15.0) -> BrowserServiceInfo:
+        info = self.read_info()
+        if self.is_alive(info):
+            return info
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        command = [
+            self.executable_path or _default_executable(),
+            f"--remote-debugging-port={self.port}",
+            "--remote-debugging-address=127.0.0.1",
+            f"--user-data-dir={self.profile_dir.resolve()}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-blink-features=AutomationControlled",
+        ]
+        if self.headless:
+            command.append("--headless=new")
+        command.extend([BLANK_PAGE] * self.warm_pages)
+
+        process = subprocess.Popen(
+            command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        endpoint = f"http://127.0.0.1:{self.port}"
+        deadline = time.monotonic() + timeout_seconds
+        while not self.probe(endpoint):
+            if process.poll() is not None or time.monotonic() >= deadline:
+                process.kill()
+                raise RuntimeError(f"Browser service did not expose {endpoint} within {timeout_seconds:.0f}s")
+            time.sleep(0.2)
+
+        info = BrowserServiceInfo(
+            pid=process.pid,
+            port=self.port,
+            endpoint=endpoint,
+            profile_dir=str(self.profile_dir),
+            headless=self.headless,
+            started_at=datetime.now(timezone.utc).isoformat(),
+        )
+        self._write_info(info)
+        return info
+
+    def owns_process(self, info: BrowserServiceInfo) -> bool:
+        """Whether ``info.pid`` is still the Chromium we launched, not a reused pid.
+
+        A live DevTools endpoint is proof enough; otherwise (say, a hung
+        browser) its command line must carry our debugging port and profile.
+        """
+        if not _pid_alive(info.pid):
+            return False
+        if self.probe(info.endpoint):
+            return True
+        command = _process_command_line(info.pid)
+        return f"--remote-debugging-port={info.port}" in command and str(Path(info.profile_dir).resolve()) in command
+
+    def stop(self, timeout_seconds: float = 5.0) -> bool:
+        """Terminates the service; False when nothing of ours was running."""
+        info = self.read_info()
+        self.state_path.unlink(missing_ok=True)
+        if info is None or not self.owns_process(info):
+            return False
+
+        os.kill(info.pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout_seconds
+        while _pid_alive(info.pid) and time.monotonic() < deadline:
+            time.sleep(0.1)
+        if _pid_alive(info.pid):
+            os.kill(info.pid, signal.SIGKILL)
+        return True
@@ -8,12 +8,16 @@ from typing import Any
 
 from PIL import Image
 
+from .capture import Frame, area_resize, as_frame
+
 
 class TTLCache:
     def __init__(self, ttl_seconds: int, max_entries: int):
         self.ttl_seconds = max(1, ttl_seconds)
         self.max_entries = max(1, max_entries)
         self._store: dict[str, tuple[float, Any]] = {}
+        self.hits = 0
+        self.misses = 0
 
     def _purge_expired(self) -> None:
         now = time.time()
@@ -25,7 +29,9 @@ class TTLCache:
         self._purge_expired()
         item = self._store.get(key)
         if not item:
+            self.misses += 1
             return None
+        self.hits += 1
         _, value = item
         return value
 
@@ -41,7 +47,12 @@ class TTLCache:
 
     def stats(self) -> dict[str, int]:
         self._purge_expired()
-        return {"entries": len(self._store), "max_entries": self.max_entries}
+        return {
+            "entries": len(self._store),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
 
 
 @dataclass(frozen=True)
@@ -62,19 +73,21 @@ class StateChangeDetector:
 
     @staticmethod
     def _dhash(image_path: str) -> int:
-        image = Image.open(image_path).convert("L").resize((9, 8), Image.Resampling.LANCZOS)
-        pixels = list(image.getdata())
-        bits = []
-        for row in range(8):
-            row_start = row * 9
-            for col in range(8):
-                left = pixels[row_start + col]
-                right = pixels[row_start + col + 1]
-                bits.append(1 if left > right else 0)
+        return StateChangeDetector.dhash_image(Image.open(image_path))
+
+    @staticmethod
+    def dhash_image(image: Image.Image | Frame) -> int:
+        return StateChangeDetector.dhash_frame(as_frame(image))
 
+    @staticmethod
+    def dhash_frame(frame: Frame) -> int:
+        """dHash straight from the capture buffer: block-average to ~64px, then box-average to 9x8."""
+        gray = frame.gray_small(max(1, min(frame.width, frame.height) // 64))
+        pixels = area_resize(gray, 9, 8)
+        bits = (pixels[:, :-1] > pixels[:, 1:]).ravel()
         value = 0
         for bit in bits:
-            value = (value << 1) | bit
+            value = (value << 1) | int(bit)
         return value
 
     @staticmethod
@@ -86,7 +99,13 @@ class StateChangeDetector:
         return hashlib.sha256(value.encode("utf-8")).hexdigest()[:16]
 
     def inspect(self, image_path: str, mode: str, url: str = "", external_signal_changed: bool = False) -> StateSnapshot:
-        current_hash_int = self._dhash(image_path)
+        return self._inspect_hash(self._dhash(image_path), mode, url, external_signal_changed)
+
+    def inspect_frame(self, frame: Frame, mode: str, url: str = "", external_signal_changed: bool = False) -> StateSnapshot:
+        """Like ``inspect`` for an in-memory capture, so unchanged frames are never encoded."""
+        return self._inspect_hash(self.dhash_frame(frame), mode, url, external_signal_changed)
+
+    def _inspect_hash(self, current_hash_int: int, mode: str, url: str, external_signal_changed: bool) -> StateSnapshot:
         last = self._last_by_mode.get(mode)
 
         changed_by_image = True
@@ -155,6 +174,23 @@ def build_vision_cache_key(instruction: str, snapshot: StateSnapshot) -> str:
     return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
 
 
+def build_marked_vision_cache_key(instruction: str, mode: str, url: str, dom_hash: str, image_hash: str) -> str:
+    """Keys set-of-marks plans by DOM structure plus the screenshot's perceptual hash.
+
+    The DOM hash ignores boxes and state such as a toggled checkbox, so the
+    image hash keeps a click that only changed visual state from replaying
+    the plan that led to it.
+    """
+    payload = {
+        "instruction": normalize_instruction(instruction),
+        "mode": mode,
+        "url": url,
+        "dom_hash": dom_hash,
+        "image_hash": image_hash,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
 def build_summary_cache_key(content: str, instruction: str) -> str:
     payload = {
         "instruction": normalize_instruction(instruction),
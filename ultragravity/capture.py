@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import io
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class Region:
+    """A screen rectangle in physical pixels, as ``mss`` expects it."""
+
+    left: int
+    top: int
+    width: int
+    height: int
+
+    def as_monitor(self) -> dict[str, int]:
+        return {"left": self.left, "top": self.top, "width": self.width, "height": self.height}
+
+
+# ITU-R 601 luma, the weights PIL uses for "L", in BGR channel order.
+_LUMA_BGR = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+
+class Frame:
+    """A captured frame as a NumPy view of the grabber's BGRA buffer.
+
+    Nothing is copied, converted or encoded up front: change detection and
+    hashing read block averages straight from the view, and a PIL image or
+    PNG/JPEG bytes are produced only when a frame is saved or uploaded.
+    """
+
+    __slots__ = ("bgra",)
+
+    def __init__(self, bgra: np.ndarray):
+        self.bgra = bgra
+
+    @classmethod
+    def from_bgra(cls, raw: bytes | bytearray | memoryview, width: int, height: int) -> Frame:
+        """Wraps ``mss``'s raw BGRA bytes without copying them."""
+        return cls(np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 4))
+
+    @classmethod
+    def from_image(cls, image: Image.Image) -> Frame:
+        rgb = np.asarray(image.convert("RGB"))
+        bgra = np.empty((rgb.shape[0], rgb.shape[1], 4), dtype=np.uint8)
+        bgra[..., :3] = rgb[..., ::-1]
+        bgra[..., 3] = 255
+        return cls(bgra)
+
+    @property
+    def width(self) -> int:
+        return int(self.bgra.shape[1])
+
+    @property
+    def height(self) -> int:
+        return int(self.bgra.shape[0])
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.width, self.height
+
+    def crop(self, region: Region) -> Frame:
+        """A view of ``region`` (frame coordinates), clipped to the frame."""
+        left, top = max(0, region.left), max(0, region.top)
+        return Frame(self.bgra[top : top + region.height, left : left + region.width])
+
+    def gray_small(self, factor: int) -> np.ndarray:
+        """Grayscale averaged over ``factor`` x ``factor`` blocks; edge pixels that do not fill a block are dropped."""
+        factor = max(1, min(factor, self.width, self.height))
+        rows, cols = self.height // factor, self.width // factor
+        # Splitting axes keeps this a strided view of the buffer; only the block sums are allocated.
+        blocks = self.bgra[: rows * factor, : cols * factor, :3].reshape(rows, factor, cols, factor, 3)
+        sums = blocks.sum(axis=(1, 3), dtype=np.uint32)
+        return (sums @ _LUMA_BGR) / (factor * factor)
+
+    def to_image(self) -> Image.Image:
+        return Image.frombuffer("RGB", self.size, np.ascontiguousarray(self.bgra), "raw", "BGRX", 0, 1)
+
+    def encode(self, image_format: str = "JPEG", quality: int = 85) -> bytes:
+        buffer = io.BytesIO()
+        if image_format.upper() in {"JPEG", "JPG"}:
+            self.to_image().save(buffer, format="JPEG", quality=quality)
+        else:
+            self.to_image().save(buffer, format=image_format.upper())
+        return buffer.getvalue()
+
+    def save(self, path: str) -> str:
+        self.to_image().save(path)
+        return path
+
+
+def as_frame(image: Frame | Image.Image) -> Frame:
+    return image if isinstance(image, Frame) else Frame.from_image(image)
+
+
+def area_resize(gray: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Box-average ``gray`` down to ``width`` x ``height``; sizes need not divide evenly."""
+    if gray.shape[0] < height:
+        gray = np.repeat(gray, -(-height // gray.shape[0]), axis=0)
+    if gray.shape[1] < width:
+        gray = np.repeat(gray, -(-width // gray.shape[1]), axis=1)
+    row_edges = (np.arange(height) * gray.shape[0]) // height
+    col_edges = (np.arange(width) * gray.shape[1]) // width
+    row_counts = np.diff(np.append(row_edges, gray.shape[0]))
+    col_counts = np.diff(np.append(col_edges, gray.shape[1]))
+    summed = np.add.reduceat(np.add.reduceat(gray, row_edges, axis=0, dtype=np.float64), col_edges, axis=1)
+    return summed / np.outer(row_counts, col_counts)
+
+
+@dataclass(frozen=True)
+class CapturedFrame:
+    sequence: int
+    captured_at: float
+    frame: Frame
+    # Where the frame sits on screen; dirty regions are relative to its top-left corner.
+    region: Region | None
+    dirty_regions: tuple[Region, ...]
+
+
+def change_mask(previous: np.ndarray, current: np.ndarray, tile_size: int, pixel_threshold: int) -> np.ndarray:
+    """One flag per ``tile_size`` square of the small frames: did any pixel move by more than the threshold."""
+    changed = np.abs(current - previous) > pixel_threshold
+    rows = -(-changed.shape[0] // tile_size)
+    cols = -(-changed.shape[1] // tile_size)
+    padded = np.zeros((rows * tile_size, cols * tile_size), dtype=bool)
+    padded[: changed.shape[0], : changed.shape[1]] = changed
+    return padded.reshape(rows, tile_size, cols, tile_size).any(axis=(1, 3))
+
+
+def mask_regions(mask: np.ndarray, tile_pixels: int, width: int, height: int) -> list[Region]:
+    """Bounding boxes of 8-connected changed tiles, scaled back to frame pixels."""
+    seen = np.zeros_like(mask, dtype=bool)
+    regions: list[Region] = []
+    rows, cols = mask.shape
+    for row, col in zip(*np.nonzero(mask)):
+        if seen[row, col]:
+            continue
+        seen[row, col] = True
+        stack = [(row, col)]
+        top, left, bottom, right = row, col, row, col
+        while stack:
+            r, c = stack.pop()
+            top, left, bottom, right = min(top, r), min(left, c), max(bottom, r), max(right, c)
+            for nr in range(max(0, r - 1), min(rows, r + 2)):
+                for nc in range(max(0, c - 1), min(cols, c + 2)):
+                    if mask[nr, nc] and not seen[nr, nc]:
+                        seen[nr, nc] = True
+                        stack.append((nr, nc))
+        x0, y0 = int(left) * tile_pixels, int(top) * tile_pixels
+        x1 = min(width, (int(right) + 1) * tile_pixels)
+        y1 = min(height, (int(bottom) + 1) * tile_pixels)
+        regions.append(Region(x0, y0, x1 - x0, y1 - y0))
+    return regions
+
+
+class CaptureEngine:
+    """Grabs frames on a background thread into a ring buffer and tracks what changed.
+
+    Change detection runs on grayscale frames ``downscale`` times smaller than
+    the capture, split into tiles; changed tiles are merged into dirty regions
+    in full-resolution frame coordinates. ``region`` restricts grabbing to one
+    window's rectangle. The goal loop reads ``latest()`` instead of grabbing,
+    so taking a screenshot costs no capture latency while the thread runs.
+    """
+
+    def __init__(
+        self,
+        grab: Callable[[Region | None], Frame | Image.Image],
+        fps: float = 4.0,
+        ring_size: int = 8,
+        downscale: int = 8,
+        tile_size: int = 8,
+        pixel_threshold: int = 12,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.grab = grab
+        self.interval_seconds = 1.0 / max(0.1, fps)
+        self.downscale = max(1, downscale)
+        self.tile_size = max(1, tile_size)
+        self.pixel_threshold = max(0, pixel_threshold)
+        self.clock = clock
+        self._frames: deque[CapturedFrame] = deque(maxlen=max(2, ring_size))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._region: Region | None = None
+        self._previous_small: np.ndarray | None = None
+        self._sequence = 0
+
+    @property
+    def region(self) -> Region | None:
+        return self._region
+
+    def set_region(self, region: Region | None) -> None:
+        """Captures only ``region`` from the next frame on; the first such frame is entirely dirty."""
+        with self._lock:
+            self._region = region
+            self._previous_small = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="capture-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout_seconds: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout_seconds)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = self.clock()
+            try:
+                self.capture_once()
+            except Exception:
+                # A failed grab (display asleep, window closed) must not kill the thread.
+                pass
+            self._stop.wait(max(0.0, self.interval_seconds - (self.clock() - started)))
+
+    def capture_once(self) -> CapturedFrame:
+        region = self._region
+        frame = as_frame(self.grab(region))
+        small = frame.gray_small(self.downscale)
+        with self._lock:
+            if region != self._region:
+                # set_region raced this grab; the frame belongs to the old rectangle.
+                return self._frames[-1] if self._frames else self._append(frame, region, small, None)
+            previous = self._previous_small
+            self._previous_small = small
+            return self._append(frame, region, small, previous)
+
+    def _append(self, frame: Frame, region: Region | None, small: np.ndarray, previous: np.ndarray | None) -> CapturedFrame:
+        if previous is None or previous.shape != small.shape:
+            dirty = (Region(0, 0, frame.width, frame.height),)
+        else:
+            mask = change_mask(previous, small, self.tile_size, self.pixel_threshold)
+            dirty = tuple(mask_regions(mask, self.tile_size * self.downscale, frame.width, frame.height))
+        self._sequence += 1
+        frame = CapturedFrame(
+            sequence=self._sequence,
+            captured_at=self.clock(),
+            frame=frame,
+            region=region,
+            dirty_regions=dirty,
+        )
+        self._frames.append(frame)
+        return frame
+
+    def latest(self, max_age_seconds: float | None = None) -> CapturedFrame | None:
+        with self._lock:
+            frame = self._frames[-1] if self._frames else None
+        if frame is None or (max_age_seconds is not None and self.clock() - frame.captured_at > max_age_seconds):
+            return None
+        return frame
+
+    def dirty_since(self, sequence: int) -> list[Region]:
+        """Everything that changed after frame ``sequence``; the whole frame if the ring no longer covers it."""
+        with self._lock:
+            frames = list(self._frames)
+        if not frames or frames[-1].sequence <= sequence:
+            return []
+        if frames[0].sequence > sequence + 1:
+            latest = frames[-1].frame
+            return [Region(0, 0, latest.width, latest.height)]
+        return [region for frame in frames if frame.sequence > sequence for region in frame.dirty_regions]
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import copy
+
+from .executor import ExecutionState, execution_state_from_dict, execution_state_to_dict
+from .memory import MemoryManager
+from .planner import ExecutionPlan, plan_from_dict, plan_to_dict
+
+
+class ExecutionCheckpointer:
+    """Persists a plan snapshot once and then only per-step deltas.
+
+    Deltas carry the fields of a step record, the recovery-context keys and the
+    state flags that changed since the previous checkpoint. Replaying them in
+    order on top of the snapshot rebuilds the latest ``ExecutionState``.
+    """
+
+    def __init__(self, memory: MemoryManager):
+        self.memory = memory
+        self._last_state: dict[str, dict[str, object]] = {}
+
+    def begin(self, plan: ExecutionPlan, state: ExecutionState) -> None:
+        payload = execution_state_to_dict(state)
+        for step in plan.steps:
+            payload["records"].setdefault(
+                step.id,
+                {"status": "pending", "attempts": 0, "error": "", "started_at": "", "finished_at": ""},
+            )
+        self.memory.compact_execution_state(plan.id, {"plan": plan_to_dict(plan), "state": payload})
+        self._last_state[plan.id] = copy.deepcopy(payload)
+
+    def record(self, state: ExecutionState, step_id: str) -> None:
+        current = execution_state_to_dict(state)
+        previous = self._last_state.get(state.plan_id)
+        if previous is None:
+            self.memory.append_execution_delta(state.plan_id, {"state": current})
+            self._last_state[state.plan_id] = copy.deepcopy(current)
+            return
+
+        delta = self.diff(previous, current, step_id)
+        if delta:
+            self.memory.append_execution_delta(state.plan_id, delta)
+        self._last_state[state.plan_id] = copy.deepcopy(current)
+
+    def finish(self, plan: ExecutionPlan, state: ExecutionState) -> None:
+        payload = execution_state_to_dict(state)
+        self.memory.compact_execution_state(plan.id, {"plan": plan_to_dict(plan), "state": payload})
+        self._last_state.pop(plan.id, None)
+
+    @staticmethod
+    def diff(previous: dict[str, object], current: dict[str, object], step_id: str) -> dict[str, object]:
+        delta: dict[str, object] = {}
+
+        previous_record = (previous.get("records") or {}).get(step_id) or {}
+        current_record = (current.get("records") or {}).get(step_id) or {}
+        changed_record = {key: value for key, value in current_record.items() if previous_record.get(key) != value}
+        if changed_record:
+            delta["step_id"] = step_id
+            delta["record"] = changed_record
+
+        previous_context = previous.get("recovery_context") or {}
+        current_context = current.get("recovery_context") or {}
+        changed_context = {key: value for key, value in current_context.items() if previous_context.get(key) != value}
+        if changed_context:
+            delta["context"] = changed_context
+
+        for key in ("current_step_index", "aborted", "completed"):
+            if previous.get(key) != current.get(key):
+                delta[key] = current.get(key)
+        return delta
+
+    @staticmethod
+    def apply(payload: dict[str, object], delta: dict[str, object]) -> dict[str, object]:
+        if "state" in delta:
+            return copy.deepcopy(delta["state"])
+
+        step_id = delta.get("step_id")
+        if step_id and isinstance(delta.get("record"), dict):
+            records = payload.setdefault("records", {})
+            records.setdefault(str(step_id), {}).update(delta["record"])
+        if isinstance(delta.get("context"), dict):
+            payload.setdefault("recovery_context", {}).update(delta["context"])
+        for key in ("current_step_index", "aborted", "completed"):
+            if key in delta:
+                payload[key] = delta[key]
+        return payload
+
+    def load(self, plan_id: str) -> tuple[ExecutionPlan, ExecutionState] | None:
+        snapshot = self.memory.load_execution_state(plan_id)
+        if not snapshot or not isinstance(snapshot.get("plan"), dict):
+            return None
+
+        payload = copy.deepcopy(snapshot.get("state") or {"plan_id": plan_id})
+        for delta in self.memory.load_execution_deltas(plan_id):
+            payload = self.apply(payload, delta)
+
+        plan = plan_from_dict(snapshot["plan"])
+        state = execution_state_from_dict(payload)
+        self._last_state[plan_id] = payload
+        return plan, state
@@ -10,10 +10,15 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from ultragravity.browser_service import BrowserService
 from ultragravity.config import AppRuntimeConfig, load_runtime_config
 from ultragravity.diagnostics import run_startup_diagnostics
+from ultragravity.log_index import IncrementalLogIndex, tail_lines
+from ultragravity.log_retention import COMPRESSED_SUFFIXES, logical_name, segment_day
 from ultragravity.memory import MemoryManager, SQLiteMemoryRepository
 from ultragravity.policy import PolicyProfile
+from ultragravity.telemetry_store import TelemetryStore, read_segment_records, segment_record_count
+from ultragravity.tracing import find_trace, flame_summary, load_trace
 
 DEFAULT_CONFIG_PATH = "ultragravity.config.yaml"
 DEFAULT_SETUP_STATE_PATH = Path("data/setup_state.json")
@@ -225,67 +230,62 @@ def _run_first_run_wizard(config: AppRuntimeConfig, force: bool = False) -> None
     print(f"Setup complete. Default policy set to '{selected_profile.value}'.\n")
 
 
-def _collect_approval_stats(audit_dir: Path) -> dict[str, int]:
-    stats = {
+APPROVAL_INDEX_FILENAME = ".approval_index.json"
+
+
+def _empty_approval_stats() -> dict[str, int]:
+    return {
         "prompted": 0,
         "approved": 0,
         "denied": 0,
     }
-    if not audit_dir.exists():
-        return stats
 
-    for path in sorted(audit_dir.glob("actions-*.jsonl")):
-        for raw_line in path.read_text(encoding="utf-8").splitlines():
-            try:
-                record = json.loads(raw_line)
-            except Exception:
-                continue
 
-            if record.get("event_type") != "permission_outcome":
-                continue
+def _fold_approval_record(stats: dict[str, int], record: dict[str, Any]) -> None:
+    if record.get("event_type") != "permission_outcome":
+        return
 
-            stats["prompted"] += 1
-            approved = bool(((record.get("permission") or {}).get("approved")))
-            if approved:
-                stats["approved"] += 1
-            else:
-                stats["denied"] += 1
+    stats["prompted"] += 1
+    approved = bool(((record.get("permission") or {}).get("approved")))
+    if approved:
+        stats["approved"] += 1
+    else:
+        stats["denied"] += 1
 
-    return stats
+
+def _collect_approval_stats(audit_dir: Path) -> dict[str, int]:
+    index = IncrementalLogIndex(
+        audit_dir,
+        pattern="actions-*.jsonl*",
+        index_filename=APPROVAL_INDEX_FILENAME,
+        fold=_fold_approval_record,
+        empty_stats=_empty_approval_stats,
+    )
+    return index.update()
 
 
 def _collect_telemetry_stats(telemetry_dir: Path) -> dict[str, dict[str, int]]:
-    stats: dict[str, dict[str, int]] = {}
     if not telemetry_dir.exists():
-        return stats
-
-    for path in sorted(telemetry_dir.glob("provider-*.jsonl")):
-        for raw_line in path.read_text(encoding="utf-8").splitlines():
-            try:
-                record = json.loads(raw_line)
-            except Exception:
-                continue
-
-            provider = str(record.get("provider") or "unknown")
-            provider_stats = stats.setdefault(
-                provider,
-                {
-                    "requests": 0,
-                    "successes": 0,
-                    "failures": 0,
-                    "estimated_tokens": 0,
-                    "actual_tokens": 0,
-                },
-            )
-            provider_stats["requests"] += 1
-            provider_stats["estimated_tokens"] += max(0, int(record.get("estimated_tokens") or 0))
-            provider_stats["actual_tokens"] += max(0, int(record.get("actual_tokens") or 0))
-            if bool(record.get("success")):
-                provider_stats["successes"] += 1
-            else:
-                provider_stats["failures"] += 1
+        return {}
 
-    return stats
+    totals = TelemetryStore(telemetry_dir).provider_totals()
+    return {
+        provider: {
+            "requests": int(values.get("requests", 0)),
+            "successes": int(values.get("successes", 0)),
+            "failures": int(values.get("failures", 0)),
+            "estimated_tokens": int(values.get("estimated_tokens", 0)),
+            "actual_tokens": int(values.get("actual_tokens", 0)),
+        }
+        for provider, values in totals.items()
+    }
+
+
+def _collect_latency_stats(telemetry_dir: Path) -> list[dict[str, Any]]:
+    if not telemetry_dir.exists():
+        return []
+    summaries = TelemetryStore(telemetry_dir).latency_summaries()
+    return [summaries[key] for key in sorted(summaries)]
 
 
 def _print_status(config: AppRuntimeConfig) -> int:
@@ -319,6 +319,17 @@ def _print_status(config: AppRuntimeConfig) -> int:
             f"soft_tpm={int(provider_cfg.tpm_limit * provider_cfg.soft_cap_ratio)}"
         )
 
+    latency = _collect_latency_stats(DEFAULT_TELEMETRY_LOG_DIR)
+    if latency:
+        print("\nLatency by provider/model/operation:")
+        for row in latency:
+            errors = ", ".join(f"{name}={count}" for name, count in sorted(row["error_classes"].items())) or "none"
+            print(
+                f"- {row['provider']}/{row['model']}/{row['operation']}: requests={row['requests']} "
+                f"p50={row['latency_ms_p50']:.0f}ms p90={row['latency_ms_p90']:.0f}ms p99={row['latency_ms_p99']:.0f}ms "
+                f"tok/s={row['tokens_per_second']:.1f} errors=[{errors}]"
+            )
+
     print("\nApprovals:")
     print(
         f"- prompted={approvals['prompted']} approved={approvals['approved']} denied={approvals['denied']}"
@@ -326,31 +337,116 @@ def _print_status(config: AppRuntimeConfig) -> int:
     return 0
 
 
+def _log_files(directory: Path, pattern: str) -> list[Path]:
+    paths = list(directory.glob(pattern))
+    for suffix in COMPRESSED_SUFFIXES:
+        paths.extend(directory.glob(pattern + suffix))
+    return sorted(paths)
+
+
 def _print_logs(kind: str, lines: int) -> int:
     selected_paths: list[Path] = []
 
     if kind in {"audit", "all"}:
-        selected_paths.extend(sorted(DEFAULT_AUDIT_LOG_DIR.glob("actions-*.jsonl")))
+        selected_paths.extend(_log_files(DEFAULT_AUDIT_LOG_DIR, "actions-*.jsonl"))
     if kind in {"telemetry", "all"}:
-        selected_paths.extend(sorted(DEFAULT_TELEMETRY_LOG_DIR.glob("provider-*.jsonl")))
+        selected_paths.extend(_log_files(DEFAULT_TELEMETRY_LOG_DIR, "provider-*.jsonl"))
+        selected_paths.extend(_log_files(DEFAULT_TELEMETRY_LOG_DIR, "provider-*.bin"))
 
     if not selected_paths:
         print("No log files found.")
         return 0
 
-    selected_paths = sorted(selected_paths, key=lambda p: p.stat().st_mtime)
-    tail_lines: list[str] = []
-    for path in selected_paths:
-        file_lines = path.read_text(encoding="utf-8").splitlines()
-        for line in file_lines:
-            tail_lines.append(f"[{path.name}] {line}")
+    limit = max(1, lines)
+    # Compression bumps mtime, so order by the day stamp in the name first.
+    selected_paths = sorted(selected_paths, key=lambda p: (segment_day(p) or datetime.min.replace(tzinfo=timezone.utc), p.stat().st_mtime))
+    collected: list[str] = []
+    for path in reversed(selected_paths):
+        remaining = limit - len(collected)
+        if remaining <= 0:
+            break
+        if logical_name(path).endswith(".bin"):
+            start = max(0, segment_record_count(path) - remaining)
+            file_lines = [
+                json.dumps(record.to_dict(), ensure_ascii=False)
+                for record in read_segment_records(path, start=start)
+            ]
+        else:
+            file_lines = tail_lines(path, remaining)
+        collected = [f"[{path.name}] {line}" for line in file_lines] + collected
 
-    for line in tail_lines[-max(1, lines):]:
+    for line in collected[-limit:]:
         print(line)
 
     return 0
 
 
+def _print_trace(run: str, trace_dir: str | Path) -> int:
+    path = find_trace(trace_dir, run)
+    if path is None:
+        print(f"No trace found for '{run}' in {trace_dir}. Enable tracing in the config and run a task first.")
+        return 1
+
+    spans = load_trace(path)
+    rows = flame_summary(spans)
+    root_total = sum(row["total_ms"] for row in rows if len(row["path"]) == 1) or 1.0
+
+    print(f"Trace {path.stem.removeprefix('trace-')} ({len(spans)} spans)")
+    print("=" * 22)
+    print(f"{'span':<52} {'count':>6} {'total ms':>11} {'self ms':>11} {'share':>7}")
+    for row in rows:
+        depth = len(row["path"]) - 1
+        label = ("  " * depth + row["path"][-1])[:52]
+        errors = f"  errors={row['errors']}" if row["errors"] else ""
+        print(
+            f"{label:<52} {row['count']:>6} {row['total_ms']:>11.1f} {row['self_ms']:>11.1f} "
+            f"{row['total_ms'] * 100.0 / root_total:>6.1f}%{errors}"
+        )
+    return 0
+
+
+def _handle_browser_command(action: str, config: AppRuntimeConfig, headless: bool = False) -> int:
+    service_config = config.browser_service
+    service = BrowserService(
+        state_path=service_config.state_path,
+        port=service_config.port,
+        profile_dir=service_config.profile_dir,
+        headless=headless or service_config.headless,
+        warm_pages=service_config.warm_pages,
+    )
+
+    if action == "start":
+        try:
+            info = service.start()
+        except Exception as exc:
+            print(f"Browser service failed to start: {exc}")
+            return 1
+        print(f"Browser service running (pid {info.pid}) at {info.endpoint}")
+        print(f"Profile: {info.profile_dir}")
+        return 0
+
+    if action == "stop":
+        if service.stop():
+            print("Browser service stopped.")
+        else:
+            print("Browser service was not running.")
+        return 0
+
+    endpoint = service.endpoint()
+    info = service.read_info()
+    if endpoint is None or info is None:
+        print("Browser service: not running (runs launch their own browser)")
+        return 1
+    print("Browser service")
+    print("===============")
+    print(f"pid: {info.pid}")
+    print(f"endpoint: {info.endpoint}")
+    print(f"profile: {info.profile_dir}")
+    print(f"headless: {info.headless}")
+    print(f"started_at: {info.started_at}")
+    return 0
+
+
 def _update_runtime_status(mode: str, running: bool, policy_profile: str) -> None:
     payload = _load_json(DEFAULT_RUNTIME_STATUS_PATH)
     payload.update(
@@ -453,6 +549,32 @@ def _run_agent(instruction: str, url: str | None, headless: bool, model: str | N
     return 0
 
 
+def _resume_agent(plan_id: str, headless: bool, model: str | None, config_path: str) -> int:
+    from agent.core import UltragravityAgent
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    config = load_runtime_config(config_path)
+    configure_logging(config.app.log_level)
+
+    memory = _resolve_memory(config)
+    profile = (memory.get_preference("policy_profile", "strict") or "strict").strip().lower()
+    effective_model = model or config.app.model_name
+    effective_headless = bool(headless or config.app.headless)
+
+    _update_runtime_status(mode="RESUME", running=True, policy_profile=profile)
+    try:
+        agent = UltragravityAgent(headless=effective_headless, model_name=effective_model, runtime_config=config)
+        completed = agent.resume_session(plan_id)
+    except Exception as exc:
+        logging.critical(f"Fatal error: {exc}", exc_info=True)
+        _update_runtime_status(mode="RESUME", running=False, policy_profile=profile)
+        return 1
+
+    _update_runtime_status(mode="RESUME", running=False, policy_profile=profile)
+    return 0 if completed else 1
+
+
 def _handle_policy_command(set_profile: str | None, config_path: str) -> int:
     config = load_runtime_config(config_path)
     memory = _resolve_memory(config)
@@ -495,6 +617,11 @@ def build_parser() -> argparse.ArgumentParser:
     ask_parser.add_argument("--model", type=str, default=None, help="Override model name")
     ask_parser.add_argument("--wizard", action="store_true", help="Force first-run setup wizard")
 
+    resume_parser = subparsers.add_parser("resume", help="Resume an interrupted plan from its last checkpoint")
+    resume_parser.add_argument("plan_id", type=str, help="Plan ID printed when the plan started or aborted")
+    resume_parser.add_argument("--headless", action="store_true", help="Run browser headless")
+    resume_parser.add_argument("--model", type=str, default=None, help="Override model name")
+
     policy_parser = subparsers.add_parser("policy", help="Show or update policy profile")
     policy_parser.add_argument("--set", dest="set_profile", type=str, default=None, help="Set profile: strict|balanced|developer")
 
@@ -504,6 +631,13 @@ def build_parser() -> argparse.ArgumentParser:
 
     subparsers.add_parser("status", help="Show runtime status, budget usage, and approvals")
 
+    trace_parser = subparsers.add_parser("trace", help="Show a flame summary of a traced run")
+    trace_parser.add_argument("run", nargs="?", default="latest", help="Plan ID, trace ID prefix, or 'latest'")
+
+    browser_parser = subparsers.add_parser("browser", help="Manage the long-lived browser service runs attach to")
+    browser_parser.add_argument("action", choices=["start", "stop", "status"])
+    browser_parser.add_argument("--headless", action="store_true", help="Start the service headless")
+
     return parser
 
 
@@ -531,6 +665,14 @@ def main(argv: list[str] | None = None) -> int:
             wizard=args.wizard,
         )
 
+    if args.command == "resume":
+        return _resume_agent(
+            plan_id=args.plan_id,
+            headless=args.headless,
+            model=args.model,
+            config_path=args.config,
+        )
+
     if args.command == "policy":
         return _handle_policy_command(args.set_profile, args.config)
 
@@ -541,6 +683,14 @@ def main(argv: list[str] | None = None) -> int:
         config = load_runtime_config(args.config)
         return _print_status(config)
 
+    if args.command == "trace":
+        config = load_runtime_config(args.config)
+        return _print_trace(args.run, config.tracing.log_dir)
+
+    if args.command == "browser":
+        config = load_runtime_config(args.config)
+        return _handle_browser_command(args.action, config, headless=args.headless)
+
     parser.print_help()
     return 2
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 import yaml
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
@@ -85,6 +85,11 @@ class PromptOptimizationConfig(BaseModel):
     summary_chunk_chars: int = 3500
     summary_overlap_chars: int = 250
     summary_top_k_chunks: int = 6
+    summary_chunking: Literal["fixed", "content_defined"] = "content_defined"
+    summary_reduce: Literal["flat", "tree"] = "flat"
+    summary_fan_in: int = 6
+    summary_token_budget: int = 60_000
+    summary_max_workers: int = 4
 
 
 class PlannerConfig(BaseModel):
@@ -96,6 +101,107 @@ class PlannerConfig(BaseModel):
     retry_backoff_seconds: float = 1.0
 
 
+class AXPlanningConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    max_nodes: int = 150
+    min_interactive: int = 3
+
+
+class SetOfMarksConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    max_elements: int = 80
+    cache_ttl_seconds: int = 600
+    cache_max_entries: int = 64
+
+
+class InputSpeedConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    default: Literal["human", "fast", "instant"] = "human"
+    tools: dict[str, Literal["human", "fast", "instant"]] = Field(default_factory=dict)
+    sites: dict[str, Literal["human", "fast", "instant"]] = Field(default_factory=dict)
+
+
+class BrowserServiceConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    auto_start: bool = False
+    port: int = 9333
+    profile_dir: str = "data/browser_profile"
+    state_path: str = "data/browser_service.json"
+    warm_pages: int = 2
+    headless: bool = False
+
+
+class RoutingConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    preset: Literal["full", "balanced", "reader"] = "balanced"
+    block_types: list[str] = Field(default_factory=list)
+    block_domains: list[str] = Field(default_factory=list)
+    allow_domains: list[str] = Field(default_factory=list)
+    asset_cache_enabled: bool = True
+    asset_cache_dir: str = "data/http_cache"
+    asset_cache_max_mb: int = 200
+
+
+class ResearchConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    max_sources: int = 5
+    max_concurrency: int = 4
+    tab_timeout_seconds: float = 15.0
+    max_chars_per_source: int = 20000
+
+
+class PageCacheConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    sqlite_path: str = "data/page_cache.db"
+    ttl_seconds: int = 86400
+    max_pages: int = 500
+
+
+class SettleConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    timeout_seconds: float = 5.0
+    quiet_window_ms: int = 300
+    poll_interval_ms: int = 100
+    stable_frames: int = 2
+    frame_distance_threshold: int = 2
+
+
+class CaptureConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    fps: float = 4.0
+    ring_size: int = 8
+    downscale: int = 8
+    tile_size: int = 8
+    pixel_threshold: int = 12
+    max_frame_age_ms: int = 500
+
+
+class PerceptionConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    min_confidence: float = 0.8
+    escalate: bool = True
+    ocr_language: str = "eng"
+    template_dir: str = "data/templates"
+    match_downscale: int = 2
+
+
 class MemoryConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -106,6 +212,45 @@ class MemoryConfig(BaseModel):
     retrieval_top_k: int = 5
 
 
+class AuditConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    log_dir: str = "logs/audit"
+    buffered: bool = True
+    queue_size: int = 1000
+    batch_size: int = 64
+    flush_interval_seconds: float = 0.5
+    fsync_policy: Literal["never", "batch", "always"] = "batch"
+    max_segment_bytes: int = 20_000_000
+
+
+class LogRetentionConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = True
+    compression: Literal["gzip", "zstd", "none"] = "gzip"
+    compress_after_days: int = 1
+    retention_days: int = 30
+    max_total_bytes: int = 0
+
+
+class MetricsConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    http_enabled: bool = False
+    host: str = "127.0.0.1"
+    port: int = 9464
+    textfile_path: str = ""
+    textfile_interval_seconds: float = 15.0
+
+
+class TracingConfig(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+    enabled: bool = False
+    log_dir: str = "logs/traces"
+
+
 class AppRuntimeConfig(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
@@ -116,7 +261,21 @@ class AppRuntimeConfig(BaseModel):
     call_reduction: CallReductionConfig = Field(default_factory=CallReductionConfig)
     prompt_optimization: PromptOptimizationConfig = Field(default_factory=PromptOptimizationConfig)
     planner: PlannerConfig = Field(default_factory=PlannerConfig)
+    settle: SettleConfig = Field(default_factory=SettleConfig)
+    capture: CaptureConfig = Field(default_factory=CaptureConfig)
+    perception: PerceptionConfig = Field(default_factory=PerceptionConfig)
+    ax_planning: AXPlanningConfig = Field(default_factory=AXPlanningConfig)
+    set_of_marks: SetOfMarksConfig = Field(default_factory=SetOfMarksConfig)
+    input_speed: InputSpeedConfig = Field(default_factory=InputSpeedConfig)
+    browser_service: BrowserServiceConfig = Field(default_factory=BrowserServiceConfig)
+    research: ResearchConfig = Field(default_factory=ResearchConfig)
+    routing: RoutingConfig = Field(default_factory=RoutingConfig)
+    page_cache: PageCacheConfig = Field(default_factory=PageCacheConfig)
     memory: MemoryConfig = Field(default_factory=MemoryConfig)
+    audit: AuditConfig = Field(default_factory=AuditConfig)
+    log_retention: LogRetentionConfig = Field(default_factory=LogRetentionConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    tracing: TracingConfig = Field(default_factory=TracingConfig)
 
 
 def _load_yaml_dict(config_path: Path) -> dict[str, Any]:
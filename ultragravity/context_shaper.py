@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import heapq
 import math
 import re
 from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+CHUNKING_MODES = ("fixed", "content_defined")
+
+# Gear table for content-defined chunking; derived from a hash so boundaries are
+# identical across processes and runs (a seeded PRNG would tie them to its version).
+_GEAR = tuple(int.from_bytes(hashlib.blake2b(bytes([value]), digest_size=4).digest(), "big") for value in range(256))
 
 
 @dataclass(frozen=True)
@@ -12,6 +21,197 @@ class SummaryChunk:
     score: float
 
 
+class StreamingChunker:
+    """Push-style ``ContextShaper.chunk_text``: emits each chunk once enough text has arrived.
+
+    Feeding the pieces of a text yields the same chunks as chunking the joined
+    text, provided pieces split on whitespace (extraction batches end on blocks).
+    """
+
+    def __init__(self, chunk_chars: int, overlap_chars: int):
+        self.chunk_chars = max(500, chunk_chars)
+        self.overlap_chars = max(0, min(overlap_chars, self.chunk_chars // 2))
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        compacted = ContextShaper.compact_text(text)
+        if compacted:
+            self._buffer = f"{self._buffer} {compacted}" if self._buffer else compacted
+        chunks: list[str] = []
+        # Strictly longer: a buffer of exactly chunk_chars may still be the final chunk.
+        while len(self._buffer) > self.chunk_chars:
+            chunks.append(self._buffer[: self.chunk_chars])
+            self._buffer = self._buffer[self.chunk_chars - self.overlap_chars :]
+        return chunks
+
+    def flush(self) -> list[str]:
+        remainder, self._buffer = self._buffer, ""
+        return [remainder] if remainder else []
+
+
+class ContentDefinedChunker:
+    """Push-style content-defined chunking: boundaries come from a rolling gear hash.
+
+    A boundary falls wherever the hash of the last ~32 characters hits a mask
+    (then moves to the next space), so an edit only changes the chunks around
+    it; every other chunk keeps its exact text and therefore its hash. Chunks
+    are between half and twice ``chunk_chars`` long, averaging about
+    ``chunk_chars``, and do not overlap: overlap would tie a chunk's text to
+    its neighbour's.
+    """
+
+    def __init__(self, chunk_chars: int):
+        target = max(500, chunk_chars)
+        self.min_chars = target // 2
+        self.max_chars = target * 2
+        self._mask = (1 << max(1, round(math.log2(target - self.min_chars)))) - 1
+        self._buffer = ""
+        self._scanned = 0
+        self._hash = 0
+        self._cut_pending = False
+
+    def _scan(self) -> list[str]:
+        chunks: list[str] = []
+        buffer = self._buffer
+        start = 0
+        position = self._scanned
+        gear_hash = self._hash
+        cut_pending = self._cut_pending
+        while position < len(buffer):
+            character = buffer[position]
+            length = position - start + 1
+            if cut_pending and character == " ":
+                chunks.append(buffer[start:position])
+                start = position + 1
+                gear_hash = 0
+                cut_pending = False
+            elif length >= self.max_chars:
+                # No hash boundary in range: cut at the last space instead, and rescan after it.
+                space = buffer.rfind(" ", start + self.min_chars, position)
+                end = space if space != -1 else position + 1
+                chunks.append(buffer[start:end])
+                start = end + 1 if space != -1 else end
+                position = start
+                gear_hash = 0
+                cut_pending = False
+                continue
+            else:
+                gear_hash = ((gear_hash << 1) + _GEAR[ord(character) & 0xFF]) & 0xFFFFFFFF
+                if not cut_pending and length >= self.min_chars and gear_hash & self._mask == 0:
+                    cut_pending = True
+            position += 1
+        self._buffer = buffer[start:]
+        self._scanned = position - start
+        self._hash = gear_hash
+        self._cut_pending = cut_pending
+        return [chunk for chunk in chunks if chunk]
+
+    def feed(self, text: str) -> list[str]:
+        compacted = ContextShaper.compact_text(text)
+        if compacted:
+            self._buffer = f"{self._buffer} {compacted}" if self._buffer else compacted
+        return self._scan()
+
+    def flush(self) -> list[str]:
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        self._scanned = 0
+        self._hash = 0
+        self._cut_pending = False
+        return [remainder] if remainder else []
+
+
+class ChunkRanker:
+    """Keeps the ``top_k`` best-scoring chunks as they arrive; other chunk texts are dropped."""
+
+    def __init__(self, query: str, top_k: int):
+        self.keywords = ContextShaper._keyword_set(query) or {"summary"}
+        self.top_k = max(1, top_k)
+        self.total = 0
+        self._heap: list[tuple[float, int, str]] = []
+
+    def score(self, chunk: str) -> float:
+        lowered = chunk.lower()
+        hits = sum(1 for keyword in self.keywords if keyword in lowered)
+        density = hits / max(1, math.log2(len(chunk) + 8))
+        return float(hits + density)
+
+    def add(self, chunk: str) -> None:
+        # Ties favour earlier chunks, matching a stable descending sort.
+        entry = (self.score(chunk), -self.total, chunk)
+        self.total += 1
+        if len(self._heap) < self.top_k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def ranked(self) -> list[SummaryChunk]:
+        ordered = sorted(self._heap, reverse=True)
+        return [SummaryChunk(index=-negative_index, text=text, score=score) for score, negative_index, text in ordered]
+
+
+@dataclass(frozen=True)
+class ReducePlan:
+    chunk_count: int
+    levels: int
+    calls: int
+    estimated_tokens: int
+
+
+def _tree_cost(leaves: int, chunk_tokens: int, map_output_tokens: int, merge_output_tokens: int, fan_in: int) -> tuple[int, int, int]:
+    """(levels, calls, tokens) to map ``leaves`` chunks and reduce them ``fan_in`` at a time."""
+    tokens = leaves * (chunk_tokens + map_output_tokens)
+    calls = leaves
+    levels = 0
+    width = leaves
+    input_tokens = map_output_tokens
+    # At least one reduce: a lone map summary is not a final answer.
+    while width > 1 or levels == 0:
+        groups = math.ceil(width / fan_in)
+        tokens += width * input_tokens + groups * merge_output_tokens
+        calls += groups
+        levels += 1
+        width = groups
+        input_tokens = merge_output_tokens
+    return levels, calls, tokens
+
+
+def plan_tree_reduce(
+    total_chunks: int,
+    chunk_tokens: int,
+    map_output_tokens: int,
+    merge_output_tokens: int,
+    fan_in: int,
+    token_budget: int,
+    min_chunks: int = 1,
+) -> ReducePlan:
+    """How many chunks a tree reduce can cover within ``token_budget``, and how deep it goes.
+
+    Every call reads at most ``fan_in`` summaries, so per-call size is bounded
+    whatever the document length; the budget only decides coverage. Cost grows
+    with the chunk count, so the largest affordable count is found by
+    bisection; ``min_chunks`` (e.g. the flat mode's top-k) is kept even when
+    it alone exceeds the budget.
+    """
+    fan_in = max(2, fan_in)
+    if total_chunks <= 0:
+        return ReducePlan(chunk_count=0, levels=0, calls=0, estimated_tokens=0)
+    low = min(total_chunks, max(1, min_chunks))
+    high = total_chunks
+
+    def fits(leaves: int) -> bool:
+        return _tree_cost(leaves, chunk_tokens, map_output_tokens, merge_output_tokens, fan_in)[2] <= token_budget
+
+    while low < high:
+        middle = (low + high + 1) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle - 1
+    levels, calls, tokens = _tree_cost(low, chunk_tokens, map_output_tokens, merge_output_tokens, fan_in)
+    return ReducePlan(chunk_count=low, levels=levels, calls=calls, estimated_tokens=tokens)
+
+
 class ContextShaper:
     @staticmethod
     def compact_text(text: str) -> str:
@@ -64,18 +264,31 @@ class ContextShaper:
         keywords = re.findall(r"[a-zA-Z0-9]{3,}", query.lower())
         return set(keywords)
 
+    @staticmethod
+    def make_chunker(
+        chunk_chars: int, overlap_chars: int, mode: str = "fixed"
+    ) -> StreamingChunker | ContentDefinedChunker:
+        if mode not in CHUNKING_MODES:
+            raise ValueError(f"Unknown chunking mode '{mode}'. Valid modes: {', '.join(CHUNKING_MODES)}")
+        if mode == "content_defined":
+            return ContentDefinedChunker(chunk_chars)
+        return StreamingChunker(chunk_chars, overlap_chars)
+
+    def chunk_content(self, content: str, chunk_chars: int, overlap_chars: int, mode: str = "fixed") -> list[str]:
+        if mode == "fixed":
+            return self.chunk_text(content, chunk_chars, overlap_chars)
+        return list(self.stream_chunks([content], chunk_chars, overlap_chars, mode=mode))
+
+    def stream_chunks(
+        self, pieces: Iterable[str], chunk_chars: int, overlap_chars: int, mode: str = "fixed"
+    ) -> Iterator[str]:
+        chunker = self.make_chunker(chunk_chars, overlap_chars, mode)
+        for piece in pieces:
+            yield from chunker.feed(piece)
+        yield from chunker.flush()
+
     def rank_chunks(self, chunks: list[str], query: str, top_k: int) -> list[SummaryChunk]:
-        keywords = self._keyword_set(query)
-        if not keywords:
-            keywords = {"summary"}
-
-        ranked: list[SummaryChunk] = []
-        for index, chunk in enumerate(chunks):
-            lowered = chunk.lower()
-            hits = sum(1 for keyword in keywords if keyword in lowered)
-            density = hits / max(1, math.log2(len(chunk) + 8))
-            score = float(hits + density)
-            ranked.append(SummaryChunk(index=index, text=chunk, score=score))
-
-        ranked.sort(key=lambda item: item.score, reverse=True)
-        return ranked[: max(1, min(top_k, len(ranked)))]
+        ranker = ChunkRanker(query, top_k)
+        for chunk in chunks:
+            ranker.add(chunk)
+        return ranker.ranked()
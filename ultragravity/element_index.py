@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+
+from PIL import Image, ImageDraw
+
+from .call_reduction import TTLCache
+
+# One DOM pass: visible interactive elements with boxes, role, label and a stable selector.
+ELEMENT_INDEX_SCRIPT = """
+(maxElements) => {
+    const selector = [
+        'a[href]', 'button', 'input:not([type=hidden])', 'select', 'textarea', 'summary',
+        '[role=button]', '[role=link]', '[role=tab]', '[role=menuitem]', '[role=checkbox]',
+        '[role=option]', '[role=textbox]', '[contenteditable=true]', '[onclick]', '[tabindex]:not([tabindex="-1"])'
+    ].join(',');
+    const cssEscape = (value) => (window.CSS && CSS.escape) ? CSS.escape(value) : value.replace(/[^a-zA-Z0-9_-]/g, '\\\\$&');
+    const stableSelector = (element) => {
+        if (element.id) { return '#' + cssEscape(element.id); }
+        for (const attribute of ['data-testid', 'data-test', 'name', 'aria-label']) {
+            const value = element.getAttribute(attribute);
+            if (value) { return element.tagName.toLowerCase() + '[' + attribute + '="' + value.replace(/"/g, '\\\\"') + '"]'; }
+        }
+        const parts = [];
+        let node = element;
+        while (node && node.nodeType === 1 && node !== document.body && parts.length < 6) {
+            let index = 1;
+            let sibling = node;
+            while ((sibling = sibling.previousElementSibling)) { if (sibling.tagName === node.tagName) { index += 1; } }
+            parts.unshift(node.tagName.toLowerCase() + ':nth-of-type(' + index + ')');
+            if (node.parentElement && node.parentElement.id) {
+                parts.unshift('#' + cssEscape(node.parentElement.id));
+                break;
+            }
+            node = node.parentElement;
+        }
+        return parts.join(' > ');
+    };
+    const results = [];
+    for (const element of document.querySelectorAll(selector)) {
+        if (results.length >= maxElements) { break; }
+        const rect = element.getBoundingClientRect();
+        if (rect.width < 2 || rect.height < 2) { continue; }
+        if (rect.bottom < 0 || rect.right < 0 || rect.top > innerHeight || rect.left > innerWidth) { continue; }
+        const style = getComputedStyle(element);
+        if (style.visibility === 'hidden' || style.display === 'none' || Number(style.opacity) === 0) { continue; }
+        const label = (element.getAttribute('aria-label') || element.innerText || element.value
+            || element.getAttribute('placeholder') || element.getAttribute('title') || '').trim().replace(/\\s+/g, ' ');
+        results.push({
+            role: element.getAttribute('role') || element.tagName.toLowerCase(),
+            text: label.slice(0, 60),
+            selector: stableSelector(element),
+            box: [Math.round(rect.left), Math.round(rect.top), Math.round(rect.width), Math.round(rect.height)],
+        });
+    }
+    return results;
+}
+"""
+
+
+@dataclass(frozen=True)
+class MarkedElement:
+    mark: int
+    role: str
+    text: str
+    selector: str
+    box: tuple[int, int, int, int]
+
+    @property
+    def element_id(self) -> str:
+        return f"m{self.mark}"
+
+    @property
+    def center(self) -> tuple[int, int]:
+        x, y, width, height = self.box
+        return x + width // 2, y + height // 2
+
+
+@dataclass(frozen=True)
+class ElementIndex:
+    url: str
+    dom_hash: str
+    elements: tuple[MarkedElement, ...]
+
+    def get(self, element_id: str) -> MarkedElement | None:
+        mark = parse_mark(element_id)
+        if mark is None or not 1 <= mark <= len(self.elements):
+            return None
+        return self.elements[mark - 1]
+
+    def legend(self) -> str:
+        return "\n".join(f'{element.mark} {element.role} "{element.text}"' for element in self.elements)
+
+
+def parse_mark(value: Any) -> int | None:
+    """Accepts ``12``, ``"12"`` or ``"m12"`` as returned by the model."""
+    text = str(value).strip().lower().removeprefix("m")
+    return int(text) if text.isdigit() else None
+
+
+def dom_hash(url: str, raw_elements: list[dict[str, Any]]) -> str:
+    """Hashes roles, labels and selectors but not boxes, so layout shifts keep the hash."""
+    structure = [(item.get("role"), item.get("text"), item.get("selector")) for item in raw_elements]
+    payload = json.dumps({"url": url, "elements": structure}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def build_element_index(url: str, raw_elements: list[dict[str, Any]]) -> ElementIndex:
+    elements = []
+    for position, item in enumerate(raw_elements, start=1):
+        box = item.get("box") or [0, 0, 0, 0]
+        elements.append(
+            MarkedElement(
+                mark=position,
+                role=str(item.get("role") or ""),
+                text=str(item.get("text") or ""),
+                selector=str(item.get("selector") or ""),
+                box=(int(box[0]), int(box[1]), int(box[2]), int(box[3])),
+            )
+        )
+    return ElementIndex(url=url, dom_hash=dom_hash(url, raw_elements), elements=tuple(elements))
+
+
+# Cheap per-call probe: a MutationObserver bumps a version on any DOM change, and the
+# stamp adds a per-document token plus scroll and viewport, which move boxes without mutating.
+DOM_STAMP_SCRIPT = """
+() => {
+    if (!window.__ultragravityDomStamp) {
+        const stamp = { token: Math.random().toString(36).slice(2), version: 0 };
+        new MutationObserver(() => { stamp.version++; }).observe(document, {
+            subtree: true, childList: true, attributes: true, characterData: true,
+        });
+        window.__ultragravityDomStamp = stamp;
+    }
+    const stamp = window.__ultragravityDomStamp;
+    return [stamp.token, stamp.version, Math.round(window.scrollX), Math.round(window.scrollY),
+        window.innerWidth, window.innerHeight].join(':');
+}
+"""
+
+
+class ElementIndexCache:
+    """Keeps indexes per (URL, DOM hash) so marks from cached plans can be resolved.
+
+    Indexes are also filed under the page's DOM stamp (``DOM_STAMP_SCRIPT``), so an
+    unchanged page is looked up by ``lookup`` instead of re-running the marking pass.
+    """
+
+    def __init__(self, ttl_seconds: int = 600, max_entries: int = 64):
+        self._cache = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self._by_stamp = TTLCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+
+    @staticmethod
+    def key(url: str, digest: str) -> str:
+        return f"{url}#{digest}"
+
+    def get(self, url: str, digest: str) -> ElementIndex | None:
+        return self._cache.get(self.key(url, digest))
+
+    def lookup(self, url: str, stamp: str) -> ElementIndex | None:
+        if not stamp:
+            return None
+        return self._by_stamp.get(self.key(url, stamp))
+
+    def put(self, index: ElementIndex, stamp: str = "") -> ElementIndex:
+        # Same hash means same marks; the newer boxes win.
+        self._cache.set(self.key(index.url, index.dom_hash), index)
+        if stamp:
+            self._by_stamp.set(self.key(index.url, stamp), index)
+        return index
+
+    def stats(self) -> dict[str, int]:
+        return self._cache.stats()
+
+
+def draw_marks(image_path: str, index: ElementIndex, output_path: str, scale: float = 1.0) -> str:
+    """Draws a numbered box per element; ``scale`` maps CSS pixels to image pixels."""
+    image = Image.open(image_path).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for element in index.elements:
+        x, y, width, height = (int(round(value * scale)) for value in element.box)
+        draw.rectangle([x, y, x + width, y + height], outline=(255, 0, 80), width=2)
+        label = str(element.mark)
+        label_width = 7 * len(label) + 6
+        top = max(0, y - 14)
+        draw.rectangle([x, top, x + label_width, top + 14], fill=(255, 0, 80))
+        draw.text((x + 3, top + 1), label, fill=(255, 255, 255))
+    image.save(output_path)
+    return output_path
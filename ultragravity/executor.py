@@ -4,7 +4,7 @@ import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Callable
+from typing import Callable, Protocol
 
 from .planner import ExecutionPlan, PlanStep, StepType
 
@@ -37,6 +37,52 @@ class ExecutionState:
     recovery_context: dict[str, object] = field(default_factory=dict)
 
 
+def execution_state_to_dict(state: ExecutionState) -> dict[str, object]:
+    return {
+        "plan_id": state.plan_id,
+        "current_step_index": state.current_step_index,
+        "aborted": state.aborted,
+        "completed": state.completed,
+        "recovery_context": dict(state.recovery_context),
+        "records": {
+            key: {
+                "status": record.status.value,
+                "attempts": record.attempts,
+                "error": record.error,
+                "started_at": record.started_at,
+                "finished_at": record.finished_at,
+            }
+            for key, record in state.records.items()
+        },
+    }
+
+
+def execution_state_from_dict(payload: dict[str, object]) -> ExecutionState:
+    records: dict[str, StepExecutionRecord] = {}
+    for key, raw in (payload.get("records") or {}).items():
+        records[str(key)] = StepExecutionRecord(
+            step_id=str(key),
+            status=StepStatus(raw.get("status", StepStatus.PENDING.value)),
+            attempts=int(raw.get("attempts", 0)),
+            error=str(raw.get("error", "")),
+            started_at=str(raw.get("started_at", "")),
+            finished_at=str(raw.get("finished_at", "")),
+        )
+    return ExecutionState(
+        plan_id=str(payload.get("plan_id", "")),
+        current_step_index=int(payload.get("current_step_index", 0)),
+        records=records,
+        aborted=bool(payload.get("aborted", False)),
+        completed=bool(payload.get("completed", False)),
+        recovery_context=dict(payload.get("recovery_context") or {}),
+    )
+
+
+class ExecutionCheckpointSink(Protocol):
+    def record(self, state: ExecutionState, step_id: str) -> None:
+        ...
+
+
 @dataclass(frozen=True)
 class CheckpointDecision:
     approved: bool
@@ -63,19 +109,52 @@ StepHandler = Callable[[PlanStep, ExecutionState], tuple[bool, dict[str, object]
 
 
 class PlanExecutor:
-    def __init__(self, checkpoint_broker: CheckpointBroker | None = None, sleep_fn: Callable[[float], None] = time.sleep):
+    def __init__(
+        self,
+        checkpoint_broker: CheckpointBroker | None = None,
+        sleep_fn: Callable[[float], None] = time.sleep,
+        checkpointer: ExecutionCheckpointSink | None = None,
+    ):
         self.checkpoint_broker = checkpoint_broker or CheckpointBroker()
         self.sleep_fn = sleep_fn
+        self.checkpointer = checkpointer
 
     @staticmethod
     def _timestamp() -> str:
         return datetime.now(timezone.utc).isoformat()
 
+    def _checkpoint(self, state: ExecutionState, step_id: str) -> None:
+        if self.checkpointer is not None:
+            self.checkpointer.record(state, step_id)
+
+    def resume(
+        self,
+        plan: ExecutionPlan,
+        handlers: dict[StepType, StepHandler],
+        state: ExecutionState,
+    ) -> ExecutionState:
+        for record in state.records.values():
+            if record.status != StepStatus.SUCCEEDED:
+                record.status = StepStatus.PENDING
+                record.error = ""
+        state.aborted = False
+        state.completed = False
+        state.current_step_index = next(
+            (
+                index
+                for index, step in enumerate(plan.steps)
+                if state.records.get(step.id) is None or state.records[step.id].status != StepStatus.SUCCEEDED
+            ),
+            len(plan.steps),
+        )
+        return self.execute(plan, handlers, state=state, skip_succeeded=True)
+
     def execute(
         self,
         plan: ExecutionPlan,
         handlers: dict[StepType, StepHandler],
         state: ExecutionState | None = None,
+        skip_succeeded: bool = False,
     ) -> ExecutionState:
         execution_state = state or ExecutionState(plan_id=plan.id)
 
@@ -87,7 +166,11 @@ class PlanExecutor:
 
         while execution_state.current_step_index < len(plan.steps):
             step = plan.steps[execution_state.current_step_index]
-            record = execution_state.records[step.id]
+            record = execution_state.records.setdefault(step.id, StepExecutionRecord(step_id=step.id))
+
+            if skip_succeeded and record.status == StepStatus.SUCCEEDED:
+                execution_state.current_step_index += 1
+                continue
 
             for dependency in step.depends_on:
                 dependency_record = execution_state.records.get(dependency)
@@ -101,6 +184,7 @@ class PlanExecutor:
                             "reason": record.error,
                         }
                     )
+                    self._checkpoint(execution_state, step.id)
                     return execution_state
 
             if step.checkpoint_required:
@@ -116,6 +200,7 @@ class PlanExecutor:
                             "reason": decision.reason,
                         }
                     )
+                    self._checkpoint(execution_state, step.id)
                     return execution_state
 
             handler = handlers.get(step.step_type)
@@ -130,6 +215,7 @@ class PlanExecutor:
                         "reason": record.error,
                     }
                 )
+                self._checkpoint(execution_state, step.id)
                 return execution_state
 
             max_attempts = max(1, step.retry_policy.max_attempts)
@@ -138,6 +224,7 @@ class PlanExecutor:
                 record.attempts = attempt
                 if not record.started_at:
                     record.started_at = self._timestamp()
+                self._checkpoint(execution_state, step.id)
 
                 succeeded, payload, error = handler(step, execution_state)
                 if payload:
@@ -148,11 +235,13 @@ class PlanExecutor:
                     record.error = ""
                     record.finished_at = self._timestamp()
                     execution_state.current_step_index += 1
+                    self._checkpoint(execution_state, step.id)
                     break
 
                 record.status = StepStatus.FAILED
                 record.error = error
                 record.finished_at = self._timestamp()
+                self._checkpoint(execution_state, step.id)
 
                 if attempt < max_attempts:
                     backoff = step.retry_policy.backoff_seconds * attempt
@@ -171,6 +260,7 @@ class PlanExecutor:
                                     "failure_reason": error,
                                 }
                             )
+                            self._checkpoint(execution_state, step.id)
                             break
 
                     execution_state.aborted = True
@@ -180,8 +270,11 @@ class PlanExecutor:
                             "reason": error,
                         }
                     )
+                    self._checkpoint(execution_state, step.id)
                     return execution_state
 
         execution_state.completed = True
         execution_state.aborted = False
+        if plan.steps:
+            self._checkpoint(execution_state, plan.steps[-1].id)
         return execution_state
@@ -8,6 +8,7 @@ from .actions import Action, GatewayExecutionResult
 from .audit import AuditLogger
 from .permissions import PermissionBroker
 from .policy import PolicyEngine
+from .tracing import trace_span
 
 ExecutionType = TypeVar("ExecutionType")
 
@@ -22,8 +23,18 @@ class ActionGateway:
         self.policy_engine = policy_engine or PolicyEngine()
         self.permission_broker = permission_broker or PermissionBroker()
         self.audit_logger = audit_logger or AuditLogger()
+        self.decision_counts: dict[str, int] = {}
+
+    def _count(self, outcome: str) -> None:
+        self.decision_counts[outcome] = self.decision_counts.get(outcome, 0) + 1
 
     def execute(self, action: Action, executor: Callable[[], ExecutionType]) -> GatewayExecutionResult:
+        with trace_span("gateway.execute", tool=action.tool_name, operation=action.operation) as span:
+            result = self._execute(action, executor)
+            span.set(allowed=result.allowed, executed=result.executed)
+            return result
+
+    def _execute(self, action: Action, executor: Callable[[], ExecutionType]) -> GatewayExecutionResult:
         policy_decision = self.policy_engine.evaluate(action)
 
         self.audit_logger.write_event(
@@ -35,6 +46,7 @@ class ActionGateway:
         )
 
         if not policy_decision.allow:
+            self._count("blocked")
             self.audit_logger.write_event(
                 "action_blocked",
                 {
@@ -45,7 +57,8 @@ class ActionGateway:
             return GatewayExecutionResult(allowed=False, executed=False, error=policy_decision.reason)
 
         if policy_decision.require_prompt:
-            permission = self.permission_broker.request_approval(action)
+            with trace_span("gateway.approval"):
+                permission = self.permission_broker.request_approval(action)
             self.audit_logger.write_event(
                 "permission_outcome",
                 {
@@ -54,6 +67,7 @@ class ActionGateway:
                 },
             )
             if not permission.approved:
+                self._count("aborted" if permission.abort_requested else "denied")
                 return GatewayExecutionResult(
                     allowed=False,
                     executed=False,
@@ -73,6 +87,7 @@ class ActionGateway:
                     "success": True,
                 },
             )
+            self._count("executed")
             return GatewayExecutionResult(allowed=True, executed=True, result=result)
         except Exception as exc:  # pragma: no cover - explicit auditing branch
             duration_ms = int((perf_counter() - started) * 1000)
@@ -86,4 +101,5 @@ class ActionGateway:
                     "traceback": traceback.format_exc(),
                 },
             )
+            self._count("failed")
             return GatewayExecutionResult(allowed=True, executed=False, error=str(exc))
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any
+from urllib.parse import urlparse
+
+
+class InputSpeed(str, Enum):
+    HUMAN = "human"
+    FAST = "fast"
+    INSTANT = "instant"
+
+
+def _host_matches(host: str, pattern: str) -> bool:
+    pattern = pattern.lower().lstrip(".")
+    return host == pattern or host.endswith("." + pattern)
+
+
+@dataclass(frozen=True)
+class InputSpeedPolicy:
+    """Chooses how mouse and keyboard input is sent for a tool and, for the browser, a site.
+
+    Site rules beat tool rules, and the longest matching host pattern wins, so
+    ``intranet.example.com: instant`` can override ``example.com: fast``.
+    """
+
+    default: InputSpeed = InputSpeed.HUMAN
+    tools: dict[str, InputSpeed] = field(default_factory=dict)
+    sites: dict[str, InputSpeed] = field(default_factory=dict)
+
+    @classmethod
+    def from_config(cls, config: Any) -> "InputSpeedPolicy":
+        return cls(
+            default=InputSpeed(config.default),
+            tools={name: InputSpeed(speed) for name, speed in config.tools.items()},
+            sites={pattern: InputSpeed(speed) for pattern, speed in config.sites.items()},
+        )
+
+    def resolve(self, tool: str, url: str = "") -> InputSpeed:
+        host = (urlparse(url).hostname or "").lower() if url else ""
+        if host:
+            matches = [pattern for pattern in self.sites if _host_matches(host, pattern)]
+            if matches:
+                return self.sites[max(matches, key=len)]
+        return self.tools.get(tool, self.default)
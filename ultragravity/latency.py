@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+from typing import Any
+
+
+class LatencyHistogram:
+    """Log-linear (HDR-style) histogram of integer millisecond latencies.
+
+    Every power-of-two range is split into ``SUB_BUCKETS`` linear buckets, which
+    bounds the relative error to roughly 1/SUB_BUCKETS and the memory to a few
+    hundred sparse counters no matter how many samples are recorded.
+    """
+
+    SUB_BUCKETS = 16
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.total = 0
+        self.min_value = 0
+        self.max_value = 0
+
+    @classmethod
+    def bucket_index(cls, value: int) -> int:
+        value = int(value)
+        if value < 1:
+            return 0
+        exponent = value.bit_length() - 1
+        sub = ((value - (1 << exponent)) * cls.SUB_BUCKETS) >> exponent
+        return 1 + exponent * cls.SUB_BUCKETS + sub
+
+    @classmethod
+    def bucket_bounds(cls, index: int) -> tuple[float, float]:
+        if index <= 0:
+            return 0.0, 1.0
+        exponent, sub = divmod(index - 1, cls.SUB_BUCKETS)
+        base = float(1 << exponent)
+        width = base / cls.SUB_BUCKETS
+        return base + sub * width, base + (sub + 1) * width
+
+    def record(self, value: int, count: int = 1) -> None:
+        value = max(0, int(value))
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+        if self.total == 0:
+            self.min_value = value
+            self.max_value = value
+        else:
+            self.min_value = min(self.min_value, value)
+            self.max_value = max(self.max_value, value)
+        self.total += count
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.total == 0:
+            return
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        if self.total == 0:
+            self.min_value = other.min_value
+            self.max_value = other.max_value
+        else:
+            self.min_value = min(self.min_value, other.min_value)
+            self.max_value = max(self.max_value, other.max_value)
+        self.total += other.total
+
+    def percentile(self, quantile: float) -> float:
+        if self.total == 0:
+            return 0.0
+        # Nearest-rank definition: the smallest sample covering ``quantile``.
+        rank = max(1, math.ceil(min(1.0, max(0.0, quantile)) * self.total))
+        if rank >= self.total:
+            return float(self.max_value)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lower, upper = self.bucket_bounds(index)
+                estimate = (lower + upper) / 2.0
+                return float(min(max(estimate, self.min_value), self.max_value))
+        return float(self.max_value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "counts": {str(index): count for index, count in self.counts.items()},
+            "total": self.total,
+            "min": self.min_value,
+            "max": self.max_value,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any] | None) -> "LatencyHistogram":
+        histogram = cls()
+        if not payload:
+            return histogram
+        histogram.counts = {int(index): int(count) for index, count in (payload.get("counts") or {}).items()}
+        histogram.total = int(payload.get("total", sum(histogram.counts.values())))
+        histogram.min_value = int(payload.get("min", 0))
+        histogram.max_value = int(payload.get("max", 0))
+        return histogram
+
+
+def classify_error(error: str | None) -> str:
+    lowered = (error or "").lower()
+    if not lowered:
+        return "unknown"
+    if "429" in lowered or "quota" in lowered or ("rate" in lowered and "limit" in lowered):
+        return "rate_limit"
+    if "timeout" in lowered or "timed out" in lowered or "deadline" in lowered:
+        return "timeout"
+    if "401" in lowered or "403" in lowered or "api key" in lowered or "permission" in lowered or "unauthorized" in lowered:
+        return "auth"
+    if any(code in lowered for code in ("500", "502", "503", "504")) or "unavailable" in lowered or "internal" in lowered:
+        return "server"
+    if "connection" in lowered or "network" in lowered or "resolve" in lowered:
+        return "network"
+    return "other"
+
+
+def series_key(provider: str, model: str, operation: str) -> str:
+    return f"{provider}|{model}|{operation}"
+
+
+class LatencySeries:
+    """Streaming stats for one (provider, model, operation) triple."""
+
+    def __init__(self) -> None:
+        self.histogram = LatencyHistogram()
+        self.requests = 0
+        self.failures = 0
+        self.success_tokens = 0
+        self.success_latency_ms = 0
+        self.error_classes: dict[str, int] = {}
+
+    def record(self, latency_ms: int, actual_tokens: int, success: bool, error: str | None = None) -> None:
+        self.requests += 1
+        self.histogram.record(latency_ms)
+        if success:
+            self.success_tokens += max(0, actual_tokens)
+            self.success_latency_ms += max(0, latency_ms)
+            return
+        self.failures += 1
+        error_class = classify_error(error)
+        self.error_classes[error_class] = self.error_classes.get(error_class, 0) + 1
+
+    def merge(self, other: "LatencySeries") -> None:
+        self.histogram.merge(other.histogram)
+        self.requests += other.requests
+        self.failures += other.failures
+        self.success_tokens += other.success_tokens
+        self.success_latency_ms += other.success_latency_ms
+        for error_class, count in other.error_classes.items():
+            self.error_classes[error_class] = self.error_classes.get(error_class, 0) + count
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "latency_ms_p50": self.histogram.percentile(0.50),
+            "latency_ms_p90": self.histogram.percentile(0.90),
+            "latency_ms_p99": self.histogram.percentile(0.99),
+            "latency_ms_max": self.histogram.max_value,
+            "tokens_per_second": (self.success_tokens * 1000.0 / self.success_latency_ms) if self.success_latency_ms else 0.0,
+            "error_classes": dict(self.error_classes),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "histogram": self.histogram.to_dict(),
+            "requests": self.requests,
+            "failures": self.failures,
+            "success_tokens": self.success_tokens,
+            "success_latency_ms": self.success_latency_ms,
+            "error_classes": dict(self.error_classes),
+        }
+
+    @classmethod
+    def from_dict(cls, payload: dict[str, Any] | None) -> "LatencySeries":
+        series = cls()
+        if not payload:
+            return series
+        series.histogram = LatencyHistogram.from_dict(payload.get("histogram"))
+        series.requests = int(payload.get("requests", 0))
+        series.failures = int(payload.get("failures", 0))
+        series.success_tokens = int(payload.get("success_tokens", 0))
+        series.success_latency_ms = int(payload.get("success_latency_ms", 0))
+        series.error_classes = {str(key): int(value) for key, value in (payload.get("error_classes") or {}).items()}
+        return series
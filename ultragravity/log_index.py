@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable
+
+from .log_retention import is_compressed, logical_name, read_log_bytes
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def tail_lines(path: str | Path, limit: int, block_size: int = TAIL_BLOCK_SIZE) -> list[str]:
+    """Returns the last ``limit`` lines by reading fixed-size blocks backwards from EOF."""
+    if limit <= 0:
+        return []
+    path = Path(path)
+    if is_compressed(path):
+        # Closed segments are bounded in size; decompress them whole.
+        try:
+            return read_log_bytes(path).decode("utf-8", errors="replace").splitlines()[-limit:]
+        except (OSError, RuntimeError):
+            return []
+    try:
+        handle = path.open("rb")
+    except OSError:
+        return []
+
+    with handle:
+        handle.seek(0, os.SEEK_END)
+        position = handle.tell()
+        buffer = b""
+        while position > 0 and buffer.count(b"\n") <= limit:
+            read_size = min(block_size, position)
+            position -= read_size
+            handle.seek(position)
+            buffer = handle.read(read_size) + buffer
+
+    lines = buffer.decode("utf-8", errors="replace").splitlines()
+    return lines[-limit:]
+
+
+class IncrementalLogIndex:
+    """Folds JSONL records into per-file counters, resuming from a saved byte offset.
+
+    The index file stores, for every log file, the offset just past the last
+    complete line already processed and the counters folded from it. Appended
+    lines are the only thing read on later calls; a file that shrank or was
+    replaced (rotated or truncated) is re-read from the start. Entries are keyed
+    by the uncompressed name, and compression keeps the bytes identical, so
+    a compressed segment is only read past the offset already consumed.
+    """
+
+    def __init__(
+        self,
+        log_dir: str | Path,
+        pattern: str,
+        index_filename: str,
+        fold: Callable[[dict[str, int], dict[str, Any]], None],
+        empty_stats: Callable[[], dict[str, int]],
+    ):
+        self.log_dir = Path(log_dir)
+        self.pattern = pattern
+        self.index_path = self.log_dir / index_filename
+        self.fold = fold
+        self.empty_stats = empty_stats
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        if not isinstance(data.get("files"), dict):
+            data["files"] = {}
+        return data
+
+    def _save(self, data: dict[str, Any]) -> None:
+        temp_path = self.index_path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp_path, self.index_path)
+
+    def _consume(self, path: Path, entry: dict[str, Any]) -> bool:
+        if is_compressed(path):
+            if entry.get("compressed"):
+                return False
+            data = read_log_bytes(path)
+            entry["compressed"] = True
+            return self._fold_bytes(data[int(entry.get("offset", 0)) :], entry, final=True)
+
+        status = path.stat()
+        offset = int(entry.get("offset", 0))
+        if status.st_size < offset or entry.get("inode", status.st_ino) != status.st_ino:
+            entry["offset"] = offset = 0
+            entry["stats"] = self.empty_stats()
+        entry["inode"] = status.st_ino
+        if status.st_size == offset:
+            return False
+
+        with path.open("rb") as handle:
+            handle.seek(offset)
+            chunk = handle.read(status.st_size - offset)
+        return self._fold_bytes(chunk, entry, final=False)
+
+    def _fold_bytes(self, chunk: bytes, entry: dict[str, Any], final: bool) -> bool:
+        complete = len(chunk) if final else chunk.rfind(b"\n") + 1
+        if complete == 0:
+            return final
+
+        stats = entry["stats"]
+        for raw_line in chunk[:complete].splitlines():
+            try:
+                record = json.loads(raw_line)
+            except Exception:
+                continue
+            if isinstance(record, dict):
+                self.fold(stats, record)
+        entry["offset"] = int(entry.get("offset", 0)) + complete
+        return True
+
+    def update(self) -> dict[str, int]:
+        if not self.log_dir.exists():
+            return self.empty_stats()
+
+        data = self._load()
+        files: dict[str, Any] = data["files"]
+        present: dict[str, Path] = {}
+        for path in sorted(self.log_dir.glob(self.pattern)):
+            if path.name.endswith(".tmp"):
+                continue
+            name = logical_name(path)
+            # Prefer the live file if both exist mid-compression.
+            if name not in present or not is_compressed(path):
+                present[name] = path
+        changed = False
+        for name in list(files):
+            if name not in present:
+                del files[name]
+                changed = True
+
+        for name, path in sorted(present.items()):
+            entry = files.setdefault(name, {"offset": 0, "stats": self.empty_stats()})
+            changed = self._consume(path, entry) or changed
+
+        if changed:
+            self._save(data)
+
+        totals = self.empty_stats()
+        for entry in files.values():
+            for key, value in entry["stats"].items():
+                totals[key] = totals.get(key, 0) + int(value)
+        return totals
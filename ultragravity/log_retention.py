@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import gzip
+import os
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+_STAMP_PATTERN = re.compile(r"-(\d{8})(?:\.|$)")
+
+
+@dataclass(frozen=True)
+class LogRetentionPolicy:
+    compression: str = "gzip"
+    compress_after_days: int = 1
+    retention_days: int = 30
+    max_total_bytes: int = 0
+
+
+def is_compressed(path: Path) -> bool:
+    return path.suffix in COMPRESSED_SUFFIXES
+
+
+def logical_name(path: Path) -> str:
+    """File name with any compression suffix removed; stable across compression."""
+    return path.stem if is_compressed(path) else path.name
+
+
+def read_log_bytes(path: Path) -> bytes:
+    method = COMPRESSED_SUFFIXES.get(path.suffix)
+    if method == "gzip":
+        with gzip.open(path, "rb") as handle:
+            return handle.read()
+    if method == "zstd":
+        if zstandard is None:
+            raise RuntimeError(f"Reading {path.name} requires the 'zstandard' package")
+        with path.open("rb") as handle:
+            return zstandard.ZstdDecompressor().stream_reader(handle).read()
+    return path.read_bytes()
+
+
+def compress_file(path: Path, compression: str = "gzip") -> Path:
+    """Compresses ``path`` next to itself and removes the original.
+
+    Falls back to gzip when zstd is requested but ``zstandard`` is not installed.
+    """
+    if compression == "zstd" and zstandard is None:
+        compression = "gzip"
+    suffix = ".zst" if compression == "zstd" else ".gz"
+    target = path.with_name(path.name + suffix)
+    temp_path = path.with_name(path.name + suffix + ".tmp")
+
+    with path.open("rb") as source, temp_path.open("wb") as raw_output:
+        if compression == "zstd":
+            with zstandard.ZstdCompressor(level=10).stream_writer(raw_output) as output:
+                while block := source.read(1024 * 1024):
+                    output.write(block)
+        else:
+            with gzip.GzipFile(filename=path.name, mode="wb", fileobj=raw_output, compresslevel=6) as output:
+                while block := source.read(1024 * 1024):
+                    output.write(block)
+    os.replace(temp_path, target)
+    path.unlink()
+    return target
+
+
+def segment_day(path: Path) -> datetime | None:
+    match = _STAMP_PATTERN.search(logical_name(path))
+    if not match:
+        return None
+    try:
+        return datetime.strptime(match.group(1), "%Y%m%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def apply_log_retention(
+    log_dir: str | Path,
+    prefix: str,
+    policy: LogRetentionPolicy,
+    can_compress: Callable[[Path], bool] | None = None,
+    now: datetime | None = None,
+) -> dict[str, int]:
+    """Compresses closed day segments, then deletes by age and total size.
+
+    Segments stamped with today's UTC date are never touched, so live writers
+    keep appending to uncompressed files. Segments ``can_compress`` rejects
+    (telemetry not yet folded into its rollups) are neither compressed nor
+    deleted, so their records still reach the totals.
+    """
+    report = {"compressed": 0, "deleted": 0, "bytes_freed": 0}
+    directory = Path(log_dir)
+    if not directory.exists():
+        return report
+
+    today = (now or datetime.now(timezone.utc)).replace(hour=0, minute=0, second=0, microsecond=0)
+    segments: list[tuple[datetime, Path]] = []
+    for path in directory.glob(f"{prefix}*"):
+        if path.name.endswith(".tmp") or not path.is_file():
+            continue
+        day = segment_day(path)
+        if day is not None and day < today:
+            segments.append((day, path))
+    segments.sort(key=lambda item: (item[0], item[1].name))
+
+    kept: list[tuple[datetime, Path]] = []
+    protected_bytes = 0
+    for day, path in segments:
+        if can_compress is not None and not can_compress(path):
+            # Still counts toward the size cap; only folded segments make room for it.
+            protected_bytes += path.stat().st_size
+            continue
+        age_days = (today - day).days
+        if policy.retention_days > 0 and age_days > policy.retention_days:
+            report["bytes_freed"] += path.stat().st_size
+            path.unlink()
+            report["deleted"] += 1
+            continue
+        if policy.compression != "none" and not is_compressed(path) and age_days >= policy.compress_after_days:
+            before = path.stat().st_size
+            path = compress_file(path, policy.compression)
+            report["bytes_freed"] += max(0, before - path.stat().st_size)
+            report["compressed"] += 1
+        kept.append((day, path))
+
+    if policy.max_total_bytes > 0:
+        total = protected_bytes + sum(path.stat().st_size for _, path in kept)
+        for _, path in kept:
+            if total <= policy.max_total_bytes:
+                break
+            size = path.stat().st_size
+            path.unlink()
+            total -= size
+            report["bytes_freed"] += size
+            report["deleted"] += 1
+    return report
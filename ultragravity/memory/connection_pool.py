@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from typing import Callable
+
+
+class _ThreadConnection:
+    """Thread-local holder; when its thread exits the holder is collected and the connection closed."""
+
+    __slots__ = ("connection", "__weakref__")
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+
+
+class SQLiteConnectionPool:
+    """One lazily opened WAL connection per thread for a single database file."""
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        busy_timeout_seconds: float = 5.0,
+        cached_statements: int = 256,
+    ):
+        self.db_path = Path(db_path)
+        self.busy_timeout_seconds = max(0.0, busy_timeout_seconds)
+        self.cached_statements = max(0, cached_statements)
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._connections: list[sqlite3.Connection] = []
+        self._initialized = False
+
+    def _open(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_seconds,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_seconds * 1000)}")
+        return connection
+
+    def connection(self) -> sqlite3.Connection:
+        holder = getattr(self._local, "holder", None)
+        if holder is None:
+            connection = self._open()
+            holder = _ThreadConnection(connection)
+            self._local.holder = holder
+            with self._lock:
+                self._connections.append(connection)
+            weakref.finalize(holder, self._discard, connection)
+        return holder.connection
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            try:
+                self._connections.remove(connection)
+            except ValueError:
+                return
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+
+    def release(self) -> None:
+        """Closes only the calling thread's connection; other threads keep theirs."""
+        holder = getattr(self._local, "holder", None)
+        if holder is not None:
+            del self._local.holder
+            self._discard(holder.connection)
+
+    def run_once(self, setup: Callable[[sqlite3.Connection], None]) -> None:
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            setup(self.connection())
+            self._initialized = True
+
+    @property
+    def open_connections(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+    def close_all(self) -> None:
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._initialized = False
+        for connection in connections:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+_POOLS: dict[str, SQLiteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(db_path: str | Path) -> SQLiteConnectionPool:
+    key = str(Path(db_path).resolve())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(key)
+            _POOLS[key] = pool
+        return pool
+
+
+def close_all_pools() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close_all()
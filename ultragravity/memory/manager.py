@@ -89,3 +89,19 @@ class MemoryManager:
             return json.loads(raw)
         except Exception:
             return None
+
+    def append_execution_delta(self, plan_id: str, delta: dict[str, object]) -> None:
+        self.repository.append_execution_delta(plan_id, json.dumps(delta, ensure_ascii=False, separators=(",", ":")))
+
+    def load_execution_deltas(self, plan_id: str) -> list[dict[str, object]]:
+        deltas: list[dict[str, object]] = []
+        for raw in self.repository.load_execution_deltas(plan_id):
+            try:
+                deltas.append(json.loads(raw))
+            except Exception:
+                continue
+        return deltas
+
+    def compact_execution_state(self, plan_id: str, state_payload: dict[str, object]) -> None:
+        self.save_execution_state(plan_id, state_payload)
+        self.repository.clear_execution_deltas(plan_id)
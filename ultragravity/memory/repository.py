@@ -29,3 +29,12 @@ class MemoryRepository(Protocol):
 
     def load_execution_snapshot(self, plan_id: str) -> str | None:
         ...
+
+    def append_execution_delta(self, plan_id: str, payload_json: str) -> None:
+        ...
+
+    def load_execution_deltas(self, plan_id: str) -> list[str]:
+        ...
+
+    def clear_execution_deltas(self, plan_id: str) -> None:
+        ...
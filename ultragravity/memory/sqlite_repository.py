@@ -5,6 +5,7 @@ import re
 import sqlite3
 from pathlib import Path
 
+from .connection_pool import SQLiteConnectionPool, get_connection_pool
 from .migrations import MIGRATIONS
 from .models import MemoryEvent
 
@@ -14,12 +15,23 @@ class SQLiteMemoryRepository:
         self.db_path = Path(db_path)
         self.max_events = max(100, max_events)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._connection = sqlite3.connect(self.db_path)
-        self._connection.row_factory = sqlite3.Row
+        self._pool: SQLiteConnectionPool = get_connection_pool(self.db_path)
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        return self._pool.connection()
 
     def initialize(self) -> None:
-        with self._connection:
-            self._connection.execute(
+        self._pool.run_once(self._apply_migrations)
+
+    def close(self) -> None:
+        # The pool is shared process-wide; other repositories and threads keep their connections.
+        self._pool.release()
+
+    @staticmethod
+    def _apply_migrations(connection: sqlite3.Connection) -> None:
+        with connection:
+            connection.execute(
                 """
                 CREATE TABLE IF NOT EXISTS schema_migrations (
                     version INTEGER PRIMARY KEY,
@@ -28,14 +40,14 @@ class SQLiteMemoryRepository:
                 """
             )
             for version, sql in MIGRATIONS:
-                already = self._connection.execute(
+                already = connection.execute(
                     "SELECT 1 FROM schema_migrations WHERE version = ?",
                     (version,),
                 ).fetchone()
                 if already:
                     continue
-                self._connection.executescript(sql)
-                self._connection.execute(
+                connection.executescript(sql)
+                connection.execute(
                     "INSERT INTO schema_migrations(version) VALUES (?)",
                     (version,),
                 )
@@ -177,3 +189,24 @@ class SQLiteMemoryRepository:
         if not row:
             return None
         return str(row["payload_json"])
+
+    def append_execution_delta(self, plan_id: str, payload_json: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO execution_deltas(plan_id, payload_json) VALUES (?, ?)",
+                (plan_id, payload_json),
+            )
+
+    def load_execution_deltas(self, plan_id: str) -> list[str]:
+        rows = self._connection.execute(
+            "SELECT payload_json FROM execution_deltas WHERE plan_id = ? ORDER BY id ASC",
+            (plan_id,),
+        ).fetchall()
+        return [str(row["payload_json"]) for row in rows]
+
+    def clear_execution_deltas(self, plan_id: str) -> None:
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM execution_deltas WHERE plan_id = ?",
+                (plan_id,),
+            )
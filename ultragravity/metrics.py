@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+
+@dataclass(frozen=True)
+class MetricSample:
+    name: str
+    kind: str
+    help: str
+    value: float
+    labels: dict[str, str] = field(default_factory=dict)
+
+
+Collector = Callable[[], Iterable[MetricSample]]
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    number = float(value)
+    if number.is_integer():
+        return str(int(number))
+    return repr(number)
+
+
+def _render(samples: Iterable[MetricSample], openmetrics: bool) -> str:
+    families: dict[str, list[MetricSample]] = {}
+    for sample in samples:
+        families.setdefault(sample.name, []).append(sample)
+
+    lines: list[str] = []
+    for name, family in families.items():
+        kind = family[0].kind
+        suffix = "_total" if kind == "counter" else ""
+        # OpenMetrics names the counter family without "_total"; the classic text
+        # format (node_exporter's textfile collector) needs TYPE to match the samples.
+        family_name = name if openmetrics else f"{name}{suffix}"
+        lines.append(f"# TYPE {family_name} {kind}")
+        lines.append(f"# HELP {family_name} {family[0].help}")
+        for sample in family:
+            labels = ""
+            if sample.labels:
+                labels = "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in sorted(sample.labels.items())) + "}"
+            lines.append(f"{name}{suffix}{labels} {_format_value(sample.value)}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def render_openmetrics(samples: Iterable[MetricSample]) -> str:
+    """Renders samples as OpenMetrics text, grouping them into metric families."""
+    return _render(samples, openmetrics=True)
+
+
+def render_prometheus_text(samples: Iterable[MetricSample]) -> str:
+    """Renders samples in the classic Prometheus text format read by textfile collectors."""
+    return _render(samples, openmetrics=False)
+
+
+class MetricsRegistry:
+    """Collects samples from registered callables at scrape time.
+
+    Collectors read live in-process state (telemetry, budget windows, cache
+    counters), so a scrape never touches the JSONL or telemetry files.
+    """
+
+    def __init__(self, namespace: str = "ultragravity"):
+        self.namespace = namespace
+        self._collectors: list[Collector] = []
+        self._lock = threading.Lock()
+
+    def register(self, collector: Collector) -> None:
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> list[MetricSample]:
+        with self._lock:
+            collectors = list(self._collectors)
+        samples: list[MetricSample] = []
+        for collector in collectors:
+            try:
+                for sample in collector():
+                    samples.append(
+                        MetricSample(
+                            name=f"{self.namespace}_{sample.name}",
+                            kind=sample.kind,
+                            help=sample.help,
+                            value=sample.value,
+                            labels=sample.labels,
+                        )
+                    )
+            except Exception:
+                continue
+        return samples
+
+    def render(self) -> str:
+        return render_openmetrics(self.collect())
+
+    def render_text(self) -> str:
+        return render_prometheus_text(self.collect())
+
+    def write_textfile(self, path: str | Path) -> Path:
+        """Atomically writes the current exposition for a textfile collector."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = target.with_name(f".{target.name}.tmp")
+        temp_path.write_text(self.render_text(), encoding="utf-8")
+        os.replace(temp_path, target)
+        return target
+
+
+def telemetry_collector(telemetry: Any) -> Collector:
+    def collect() -> Iterable[MetricSample]:
+        for provider, stats in telemetry.snapshot().items():
+            labels = {"provider": provider}
+            yield MetricSample("provider_requests", "counter", "Provider calls issued.", stats["requests"], labels)
+            yield MetricSample("provider_failures", "counter", "Provider calls that failed.", stats["failures"], labels)
+            yield MetricSample("provider_tokens", "counter", "Tokens reported by providers.", stats["actual_tokens"], labels)
+            yield MetricSample(
+                "provider_estimated_tokens", "counter", "Tokens estimated before calls.", stats["estimated_tokens"], labels
+            )
+        for row in telemetry.latency_snapshot():
+            labels = {"provider": str(row["provider"]), "model": str(row["model"]), "operation": str(row["operation"])}
+            for quantile in ("p50", "p90", "p99"):
+                yield MetricSample(
+                    "provider_latency_ms",
+                    "gauge",
+                    "Provider call latency percentiles in milliseconds.",
+                    float(row[f"latency_ms_{quantile}"]),
+                    {**labels, "quantile": quantile},
+                )
+            yield MetricSample(
+                "provider_tokens_per_second", "gauge", "Output throughput of successful calls.", float(row["tokens_per_second"]), labels
+            )
+
+    return collect
+
+
+def budget_collector(budget_manager: Any, providers: Iterable[str]) -> Collector:
+    provider_names = list(providers)
+
+    def collect() -> Iterable[MetricSample]:
+        for provider in provider_names:
+            snapshot = budget_manager.provider_snapshot(provider)
+            if not snapshot:
+                continue
+            labels = {"provider": provider}
+            yield MetricSample("budget_rpm_current", "gauge", "Requests in the rolling minute window.", snapshot["rpm_current"], labels)
+            yield MetricSample("budget_rpm_soft_cap", "gauge", "Soft cap on requests per minute.", snapshot["rpm_soft_cap"], labels)
+            yield MetricSample("budget_tpm_current", "gauge", "Tokens in the rolling minute window.", snapshot["tpm_current"], labels)
+            yield MetricSample("budget_tpm_soft_cap", "gauge", "Soft cap on tokens per minute.", snapshot["tpm_soft_cap"], labels)
+            yield MetricSample("budget_daily_remaining", "gauge", "Requests left in today's quota.", snapshot["daily_remaining"], labels)
+
+    return collect
+
+
+def counters_collector(name: str, help_text: str, label: str, counters: Callable[[], dict[str, int]]) -> Collector:
+    def collect() -> Iterable[MetricSample]:
+        for key, value in counters().items():
+            yield MetricSample(name, "counter", help_text, value, {label: key})
+
+    return collect
+
+
+def cache_collector(caches: dict[str, Any]) -> Collector:
+    def collect() -> Iterable[MetricSample]:
+        for cache_name, cache in caches.items():
+            stats = cache.stats()
+            labels = {"cache": cache_name}
+            yield MetricSample("cache_hits", "counter", "Cache lookups that returned a value.", stats.get("hits", 0), labels)
+            yield MetricSample("cache_misses", "counter", "Cache lookups that missed.", stats.get("misses", 0), labels)
+            yield MetricSample("cache_entries", "gauge", "Live cache entries.", stats.get("entries", 0), labels)
+
+    return collect
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server signature
+        return
+
+
+class MetricsServer:
+    """Serves ``/metrics`` from a daemon thread; intended for localhost scraping."""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9464):
+        handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+        self._thread = None
+
+
+class TextfileWriter:
+    """Periodically rewrites a textfile-collector file until stopped."""
+
+    def __init__(self, registry: MetricsRegistry, path: str | Path, interval_seconds: float = 15.0):
+        self.registry = registry
+        self.path = Path(path)
+        self.interval_seconds = max(1.0, interval_seconds)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.registry.write_textfile(self.path)
+            except OSError:
+                continue
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.registry.write_textfile(self.path)
+        self._thread = threading.Thread(target=self._run, name="MetricsTextfileWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.registry.write_textfile(self.path)
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .call_reduction import normalize_instruction
+from .memory.connection_pool import SQLiteConnectionPool, get_connection_pool
+
+TRACKING_PARAMS = frozenset({"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref_src", "igshid"})
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# FNV-1a over the rendered text: a cheap fingerprint taken before running the extractor.
+PAGE_FINGERPRINT_SCRIPT = """
+() => {
+    const text = document.body ? document.body.innerText : '';
+    let hash = 0x811c9dc5;
+    for (let index = 0; index < text.length; index++) {
+        hash ^= text.charCodeAt(index);
+        hash = Math.imul(hash, 0x01000193) >>> 0;
+    }
+    return hash.toString(16).padStart(8, '0') + ':' + text.length;
+}
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_content (
+    url TEXT PRIMARY KEY,
+    validator TEXT NOT NULL DEFAULT '',
+    fingerprint TEXT NOT NULL DEFAULT '',
+    markdown TEXT NOT NULL,
+    chunks_json TEXT NOT NULL,
+    meta_json TEXT NOT NULL DEFAULT '{}',
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunk_summaries (
+    chunk_hash TEXT NOT NULL,
+    instruction_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (chunk_hash, instruction_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_page_content_updated ON page_content(updated_at);
+CREATE INDEX IF NOT EXISTS idx_chunk_summaries_updated ON chunk_summaries(updated_at);
+"""
+
+
+def normalize_url(url: str) -> str:
+    """Cache identity for a page: no fragment, tracking parameters or default port; sorted query."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = parts.path or "/"
+    if len(path) > 1 and path.endswith("/"):
+        path = path.rstrip("/")
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def validator_from_headers(headers: dict[str, str]) -> str:
+    """The document's HTTP validator: strong or weak ETag first, else Last-Modified."""
+    lowered = {key.lower(): value for key, value in headers.items()}
+    if lowered.get("etag"):
+        return f"etag:{lowered['etag']}"
+    if lowered.get("last-modified"):
+        return f"last-modified:{lowered['last-modified']}"
+    return ""
+
+
+def chunk_hash(chunk: str) -> str:
+    return hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+
+
+def _instruction_hash(instruction: str) -> str:
+    return hashlib.sha256(normalize_instruction(instruction).encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    url: str
+    validator: str
+    fingerprint: str
+    markdown: str
+    chunks: list[str]
+    meta: dict[str, Any] = field(default_factory=dict)
+
+
+class PageContentCache:
+    """Extracted pages and per-chunk summaries, kept across runs in SQLite.
+
+    A page is reused when its normalized URL matches and its rendered-text
+    fingerprint is unchanged; the HTTP validator (ETag / Last-Modified) is
+    only consulted when no fingerprint is available. Chunk summaries are keyed by chunk hash and instruction, so a
+    page that did change only pays for the chunks whose text changed.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = "data/page_cache.db",
+        ttl_seconds: int = 86_400,
+        max_pages: int = 500,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = max(1, ttl_seconds)
+        self.max_pages = max(1, max_pages)
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._pool: SQLiteConnectionPool = get_connection_pool(self.db_path)
+        # Own flag rather than pool.run_once: the pool may be shared with another store.
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @property
+    def _connection(self) -> sqlite3.Connection:
+        connection = self._pool.connection()
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    connection.executescript(SCHEMA)
+                    self._schema_ready = True
+        return connection
+
+    def get_page(self, url: str, validator: str = "", fingerprint: str = "") -> CachedPage | None:
+        row = self._connection.execute(
+            "SELECT * FROM page_content WHERE url = ? AND updated_at > ?",
+            (normalize_url(url), self.clock() - self.ttl_seconds),
+        ).fetchone()
+        if row is None:
+            matched = False
+        elif fingerprint:
+            # The rendered text is authoritative: JS-rendered and logged-in pages keep
+            # their shell's ETag while the visible content changes.
+            matched = row["fingerprint"] == fingerprint
+        else:
+            matched = bool(validator) and row["validator"] == validator
+        if not matched:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return CachedPage(
+            url=str(row["url"]),
+            validator=str(row["validator"]),
+            fingerprint=str(row["fingerprint"]),
+            markdown=str(row["markdown"]),
+            chunks=list(json.loads(row["chunks_json"])),
+            meta=dict(json.loads(row["meta_json"])),
+        )
+
+    def put_page(
+        self,
+        url: str,
+        markdown: str,
+        chunks: list[str],
+        validator: str = "",
+        fingerprint: str = "",
+        meta: dict[str, Any] | None = None,
+    ) -> None:
+        now = self.clock()
+        with self._connection as connection:
+            connection.execute(
+                """
+                INSERT INTO page_content(url, validator, fingerprint, markdown, chunks_json, meta_json, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    validator = excluded.validator,
+                    fingerprint = excluded.fingerprint,
+                    markdown = excluded.markdown,
+                    chunks_json = excluded.chunks_json,
+                    meta_json = excluded.meta_json,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    normalize_url(url),
+                    validator,
+                    fingerprint,
+                    markdown,
+                    json.dumps(chunks, ensure_ascii=False),
+                    json.dumps(meta or {}, ensure_ascii=False),
+                    now,
+                ),
+            )
+            self._prune(connection, now)
+
+    def _prune(self, connection: sqlite3.Connection, now: float) -> None:
+        expires_before = now - self.ttl_seconds
+        connection.execute("DELETE FROM page_content WHERE updated_at <= ?", (expires_before,))
+        connection.execute("DELETE FROM chunk_summaries WHERE updated_at <= ?", (expires_before,))
+        connection.execute(
+            """
+            DELETE FROM page_content WHERE url IN (
+                SELECT url FROM page_content ORDER BY updated_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_pages,),
+        )
+
+    def get_chunk_summaries(self, chunk_hashes: list[str], instruction: str) -> dict[str, str]:
+        if not chunk_hashes:
+            return {}
+        placeholders = ",".join("?" for _ in chunk_hashes)
+        rows = self._connection.execute(
+            f"""
+            SELECT chunk_hash, summary FROM chunk_summaries
+            WHERE instruction_hash = ? AND updated_at > ? AND chunk_hash IN ({placeholders})
+            """,
+            (_instruction_hash(instruction), self.clock() - self.ttl_seconds, *chunk_hashes),
+        ).fetchall()
+        return {str(row["chunk_hash"]): str(row["summary"]) for row in rows}
+
+    def put_chunk_summary(self, chunk_hash_value: str, instruction: str, summary: str) -> None:
+        with self._connection as connection:
+            connection.execute(
+                """
+                INSERT INTO chunk_summaries(chunk_hash, instruction_hash, summary, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(chunk_hash, instruction_hash)
+                DO UPDATE SET summary = excluded.summary, updated_at = excluded.updated_at
+                """,
+                (chunk_hash_value, _instruction_hash(instruction), summary, self.clock()),
+            )
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        self._pool.release()
@@ -0,0 +1,361 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+# Last resort when the block walk finds almost nothing (canvas apps, odd markup).
+BODY_TEXT_SCRIPT = "() => document.body ? document.body.innerText : ''"
+FALLBACK_PREFIX = "FALLBACK_TEXT_ONLY:\n"
+MIN_EXTRACTED_CHARS = 50
+
+# Walks the live DOM (no clone) and resumes where the previous call stopped;
+# each call returns blocks with roughly ``maxChars`` of text. Blocks carry the
+# features ``ContentFilter`` scores (link text, depth, boilerplate containers,
+# main-content membership) rather than final Markdown.
+PAGED_BLOCKS_SCRIPT = """
+(options) => {
+    let state = window.__ultragravityExtract;
+    if (options.reset || !state) {
+        const skipped = new Set(['script', 'style', 'noscript', 'iframe', 'svg', 'header', 'footer', 'nav', 'aside', 'template', 'canvas']);
+        const blocks = new Set(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'li', 'blockquote', 'pre', 'table']);
+        state = { lastBlock: null, done: false, root: pickMainRoot() };
+        state.walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT, {
+            acceptNode(node) {
+                if (skipped.has(node.localName)) { return NodeFilter.FILTER_REJECT; }
+                // Text of an emitted block already includes its nested blocks.
+                if (state.lastBlock && state.lastBlock.contains(node)) { return NodeFilter.FILTER_REJECT; }
+                return blocks.has(node.localName) ? NodeFilter.FILTER_ACCEPT : NodeFilter.FILTER_SKIP;
+            },
+        });
+        window.__ultragravityExtract = state;
+    }
+
+    function pickMainRoot() {
+        // Readability-style: paragraphs vote for their parent (full weight) and
+        // two further ancestors (halved each level); link-heavy containers lose.
+        const scores = new Map();
+        for (const paragraph of document.body.querySelectorAll('p, pre, td')) {
+            const text = paragraph.textContent.trim();
+            if (text.length < 25) { continue; }
+            const score = 1 + Math.min(3, Math.floor(text.length / 100)) + (text.match(/,/g) || []).length;
+            let ancestor = paragraph.parentElement;
+            for (let level = 0, weight = 1; ancestor && level < 3; level++, weight /= 2) {
+                scores.set(ancestor, (scores.get(ancestor) || 0) + score * weight);
+                ancestor = ancestor.parentElement;
+            }
+        }
+        const top = [...scores.entries()].sort((a, b) => b[1] - a[1]).slice(0, 5);
+        let best = null, bestScore = 0;
+        for (const [candidate, score] of top) {
+            const textLength = candidate.textContent.length || 1;
+            let linkLength = 0;
+            for (const link of candidate.querySelectorAll('a')) { linkLength += link.textContent.length; }
+            const adjusted = score * (1 - Math.min(1, linkLength / textLength));
+            if (adjusted > bestScore) { best = candidate; bestScore = adjusted; }
+        }
+        return best || document.querySelector('article, main, [role=main]') || document.body;
+    }
+
+    const boilerplate = ['cookie', 'consent', 'gdpr', 'related', 'recommend', 'share', 'social', 'promo', 'advert',
+        'sponsor', 'newsletter', 'subscribe', 'comment', 'sidebar', 'popup', 'modal', 'banner', 'breadcrumb']
+        .map(word => `[class*="${word}" i], [id*="${word}" i]`)
+        .concat(['[role=dialog]', '[role=complementary]', '[aria-modal=true]'])
+        .join(', ');
+
+    const out = [];
+    let size = 0;
+    while (size < options.maxChars) {
+        const node = state.walker.nextNode();
+        if (!node) { state.done = true; break; }
+        state.lastBlock = node;
+        if (!(node.offsetWidth || node.offsetHeight || node.getClientRects().length)) { continue; }
+        const text = node.innerText.trim();
+        if (!text) { continue; }
+
+        let linkChars = 0;
+        for (const link of node.querySelectorAll('a')) { linkChars += link.innerText.trim().length; }
+        if (node.closest('a')) { linkChars = text.length; }
+        let depth = 0;
+        for (let parent = node.parentElement; parent && parent !== document.body; parent = parent.parentElement) { depth++; }
+
+        // A matching wrapper around the main content (e.g. "modal-open" on a page shell) is not chrome.
+        const holder = node.closest(boilerplate);
+        const block = {
+            tag: node.localName,
+            text: text,
+            linkChars: linkChars,
+            depth: depth,
+            boilerplate: !!holder && !holder.contains(state.root),
+            main: state.root.contains(node),
+        };
+        if (node.localName === 'table') {
+            block.rows = Array.from(node.rows).slice(0, 200).map(row =>
+                Array.from(row.cells).map(cell => cell.innerText.trim().replace(/\\s+/g, ' ')));
+        }
+        out.push(block);
+        size += text.length;
+    }
+    return { blocks: out, done: state.done };
+}
+"""
+
+_SHINGLE_WORDS = re.compile(r"\w+")
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """64-bit SimHash over word shingles; near-identical paragraphs land a few bits apart."""
+    words = _SHINGLE_WORDS.findall(text.lower())
+    if len(words) < shingle_size:
+        shingles = [" ".join(words)]
+    else:
+        shingles = [" ".join(words[index : index + shingle_size]) for index in range(len(words) - shingle_size + 1)]
+    weights = [0] * 64
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def table_to_markdown(rows: list[list[str]]) -> str:
+    rows = [[cell.replace("|", "\\|") for cell in row] for row in rows if any(cell for cell in row)]
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    padded = [row + [""] * (width - len(row)) for row in rows]
+    lines = ["| " + " | ".join(padded[0]) + " |", "|" + " --- |" * width]
+    lines.extend("| " + " | ".join(row) + " |" for row in padded[1:])
+    return "\n".join(lines) + "\n\n"
+
+
+def format_block(block: dict[str, Any]) -> str:
+    tag = block.get("tag", "p")
+    text = block.get("text", "")
+    if tag == "table" and block.get("rows"):
+        return table_to_markdown(block["rows"])
+    if len(tag) == 2 and tag.startswith("h") and tag[1].isdigit():
+        return "#" * int(tag[1]) + " " + text + "\n\n"
+    if tag == "li":
+        return "- " + text + "\n"
+    if tag == "pre":
+        return "```\n" + text + "\n```\n\n"
+    if tag == "blockquote":
+        return "> " + text + "\n\n"
+    return text + "\n\n"
+
+
+@dataclass
+class ContentFilter:
+    """Scores extracted blocks as main content or boilerplate and drops near-duplicates.
+
+    A block scores up for its text length (capped) and for sitting inside the
+    page's main-content container, and down for link density, a boilerplate
+    ancestor (cookie banners, related lists, comment threads) and deep widget
+    nesting; headings get a bonus so short section titles survive. Paragraphs
+    of eight or more words are compared by SimHash, shorter ones exactly.
+    """
+
+    min_score: float = 0.5
+    max_duplicate_distance: int = 3
+    kept_chars: int = 0
+    dropped_chars: int = 0
+    dropped_by_reason: dict[str, int] = field(default_factory=dict)
+    _exact: set[str] = field(default_factory=set, repr=False)
+    # SimHash split into four 16-bit bands: a fingerprint within 3 bits of a
+    # seen one shares at least one band with it, so only those are compared.
+    _bands: list[dict[int, list[int]]] = field(default_factory=lambda: [{} for _ in range(4)], repr=False)
+
+    @staticmethod
+    def score(block: dict[str, Any]) -> float:
+        text_length = len(block.get("text", ""))
+        link_density = min(1.0, block.get("linkChars", 0) / max(1, text_length))
+        score = min(3.0, text_length / 80) - 4.0 * link_density
+        if block.get("main"):
+            score += 1.5
+        if block.get("boilerplate"):
+            score -= 3.0
+        tag = block.get("tag", "")
+        if len(tag) == 2 and tag.startswith("h") and link_density < 0.5:
+            score += 1.5
+        return score - max(0, block.get("depth", 0) - 12) * 0.1
+
+    def _is_duplicate(self, text: str) -> bool:
+        normalized = " ".join(text.lower().split())
+        if normalized in self._exact:
+            return True
+        self._exact.add(normalized)
+        if len(normalized.split()) < 8:
+            return False
+        fingerprint = simhash(normalized)
+        bands = [fingerprint >> (16 * index) & 0xFFFF for index in range(4)]
+        for index, band in enumerate(bands):
+            for seen in self._bands[index].get(band, []):
+                if bin(fingerprint ^ seen).count("1") <= self.max_duplicate_distance:
+                    return True
+        for index, band in enumerate(bands):
+            self._bands[index].setdefault(band, []).append(fingerprint)
+        return False
+
+    def _drop(self, reason: str, size: int) -> None:
+        self.dropped_chars += size
+        self.dropped_by_reason[reason] = self.dropped_by_reason.get(reason, 0) + size
+
+    def filter(self, blocks: list[dict[str, Any]]) -> str:
+        """Markdown for the kept blocks; dropped text is counted by reason."""
+        parts = []
+        for block in blocks:
+            size = len(block.get("text", ""))
+            if self.score(block) < self.min_score:
+                if block.get("boilerplate"):
+                    self._drop("boilerplate", size)
+                elif block.get("linkChars", 0) > size / 2:
+                    self._drop("link_dense", size)
+                else:
+                    self._drop("low_score", size)
+                continue
+            if self._is_duplicate(block.get("text", "")):
+                self._drop("duplicate", size)
+                continue
+            self.kept_chars += size
+            parts.append(format_block(block))
+        return "".join(parts)
+
+
+def iter_page_blocks(page: Any, batch_chars: int = 20_000, max_batches: int = 500) -> Iterator[list[dict[str, Any]]]:
+    """Yields scored-feature blocks in batches of roughly ``batch_chars`` text from paged evaluate calls."""
+    options = {"reset": True, "maxChars": max(1000, batch_chars)}
+    for _ in range(max_batches):
+        batch = page.evaluate(PAGED_BLOCKS_SCRIPT, options) or {}
+        options = {**options, "reset": False}
+        if batch.get("blocks"):
+            yield batch["blocks"]
+        if batch.get("done"):
+            return
+
+
+def iter_page_markdown(
+    page: Any,
+    batch_chars: int = 20_000,
+    max_batches: int = 500,
+    content_filter: ContentFilter | None = None,
+) -> Iterator[str]:
+    """Yields the main content as Markdown batches; pass ``content_filter`` to read its counts."""
+    content_filter = content_filter if content_filter is not None else ContentFilter()
+    for blocks in iter_page_blocks(page, batch_chars, max_batches):
+        markdown = content_filter.filter(blocks)
+        if markdown:
+            yield markdown
+
+
+@dataclass(frozen=True)
+class PageFetchResult:
+    url: str
+    status: str
+    content: str = ""
+    title: str = ""
+    final_url: str = ""
+    error: str = ""
+    elapsed_ms: int = 0
+    kept_chars: int = 0
+    dropped_chars: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+START_NAVIGATION_SCRIPT = "(url) => { window.location.href = url; }"
+# Chromium's own error page (DNS failure, refused connection) replaces the target document.
+CHROME_ERROR_PREFIX = "chrome-error://"
+
+
+def _left_blank_page(url: str) -> bool:
+    return url not in ("", "about:blank")
+
+
+def _is_timeout(exc: Exception) -> bool:
+    return "timeout" in type(exc).__name__.lower()
+
+
+def fetch_pages(
+    context: Any,
+    urls: list[str],
+    max_concurrency: int = 4,
+    timeout_seconds: float = 15.0,
+    clock: Callable[[], float] = time.monotonic,
+) -> list[PageFetchResult]:
+    """Loads ``urls`` in up to ``max_concurrency`` tabs of ``context`` at once.
+
+    Navigations are started by assigning ``location`` from the blank tab, which
+    returns at once, so DNS and time-to-first-byte overlap across the window
+    instead of queueing behind each other. The oldest tab is then waited on,
+    extracted with the same scored, de-duplicated block walk as
+    ``ExtractionSkill`` and closed, and its slot refilled. Every tab has its own
+    ``timeout_seconds`` deadline counted from when it was opened. Results keep
+    the order of ``urls``.
+    """
+    results: list[PageFetchResult | None] = [None] * len(urls)
+    pending = deque(enumerate(urls))
+    active: deque[tuple[int, str, Any, float]] = deque()
+    limit = max(1, max_concurrency)
+
+    def remaining_ms(started: float) -> float:
+        return max(1.0, (timeout_seconds - (clock() - started)) * 1000)
+
+    def finish(index: int, url: str, started: float, **fields: Any) -> None:
+        results[index] = PageFetchResult(url=url, elapsed_ms=int((clock() - started) * 1000), **fields)
+
+    def close(page: Any) -> None:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    while pending or active:
+        while pending and len(active) < limit:
+            index, url = pending.popleft()
+            started = clock()
+            page = None
+            try:
+                page = context.new_page()
+                page.evaluate(START_NAVIGATION_SCRIPT, url)
+            except Exception as exc:
+                finish(index, url, started, status="error", error=str(exc)[:200])
+                if page is not None:
+                    close(page)
+                continue
+            active.append((index, url, page, started))
+
+        if not active:
+            continue
+        index, url, page, started = active.popleft()
+        try:
+            page.wait_for_url(_left_blank_page, wait_until="domcontentloaded", timeout=remaining_ms(started))
+            if page.url.startswith(CHROME_ERROR_PREFIX):
+                finish(index, url, started, status="error", error=f"navigation to {url} failed", final_url=url)
+            else:
+                content_filter = ContentFilter()
+                content = "".join(iter_page_markdown(page, content_filter=content_filter))
+                if len(content) < MIN_EXTRACTED_CHARS:
+                    content = FALLBACK_PREFIX + (page.evaluate(BODY_TEXT_SCRIPT) or "")
+                finish(
+                    index,
+                    url,
+                    started,
+                    status="ok",
+                    content=content,
+                    title=page.title(),
+                    final_url=page.url,
+                    kept_chars=content_filter.kept_chars,
+                    dropped_chars=content_filter.dropped_chars,
+                )
+        except Exception as exc:
+            finish(index, url, started, status="timeout" if _is_timeout(exc) else "error", error=str(exc)[:200])
+        finally:
+            close(page)
+
+    return [result for result in results if result is not None]
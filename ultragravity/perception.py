@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+from PIL import Image
+
+from .capture import Frame, Region, as_frame
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+
+@dataclass(frozen=True)
+class TextMatch:
+    text: str
+    box: Region
+    confidence: float
+
+
+@dataclass(frozen=True)
+class PerceptionResult:
+    found: bool
+    confidence: float
+    # "ocr" | "template" | "vision" | "unavailable"
+    source: str
+    box: Region | None = None
+    text: str = ""
+
+    @property
+    def center(self) -> tuple[int, int] | None:
+        if self.box is None:
+            return None
+        return self.box.left + self.box.width // 2, self.box.top + self.box.height // 2
+
+
+def _normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", "", text.lower())).strip()
+
+
+def tesseract_words(image: Image.Image, language: str = "eng") -> list[TextMatch]:
+    """Words Tesseract reads in ``image``, with their boxes and 0..1 confidences."""
+    data = pytesseract.image_to_data(image, lang=language, output_type=pytesseract.Output.DICT)
+    words: list[TextMatch] = []
+    for index, text in enumerate(data["text"]):
+        confidence = float(data["conf"][index])
+        if not text.strip() or confidence < 0:
+            continue
+        box = Region(int(data["left"][index]), int(data["top"][index]), int(data["width"][index]), int(data["height"][index]))
+        words.append(TextMatch(text=text, box=box, confidence=confidence / 100))
+    return words
+
+
+def normalized_cross_correlation(image: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """Zero-mean normalized correlation of ``template`` at every valid offset in ``image`` (OpenCV's TM_CCOEFF_NORMED)."""
+    image = image.astype(np.float64)
+    template = template.astype(np.float64)
+    height, width = template.shape
+    if image.shape[0] < height or image.shape[1] < width:
+        return np.zeros((0, 0))
+    if cv2 is not None:
+        return cv2.matchTemplate(image.astype(np.float32), template.astype(np.float32), cv2.TM_CCOEFF_NORMED)
+
+    centered = template - template.mean()
+    template_norm = float(np.sqrt((centered * centered).sum()))
+    rows, cols = image.shape[0] - height + 1, image.shape[1] - width + 1
+    if template_norm == 0:
+        return np.zeros((rows, cols))
+    shape = (image.shape[0] + height - 1, image.shape[1] + width - 1)
+    spectrum = np.fft.rfft2(image, shape) * np.fft.rfft2(centered[::-1, ::-1], shape)
+    numerator = np.fft.irfft2(spectrum, shape)[height - 1 : image.shape[0], width - 1 : image.shape[1]]
+
+    def window_sums(values: np.ndarray) -> np.ndarray:
+        integral = np.pad(values.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+        return integral[height:, width:] - integral[:-height, width:] - integral[height:, :-width] + integral[:-height, :-width]
+
+    sums = window_sums(image)
+    variance = np.maximum(window_sums(image * image) - sums * sums / (height * width), 0.0)
+    denominator = np.sqrt(variance) * template_norm
+    # Flat windows cannot match a textured template.
+    return np.where(denominator > 1e-6, numerator / np.maximum(denominator, 1e-6), 0.0)
+
+
+def resolve_perception(
+    local: PerceptionResult | None,
+    min_confidence: float,
+    ask_vision: Callable[[], PerceptionResult] | None,
+) -> PerceptionResult:
+    """The local answer when it is confident enough, else the vision model's (if escalation is allowed)."""
+    if local is not None and local.found and local.confidence >= min_confidence:
+        return local
+    if ask_vision is None:
+        if local is None:
+            return PerceptionResult(found=False, confidence=0.0, source="unavailable")
+        return PerceptionResult(found=False, confidence=local.confidence, source=local.source, box=local.box, text=local.text)
+    return ask_vision()
+
+
+def perception_from_plan(
+    plan: dict | None,
+    description: str,
+    locate: bool,
+    region: Region | None = None,
+) -> PerceptionResult:
+    """Reads a verify ("done"/"fail") or locate ("click" + coordinates) answer from the vision model."""
+    if plan is None:
+        return PerceptionResult(found=False, confidence=0.0, source="vision", text=description)
+    action = str(plan.get("action", "")).lower()
+    if not locate:
+        return PerceptionResult(found=action == "done", confidence=0.9, source="vision", text=description)
+    coords = (plan.get("target_element") or {}).get("coordinates")
+    if action != "click" or not coords:
+        return PerceptionResult(found=False, confidence=0.9, source="vision", text=description)
+    left = int(coords[0]) + (region.left if region is not None else 0)
+    top = int(coords[1]) + (region.top if region is not None else 0)
+    return PerceptionResult(found=True, confidence=0.9, source="vision", box=Region(left, top, 1, 1), text=description)
+
+
+class LocalPerception:
+    """CPU-only answers to targeted screen questions: is this text there, where is this button.
+
+    Text goes through OCR (Tesseract when ``pytesseract`` is installed, or any
+    ``ocr`` callable); buttons and icons are found by normalized template
+    matching on a downscaled grayscale view of the frame (OpenCV when
+    installed, else an FFT implementation). Every answer carries a confidence
+    so ``VisionAgent`` can decide whether to escalate to the vision model.
+    """
+
+    def __init__(
+        self,
+        template_dir: str | Path = "data/templates",
+        ocr_language: str = "eng",
+        match_downscale: int = 2,
+        ocr: Callable[[Image.Image], list[TextMatch]] | None = None,
+    ):
+        self.template_dir = Path(template_dir)
+        self.match_downscale = max(1, match_downscale)
+        if ocr is None and pytesseract is not None:
+            ocr = partial(tesseract_words, language=ocr_language)
+        self.ocr = ocr
+        self._templates: dict[str, np.ndarray] = {}
+
+    @property
+    def ocr_available(self) -> bool:
+        return self.ocr is not None
+
+    def read_text(self, frame: Frame, region: Region | None = None) -> list[TextMatch]:
+        if self.ocr is None:
+            return []
+        view = frame.crop(region) if region is not None else frame
+        left, top = (region.left, region.top) if region is not None else (0, 0)
+        return [
+            TextMatch(word.text, Region(word.box.left + left, word.box.top + top, word.box.width, word.box.height), word.confidence)
+            for word in self.ocr(view.to_image())
+        ]
+
+    def find_text(self, frame: Frame, expected: str, region: Region | None = None) -> PerceptionResult:
+        """Best run of consecutive OCR words matching ``expected``; confidence is similarity times OCR confidence."""
+        if self.ocr is None:
+            return PerceptionResult(found=False, confidence=0.0, source="unavailable")
+        target = _normalize_text(expected)
+        try:
+            words = [word for word in self.read_text(frame, region) if _normalize_text(word.text)]
+        except Exception:
+            # e.g. pytesseract installed without the tesseract binary: treat as no local answer.
+            return PerceptionResult(found=False, confidence=0.0, source="unavailable")
+        span = max(1, len(target.split()))
+        best: tuple[float, list[TextMatch]] = (0.0, [])
+        for start in range(len(words)):
+            window = words[start : start + span]
+            joined = _normalize_text(" ".join(word.text for word in window))
+            score = SequenceMatcher(None, joined, target).ratio() * min(word.confidence for word in window)
+            if score > best[0]:
+                best = (score, window)
+        score, window = best
+        if not window:
+            return PerceptionResult(found=False, confidence=0.0, source="ocr")
+        left = min(word.box.left for word in window)
+        top = min(word.box.top for word in window)
+        right = max(word.box.left + word.box.width for word in window)
+        bottom = max(word.box.top + word.box.height for word in window)
+        return PerceptionResult(
+            found=True,
+            confidence=round(score, 4),
+            source="ocr",
+            box=Region(left, top, right - left, bottom - top),
+            text=" ".join(word.text for word in window),
+        )
+
+    def _template_gray(self, template: str | Frame | Image.Image) -> np.ndarray:
+        if not isinstance(template, str):
+            return as_frame(template).gray_small(self.match_downscale)
+        if template not in self._templates:
+            path = self.template_dir / template
+            if not path.suffix:
+                path = path.with_suffix(".png")
+            self._templates[template] = Frame.from_image(Image.open(path)).gray_small(self.match_downscale)
+        return self._templates[template]
+
+    def locate_template(
+        self,
+        frame: Frame,
+        template: str | Frame | Image.Image,
+        region: Region | None = None,
+    ) -> PerceptionResult:
+        """Best match of ``template`` (a name under ``template_dir`` or an image); confidence is the correlation."""
+        view = frame.crop(region) if region is not None else frame
+        needle = self._template_gray(template)
+        scores = normalized_cross_correlation(view.gray_small(self.match_downscale), needle)
+        if scores.size == 0:
+            return PerceptionResult(found=False, confidence=0.0, source="template")
+        row, col = np.unravel_index(int(np.argmax(scores)), scores.shape)
+        scale = self.match_downscale
+        left = int(col) * scale + (region.left if region is not None else 0)
+        top = int(row) * scale + (region.top if region is not None else 0)
+        return PerceptionResult(
+            found=True,
+            confidence=round(float(max(0.0, scores[row, col])), 4),
+            source="template",
+            box=Region(left, top, needle.shape[1] * scale, needle.shape[0] * scale),
+            text=template if isinstance(template, str) else "",
+        )
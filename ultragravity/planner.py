@@ -42,6 +42,61 @@ class ExecutionPlan:
     steps: list[PlanStep]
 
 
+def plan_to_dict(plan: ExecutionPlan) -> dict[str, object]:
+    return {
+        "id": plan.id,
+        "goal": plan.goal,
+        "mode": plan.mode,
+        "created_at": plan.created_at,
+        "steps": [
+            {
+                "id": step.id,
+                "title": step.title,
+                "step_type": step.step_type.value,
+                "risk_level": step.risk_level.value,
+                "checkpoint_required": step.checkpoint_required,
+                "params": dict(step.params),
+                "retry_policy": {
+                    "max_attempts": step.retry_policy.max_attempts,
+                    "backoff_seconds": step.retry_policy.backoff_seconds,
+                    "fallback_step_id": step.retry_policy.fallback_step_id,
+                },
+                "depends_on": list(step.depends_on),
+            }
+            for step in plan.steps
+        ],
+    }
+
+
+def plan_from_dict(payload: dict[str, object]) -> ExecutionPlan:
+    steps: list[PlanStep] = []
+    for raw_step in payload.get("steps") or []:
+        retry = raw_step.get("retry_policy") or {}
+        steps.append(
+            PlanStep(
+                id=str(raw_step["id"]),
+                title=str(raw_step.get("title", raw_step["id"])),
+                step_type=StepType(raw_step["step_type"]),
+                risk_level=RiskLevel(raw_step["risk_level"]),
+                checkpoint_required=bool(raw_step.get("checkpoint_required", False)),
+                params=dict(raw_step.get("params") or {}),
+                retry_policy=StepRetryPolicy(
+                    max_attempts=int(retry.get("max_attempts", 1)),
+                    backoff_seconds=float(retry.get("backoff_seconds", 0.0)),
+                    fallback_step_id=retry.get("fallback_step_id"),
+                ),
+                depends_on=[str(item) for item in raw_step.get("depends_on") or []],
+            )
+        )
+    return ExecutionPlan(
+        id=str(payload["id"]),
+        goal=str(payload.get("goal", "")),
+        mode=str(payload.get("mode", "BROWSER")),
+        created_at=str(payload.get("created_at", "")),
+        steps=steps,
+    )
+
+
 class Planner:
     def build_plan(
         self,
@@ -46,6 +46,78 @@ class PromptLibrary:
         """
         return self._compact(prompt)
 
+    def build_ax_action_prompt(
+        self,
+        goal: str,
+        elements: str,
+        delta_context: str,
+    ) -> str:
+        reasoning_rule = (
+            '"reasoning":"<=30 words"' if self.debug_reasoning else '"reasoning":""'
+        )
+        schema = {
+            "action": "click|type|scroll|wait|done|fail|need_screenshot",
+            "target_element": {"element_id": "e1a2b3c", "description": "string"},
+            "value": "string",
+            "reasoning": "debug-only",
+        }
+
+        prompt = f"""
+        Role: UI automation planner working from the page accessibility tree.
+        Goal: {goal}
+        Delta: {delta_context}
+
+        Output strict JSON only. No markdown.
+        Required keys: action,target_element,value,reasoning.
+        Allowed actions: click,type,scroll,wait,done,fail,need_screenshot.
+        For click/type, element_id must be one of the bracketed ids below.
+        Use need_screenshot if the elements below are not enough to act.
+
+        JSON schema example:
+        {json.dumps(schema, separators=(',', ':'))}
+
+        Reasoning rule: {reasoning_rule}
+        """
+        # Element lines keep their newlines and indentation; they encode nesting.
+        return self._compact(prompt) + "\nElements:\n" + elements
+
+    def build_marked_action_prompt(
+        self,
+        goal: str,
+        mode: str,
+        delta_context: str,
+        legend: str,
+    ) -> str:
+        reasoning_rule = (
+            '"reasoning":"<=30 words"' if self.debug_reasoning else '"reasoning":""'
+        )
+        schema = {
+            "action": "click|type|scroll|wait|done|fail",
+            "target_element": {"element_id": "12", "description": "string", "coordinates": []},
+            "value": "string",
+            "reasoning": "debug-only",
+        }
+
+        prompt = f"""
+        Role: UI automation planner.
+        Goal: {goal}
+        Mode: {mode}
+        Delta: {delta_context}
+
+        The screenshot has numbered boxes drawn over interactive elements.
+        Output strict JSON only. No markdown.
+        Required keys: action,target_element,value,reasoning.
+        Allowed actions: click,type,scroll,wait,done,fail.
+        For click/type, set element_id to the number of the marked box and coordinates to [].
+        Only if the target has no mark, leave element_id empty and give coordinates.
+
+        JSON schema example:
+        {json.dumps(schema, separators=(',', ':'))}
+
+        Reasoning rule: {reasoning_rule}
+        """
+        return self._compact(prompt) + "\nMarks:\n" + legend
+
     def build_chunk_summary_prompt(self, goal: str, chunk: str, chunk_index: int, total_chunks: int) -> str:
         prompt = f"""
         Role: concise summarizer.
@@ -61,13 +133,19 @@ class PromptLibrary:
         """
         return self._compact(prompt)
 
-    def build_merge_summary_prompt(self, goal: str, chunk_summaries: list[str]) -> str:
+    def build_merge_summary_prompt(self, goal: str, chunk_summaries: list[str], partial: bool = False) -> str:
         joined = "\n\n".join(chunk_summaries)
+        task = (
+            "Merge these consecutive chunk summaries into one section summary that keeps every goal-relevant fact; "
+            "it will be merged with other sections later."
+            if partial
+            else "Merge the chunk summaries into one coherent final answer."
+        )
         prompt = f"""
         Role: synthesis engine.
         Goal: {goal}
 
-        Merge the chunk summaries into one coherent final answer.
+        {task}
         Keep it concise, structured, and non-redundant.
         Mention uncertainty where evidence conflicts.
         Format in Markdown.
@@ -76,3 +154,17 @@ class PromptLibrary:
         {joined}
         """
         return self._compact(prompt)
+
+    def build_perception_goal(self, description: str, locate: bool = False) -> str:
+        """Goal for ``analyze_image`` when the local perception tier is not confident enough."""
+        if locate:
+            prompt = f"""
+            Locate only, do not change anything: if {description} is visible, answer action "click" with its center
+            coordinates; otherwise answer action "fail".
+            """
+        else:
+            prompt = f"""
+            Verify only, do not change anything: if the screen shows {description}, answer action "done";
+            otherwise answer action "fail".
+            """
+        return self._compact(prompt)
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+AD_AND_TRACKER_DOMAINS = frozenset(
+    {
+        "doubleclick.net",
+        "googlesyndication.com",
+        "googleadservices.com",
+        "google-analytics.com",
+        "googletagmanager.com",
+        "adservice.google.com",
+        "facebook.net",
+        "scorecardresearch.com",
+        "quantserve.com",
+        "taboola.com",
+        "outbrain.com",
+        "criteo.com",
+        "adnxs.com",
+        "amazon-adsystem.com",
+        "hotjar.com",
+        "segment.io",
+        "mixpanel.com",
+        "newrelic.com",
+        "nr-data.net",
+    }
+)
+
+# "reader" keeps only what text extraction needs; "balanced" keeps images for screenshots.
+ROUTING_PRESETS: dict[str, dict[str, frozenset[str]]] = {
+    "full": {"types": frozenset(), "domains": frozenset()},
+    "balanced": {"types": frozenset({"media"}), "domains": AD_AND_TRACKER_DOMAINS},
+    "reader": {
+        "types": frozenset({"image", "media", "font", "imageset", "texttrack", "eventsource", "websocket", "manifest"}),
+        "domains": AD_AND_TRACKER_DOMAINS,
+    },
+}
+
+CACHEABLE_TYPES = frozenset({"stylesheet", "script", "font", "image"})
+
+
+def _domain_matches(host: str, domains: frozenset[str] | set[str]) -> bool:
+    parts = host.split(".")
+    return any(".".join(parts[index:]) in domains for index in range(len(parts)))
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    blocked_types: frozenset[str] = frozenset()
+    blocked_domains: frozenset[str] = frozenset()
+    allowed_domains: frozenset[str] = frozenset()
+
+    @classmethod
+    def from_preset(
+        cls,
+        preset: str,
+        extra_blocked_types: list[str] | None = None,
+        extra_blocked_domains: list[str] | None = None,
+        allowed_domains: list[str] | None = None,
+    ) -> "RequestPolicy":
+        if preset not in ROUTING_PRESETS:
+            raise ValueError(f"Unknown routing preset '{preset}'. Valid presets: {', '.join(ROUTING_PRESETS)}")
+        base = ROUTING_PRESETS[preset]
+        return cls(
+            blocked_types=base["types"] | frozenset(extra_blocked_types or []),
+            blocked_domains=base["domains"] | frozenset(domain.lower() for domain in extra_blocked_domains or []),
+            allowed_domains=frozenset(domain.lower() for domain in allowed_domains or []),
+        )
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if host and _domain_matches(host, self.allowed_domains):
+            return False
+        if resource_type in self.blocked_types:
+            return True
+        return bool(host) and _domain_matches(host, self.blocked_domains)
+
+
+@dataclass
+class RequestStats:
+    """Router counters.
+
+    ``bytes_downloaded`` is every response body that came over the network
+    (documents, XHR and uncached assets alike, as reported by ``requestfinished``);
+    ``cache_miss_bytes`` is the cacheable-asset share of it that missed the disk
+    cache, and ``bytes_from_cache`` what the cache served instead.
+    """
+
+    requests: int = 0
+    blocked: int = 0
+    cache_hits: int = 0
+    cache_stores: int = 0
+    bytes_from_cache: int = 0
+    cache_miss_bytes: int = 0
+    bytes_downloaded: int = 0
+    blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+    def as_counters(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "blocked": self.blocked,
+            "cache_hits": self.cache_hits,
+            "cache_stores": self.cache_stores,
+            "bytes_from_cache": self.bytes_from_cache,
+            "cache_miss_bytes": self.cache_miss_bytes,
+            "bytes_downloaded": self.bytes_downloaded,
+        }
+
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def cache_ttl_seconds(headers: dict[str, str], default_ttl: int) -> int:
+    """0 when the response must not be stored; otherwise its max-age (or the default)."""
+    cache_control = headers.get("cache-control", "").lower()
+    if any(token in cache_control for token in ("no-store", "no-cache", "private")):
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    return int(match.group(1)) if match else default_ttl
+
+
+class HttpAssetCache:
+    """Disk cache for static GET responses, shared across runs and evicted least-recently-used."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_bytes: int = 200_000_000,
+        max_entry_bytes: int = 5_000_000,
+        default_ttl_seconds: int = 86_400,
+        clock=time.time,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.body", self.cache_dir / f"{digest}.json"
+
+    def get(self, url: str) -> tuple[int, dict[str, str], bytes] | None:
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta["expires_at"] <= self.clock():
+                body_path.unlink(missing_ok=True)
+                meta_path.unlink(missing_ok=True)
+                return None
+            body = body_path.read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        os.utime(meta_path)
+        return int(meta["status"]), dict(meta["headers"]), body
+
+    def put(self, url: str, status: int, headers: dict[str, str], body: bytes) -> bool:
+        if status != 200 or len(body) > self.max_entry_bytes:
+            return False
+        ttl = cache_ttl_seconds({key.lower(): value for key, value in headers.items()}, self.default_ttl_seconds)
+        if ttl <= 0:
+            return False
+        body_path, meta_path = self._paths(url)
+        kept_headers = {key: value for key, value in headers.items() if key.lower() in {"content-type", "cache-control", "etag"}}
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(path.stat().st_size for path in self.cache_dir.glob("*.body"))
+            previous = body_path.stat().st_size if body_path.exists() else 0
+            body_path.write_bytes(body)
+            meta_path.write_text(
+                json.dumps({"url": url, "status": status, "headers": kept_headers, "expires_at": self.clock() + ttl}),
+                encoding="utf-8",
+            )
+            self._total_bytes += len(body) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return True
+
+    def _evict(self) -> None:
+        """Drops least recently read entries until the cache fits; hits touch the metadata file."""
+        entries = []
+        total = 0
+        for meta_path in self.cache_dir.glob("*.json"):
+            body_path = meta_path.with_suffix(".body")
+            try:
+                size = body_path.stat().st_size
+                used = meta_path.stat().st_mtime
+            except OSError:
+                continue
+            entries.append((used, size, meta_path, body_path))
+            total += size
+        for _, size, meta_path, body_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            meta_path.unlink(missing_ok=True)
+            body_path.unlink(missing_ok=True)
+            total -= size
+        self._total_bytes = total
+
+
+class RequestRouter:
+    """``context.route`` handler: aborts blocked requests and serves static assets from disk.
+
+    Register ``on_request_finished``/``on_request_failed`` on the context too, so
+    network bytes are counted for every request, not just routed cache misses.
+    """
+
+    def __init__(self, policy: RequestPolicy, cache: HttpAssetCache | None = None, stats: RequestStats | None = None):
+        self.policy = policy
+        self.cache = cache
+        self.stats = stats or RequestStats()
+        # Requests fulfilled from disk still fire requestfinished; their bytes were not downloaded.
+        self._served_from_cache: set[int] = set()
+
+    def handle(self, route: Any) -> None:
+        request = route.request
+        resource_type = request.resource_type
+        self.stats.requests += 1
+
+        if self.policy.should_block(resource_type, request.url):
+            self.stats.blocked += 1
+            self.stats.blocked_by_type[resource_type] = self.stats.blocked_by_type.get(resource_type, 0) + 1
+            route.abort("blockedbyclient")
+            return
+
+        if self.cache is None or request.method != "GET" or resource_type not in CACHEABLE_TYPES:
+            route.continue_()
+            return
+
+        cached = self.cache.get(request.url)
+        if cached is not None:
+            status, headers, body = cached
+            self.stats.cache_hits += 1
+            self.stats.bytes_from_cache += len(body)
+            self._served_from_cache.add(id(request))
+            route.fulfill(status=status, headers=headers, body=body)
+            return
+
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception:
+            # Navigation away or a closed page; let the browser deal with it.
+            route.continue_()
+            return
+        self.stats.cache_miss_bytes += len(body)
+        if self.cache.put(request.url, response.status, response.headers, body):
+            self.stats.cache_stores += 1
+        route.fulfill(response=response, body=body)
+
+    def on_request_finished(self, request: Any) -> None:
+        if id(request) in self._served_from_cache:
+            self._served_from_cache.discard(id(request))
+            return
+        try:
+            self.stats.bytes_downloaded += max(0, int(request.sizes().get("responseBodySize", 0)))
+        except Exception:
+            pass
+
+    def on_request_failed(self, request: Any) -> None:
+        self._served_from_cache.discard(id(request))
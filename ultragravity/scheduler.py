@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import random
+import threading
 from collections import deque
 from dataclasses import dataclass
 from time import perf_counter
@@ -8,6 +9,7 @@ from typing import Any, Callable
 
 from .budget import BudgetManager
 from .telemetry import ProviderTelemetry
+from .tracing import trace_span
 
 
 @dataclass(frozen=True)
@@ -44,6 +46,8 @@ class ProviderScheduler:
         self.telemetry = telemetry
         self.sleep_fn = sleep_fn
         self.queue: deque[ProviderCallRequest] = deque()
+        # Guards the queue and the budget check-then-reserve when calls run on several threads.
+        self._lock = threading.Lock()
 
     @staticmethod
     def _is_rate_limited(error_message: str) -> bool:
@@ -51,21 +55,40 @@ class ProviderScheduler:
         return "429" in lowered or "rate" in lowered and "limit" in lowered or "quota" in lowered
 
     def execute(self, request: ProviderCallRequest) -> ProviderCallResult:
-        self.queue.append(request)
-        active = self.queue.popleft()
+        with trace_span(
+            "scheduler.execute",
+            provider=request.provider,
+            model=request.model,
+            operation=request.operation,
+        ) as span:
+            result = self._execute(request)
+            span.set(success=result.success)
+            return result
+
+    def _wait(self, seconds: float, reason: str) -> None:
+        with trace_span("scheduler.wait", reason=reason, seconds=round(seconds, 3)):
+            self.sleep_fn(seconds)
+
+    def _execute(self, request: ProviderCallRequest) -> ProviderCallResult:
+        with self._lock:
+            self.queue.append(request)
+            active = self.queue.popleft()
 
         for attempt in range(active.max_retries):
-            decision = self.budget_manager.evaluate(active.provider, active.estimated_tokens)
+            with self._lock:
+                decision = self.budget_manager.evaluate(active.provider, active.estimated_tokens)
+                if decision.allowed:
+                    self.budget_manager.reserve(active.provider, active.estimated_tokens)
             if not decision.allowed:
                 wait_time = max(0.1, decision.retry_after_seconds)
-                self.sleep_fn(wait_time)
+                self._wait(wait_time, "budget")
                 continue
 
-            self.budget_manager.reserve(active.provider, active.estimated_tokens)
             started = perf_counter()
 
             try:
-                response = active.call()
+                with trace_span("provider.call", provider=active.provider, attempt=attempt + 1):
+                    response = active.call()
                 duration_ms = int((perf_counter() - started) * 1000)
                 actual_tokens = active.estimated_tokens
                 if active.extract_actual_tokens is not None:
@@ -114,8 +137,8 @@ class ProviderScheduler:
                 jitter = random.uniform(0, active.jitter_seconds)
 
                 if self._is_rate_limited(error_message):
-                    self.sleep_fn(backoff + jitter)
+                    self._wait(backoff + jitter, "rate_limit_backoff")
                 else:
-                    self.sleep_fn(min(1.0 + jitter, backoff))
+                    self._wait(min(1.0 + jitter, backoff), "retry_backoff")
 
         return ProviderCallResult(success=False, error="Provider scheduler exhausted retries", provider=active.provider, model=active.model)
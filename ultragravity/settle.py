@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .call_reduction import StateChangeDetector
+
+# Records the time of the latest DOM mutation; installed once per document.
+MUTATION_TRACKER_SCRIPT = """
+() => {
+    if (window.__ultragravityMutationTracker) { return true; }
+    window.__ultragravityLastMutation = performance.now();
+    const observer = new MutationObserver(() => { window.__ultragravityLastMutation = performance.now(); });
+    observer.observe(document, { subtree: true, childList: true, attributes: true, characterData: true });
+    window.__ultragravityMutationTracker = observer;
+    return true;
+}
+"""
+
+DOM_QUIET_SCRIPT = """
+(quietMs) => document.readyState !== 'loading'
+    && performance.now() - (window.__ultragravityLastMutation || 0) >= quietMs
+"""
+
+
+@dataclass(frozen=True)
+class SettleResult:
+    settled: bool
+    elapsed_ms: int
+    reason: str
+
+
+def wait_until_stable(
+    sample: Callable[[], int],
+    distance: Callable[[int, int], int],
+    threshold: int,
+    stable_samples: int,
+    interval_seconds: float,
+    timeout_seconds: float,
+    clock: Callable[[], float] = time.monotonic,
+    sleep_fn: Callable[[float], None] = time.sleep,
+) -> SettleResult:
+    """Samples until ``stable_samples`` consecutive readings stay within ``threshold``."""
+    started = clock()
+    deadline = started + max(0.0, timeout_seconds)
+    previous = sample()
+    stable = 0
+    while clock() < deadline:
+        sleep_fn(max(0.0, min(interval_seconds, deadline - clock())))
+        current = sample()
+        if distance(previous, current) <= threshold:
+            stable += 1
+            if stable >= stable_samples:
+                return SettleResult(True, int((clock() - started) * 1000), "frames_stable")
+        else:
+            stable = 0
+        previous = current
+    return SettleResult(False, int((clock() - started) * 1000), "timeout")
+
+
+class PageSettleDetector:
+    """Waits for Playwright network idle followed by a DOM mutation quiet window.
+
+    Both waits share one deadline, so a page that never goes idle (long polling,
+    animations) costs at most ``timeout_seconds``.
+    """
+
+    def __init__(
+        self,
+        timeout_seconds: float = 5.0,
+        quiet_window_ms: int = 300,
+        poll_interval_ms: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timeout_seconds = max(0.1, timeout_seconds)
+        self.quiet_window_ms = max(0, quiet_window_ms)
+        self.poll_interval_ms = max(10, poll_interval_ms)
+        self.clock = clock
+
+    def wait(self, page: Any, timeout_seconds: float | None = None) -> SettleResult:
+        started = self.clock()
+        budget = self.timeout_seconds if timeout_seconds is None else max(0.1, timeout_seconds)
+        deadline = started + budget
+
+        def remaining_ms() -> float:
+            return max(1.0, (deadline - self.clock()) * 1000)
+
+        def elapsed_ms() -> int:
+            return int((self.clock() - started) * 1000)
+
+        try:
+            page.evaluate(MUTATION_TRACKER_SCRIPT)
+        except Exception:
+            # Navigation in flight destroyed the context; network idle still applies.
+            pass
+
+        try:
+            page.wait_for_load_state("networkidle", timeout=remaining_ms())
+        except Exception:
+            return SettleResult(False, elapsed_ms(), "network_busy")
+
+        try:
+            page.evaluate(MUTATION_TRACKER_SCRIPT)
+            page.wait_for_function(
+                DOM_QUIET_SCRIPT,
+                arg=self.quiet_window_ms,
+                timeout=remaining_ms(),
+                polling=self.poll_interval_ms,
+            )
+        except Exception:
+            return SettleResult(False, elapsed_ms(), "dom_busy")
+        return SettleResult(True, elapsed_ms(), "network_and_dom_idle")
+
+
+class FrameSettleDetector:
+    """Waits until consecutive low-resolution frames have near-identical dHashes."""
+
+    def __init__(
+        self,
+        capture: Callable[[], Any],
+        timeout_seconds: float = 5.0,
+        poll_interval_ms: int = 150,
+        stable_frames: int = 2,
+        distance_threshold: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        sleep_fn: Callable[[float], None] = time.sleep,
+    ):
+        self.capture = capture
+        self.timeout_seconds = max(0.1, timeout_seconds)
+        self.poll_interval_seconds = max(10, poll_interval_ms) / 1000
+        self.stable_frames = max(1, stable_frames)
+        self.distance_threshold = max(0, distance_threshold)
+        self.clock = clock
+        self.sleep_fn = sleep_fn
+
+    def wait(self, timeout_seconds: float | None = None) -> SettleResult:
+        return wait_until_stable(
+            sample=lambda: StateChangeDetector.dhash_image(self.capture()),
+            distance=lambda a, b: (a ^ b).bit_count(),
+            threshold=self.distance_threshold,
+            stable_samples=self.stable_frames,
+            interval_seconds=self.poll_interval_seconds,
+            timeout_seconds=self.timeout_seconds if timeout_seconds is None else max(0.1, timeout_seconds),
+            clock=self.clock,
+            sleep_fn=self.sleep_fn,
+        )
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
-import json
-from datetime import datetime, timezone
+import atexit
+import threading
+import time
 from pathlib import Path
-from typing import Any
+
+from .latency import LatencyHistogram, LatencySeries, series_key
+from .telemetry_store import TelemetryRecord, TelemetryStore
 
 
 class ProviderTelemetry:
-    def __init__(self, log_dir: str | Path = "logs/telemetry"):
+    def __init__(self, log_dir: str | Path = "logs/telemetry", rollup_flush_every: int = 50):
         self.log_dir = Path(log_dir)
-        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.store = TelemetryStore(self.log_dir, rollup_flush_every=rollup_flush_every)
+        self.store.reconcile()
         self._stats: dict[str, dict[str, int | float]] = {}
-
-    def _log_path(self) -> Path:
-        stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
-        return self.log_dir / f"provider-{stamp}.jsonl"
+        self._series: dict[str, LatencySeries] = {}
+        self._series_labels: dict[str, tuple[str, str, str]] = {}
+        # Summaries map and reduce on worker threads; stats and the store are shared.
+        self._lock = threading.Lock()
+        atexit.register(self.close)
 
     def _ensure_provider(self, provider: str) -> None:
         if provider not in self._stats:
@@ -38,41 +43,82 @@ class ProviderTelemetry:
         success: bool,
         error: str | None = None,
     ) -> None:
-        self._ensure_provider(provider)
-        provider_stats = self._stats[provider]
-        provider_stats["requests"] = int(provider_stats["requests"]) + 1
-        provider_stats["estimated_tokens"] = int(provider_stats["estimated_tokens"]) + max(0, estimated_tokens)
-        provider_stats["actual_tokens"] = int(provider_stats["actual_tokens"]) + max(0, actual_tokens)
-        provider_stats["latency_ms_total"] = int(provider_stats["latency_ms_total"]) + max(0, latency_ms)
+        with self._lock:
+            self._ensure_provider(provider)
+            provider_stats = self._stats[provider]
+            provider_stats["requests"] = int(provider_stats["requests"]) + 1
+            provider_stats["estimated_tokens"] = int(provider_stats["estimated_tokens"]) + max(0, estimated_tokens)
+            provider_stats["actual_tokens"] = int(provider_stats["actual_tokens"]) + max(0, actual_tokens)
+            provider_stats["latency_ms_total"] = int(provider_stats["latency_ms_total"]) + max(0, latency_ms)
 
-        if success:
-            provider_stats["successes"] = int(provider_stats["successes"]) + 1
-        else:
-            provider_stats["failures"] = int(provider_stats["failures"]) + 1
+            if success:
+                provider_stats["successes"] = int(provider_stats["successes"]) + 1
+            else:
+                provider_stats["failures"] = int(provider_stats["failures"]) + 1
 
-        payload = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "provider": provider,
-            "model": model,
-            "operation": operation,
-            "estimated_tokens": estimated_tokens,
-            "actual_tokens": actual_tokens,
-            "latency_ms": latency_ms,
-            "success": success,
-            "error": error,
-        }
+            key = series_key(provider, model, operation)
+            if key not in self._series:
+                self._series[key] = LatencySeries()
+                self._series_labels[key] = (provider, model, operation)
+            self._series[key].record(latency_ms, actual_tokens, success, error)
+
+            self.store.append(
+                TelemetryRecord(
+                    timestamp=time.time(),
+                    provider=provider,
+                    model=model,
+                    operation=operation,
+                    estimated_tokens=estimated_tokens,
+                    actual_tokens=actual_tokens,
+                    latency_ms=latency_ms,
+                    success=success,
+                    error=error,
+                )
+            )
 
-        with self._log_path().open("a", encoding="utf-8") as output:
-            output.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    def close(self) -> None:
+        self.store.close()
+
+    def _copy_state(self) -> tuple[dict[str, dict[str, int | float]], dict[str, tuple[tuple[str, str, str], LatencySeries]]]:
+        """Consistent copies of the counters and series; ``record`` may run on other threads meanwhile."""
+        with self._lock:
+            stats = {provider: dict(values) for provider, values in self._stats.items()}
+            series: dict[str, tuple[tuple[str, str, str], LatencySeries]] = {}
+            for key, live in self._series.items():
+                copy = LatencySeries()
+                copy.merge(live)
+                series[key] = (self._series_labels[key], copy)
+        return stats, series
 
     def snapshot(self) -> dict[str, dict[str, int | float]]:
+        stats_by_provider, series_by_key = self._copy_state()
         response: dict[str, dict[str, int | float]] = {}
-        for provider, stats in self._stats.items():
+        for provider, stats in stats_by_provider.items():
             requests = int(stats["requests"])
             latency_total = int(stats["latency_ms_total"])
+            histogram = LatencyHistogram()
+            for labels, series in series_by_key.values():
+                if labels[0] == provider:
+                    histogram.merge(series.histogram)
             response[provider] = {
                 **stats,
                 "latency_ms_avg": (latency_total / requests) if requests else 0,
+                "latency_ms_p50": histogram.percentile(0.50),
+                "latency_ms_p90": histogram.percentile(0.90),
+                "latency_ms_p99": histogram.percentile(0.99),
                 "success_rate": (int(stats["successes"]) / requests) if requests else 0,
             }
         return response
+
+    def latency_snapshot(self) -> list[dict[str, object]]:
+        rows: list[dict[str, object]] = []
+        for key, (labels, series) in sorted(self._copy_state()[1].items()):
+            provider, model, operation = labels
+            rows.append({"provider": provider, "model": model, "operation": operation, **series.summary()})
+        return rows
+
+    def export(self) -> dict[str, object]:
+        return {
+            "providers": self.snapshot(),
+            "series": self.latency_snapshot(),
+        }
@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from .latency import LatencySeries, series_key
+from .log_retention import COMPRESSED_SUFFIXES, is_compressed, logical_name, read_log_bytes
+
+# timestamp, provider, model, operation, estimated_tokens, actual_tokens, latency_ms, success, error
+RECORD_FORMAT = struct.Struct("<d16s48s32siiiB64s")
+SEGMENT_PREFIX = "provider-"
+SEGMENT_SUFFIX = ".bin"
+ROLLUP_FILENAME = "rollups.json"
+
+
+@dataclass(frozen=True)
+class TelemetryRecord:
+    timestamp: float
+    provider: str
+    model: str
+    operation: str
+    estimated_tokens: int
+    actual_tokens: int
+    latency_ms: int
+    success: bool
+    error: str | None = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timestamp": datetime.fromtimestamp(self.timestamp, tz=timezone.utc).isoformat(),
+            "provider": self.provider,
+            "model": self.model,
+            "operation": self.operation,
+            "estimated_tokens": self.estimated_tokens,
+            "actual_tokens": self.actual_tokens,
+            "latency_ms": self.latency_ms,
+            "success": self.success,
+            "error": self.error,
+        }
+
+
+def _encode_text(value: str | None, width: int) -> bytes:
+    return (value or "").encode("utf-8")[:width]
+
+
+def _decode_text(value: bytes) -> str:
+    return value.rstrip(b"\x00").decode("utf-8", errors="ignore")
+
+
+def _clamp_int(value: int) -> int:
+    return max(-(2**31), min(2**31 - 1, int(value)))
+
+
+def pack_record(record: TelemetryRecord) -> bytes:
+    return RECORD_FORMAT.pack(
+        record.timestamp,
+        _encode_text(record.provider, 16),
+        _encode_text(record.model, 48),
+        _encode_text(record.operation, 32),
+        _clamp_int(record.estimated_tokens),
+        _clamp_int(record.actual_tokens),
+        _clamp_int(record.latency_ms),
+        1 if record.success else 0,
+        _encode_text(record.error, 64),
+    )
+
+
+def unpack_record(raw: tuple[Any, ...]) -> TelemetryRecord:
+    timestamp, provider, model, operation, estimated, actual, latency, success, error = raw
+    error_text = _decode_text(error)
+    return TelemetryRecord(
+        timestamp=float(timestamp),
+        provider=_decode_text(provider),
+        model=_decode_text(model),
+        operation=_decode_text(operation),
+        estimated_tokens=int(estimated),
+        actual_tokens=int(actual),
+        latency_ms=int(latency),
+        success=bool(success),
+        error=error_text or None,
+    )
+
+
+def read_segment_records(path: Path, start: int = 0, limit: int | None = None) -> list[TelemetryRecord]:
+    """Decodes fixed-width records ``[start, start + limit)`` through a read-only mmap.
+
+    Compressed (closed) segments are decompressed into memory instead.
+    """
+    if is_compressed(path):
+        data = read_log_bytes(path)
+        total = len(data) // RECORD_FORMAT.size
+        start = max(0, start)
+        end = total if limit is None else min(total, start + max(0, limit))
+        window = data[start * RECORD_FORMAT.size : max(start, end) * RECORD_FORMAT.size]
+        return [unpack_record(raw) for raw in RECORD_FORMAT.iter_unpack(window)]
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return []
+    total = size // RECORD_FORMAT.size
+    start = max(0, start)
+    end = total if limit is None else min(total, start + max(0, limit))
+    if start >= end:
+        return []
+
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        window = view[start * RECORD_FORMAT.size : end * RECORD_FORMAT.size]
+    return [unpack_record(raw) for raw in RECORD_FORMAT.iter_unpack(window)]
+
+
+def segment_record_count(path: Path) -> int:
+    if is_compressed(path):
+        return len(read_log_bytes(path)) // RECORD_FORMAT.size
+    try:
+        return path.stat().st_size // RECORD_FORMAT.size
+    except OSError:
+        return 0
+
+
+def _empty_provider_stats() -> dict[str, int]:
+    return {
+        "requests": 0,
+        "successes": 0,
+        "failures": 0,
+        "estimated_tokens": 0,
+        "actual_tokens": 0,
+        "latency_ms_total": 0,
+    }
+
+
+def _fold(stats: dict[str, dict[str, int]], provider: str, estimated: int, actual: int, latency_ms: int, success: bool) -> None:
+    provider_stats = stats.setdefault(provider or "unknown", _empty_provider_stats())
+    provider_stats["requests"] += 1
+    provider_stats["estimated_tokens"] += max(0, estimated)
+    provider_stats["actual_tokens"] += max(0, actual)
+    provider_stats["latency_ms_total"] += max(0, latency_ms)
+    if success:
+        provider_stats["successes"] += 1
+    else:
+        provider_stats["failures"] += 1
+
+
+class TelemetryStore:
+    """Append-only fixed-width telemetry segments plus persisted per-day rollups.
+
+    Each day gets one ``provider-YYYYMMDD.bin`` segment. ``rollups.json`` keeps
+    per-day and all-time totals and the number of records already folded from
+    every segment, so readers only decode the unrolled tail of recent segments.
+    """
+
+    def __init__(self, log_dir: str | Path = "logs/telemetry", rollup_flush_every: int = 50):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.rollup_flush_every = max(1, rollup_flush_every)
+        self._handle: BinaryIO | None = None
+        self._handle_name = ""
+        self._appended_since_flush = 0
+        self._touched_segments: set[str] = set()
+
+    @staticmethod
+    def segment_name(day: str) -> str:
+        return f"{SEGMENT_PREFIX}{day}{SEGMENT_SUFFIX}"
+
+    @staticmethod
+    def _day_for_segment(name: str) -> str:
+        return name[len(SEGMENT_PREFIX) : len(SEGMENT_PREFIX) + 8]
+
+    def _current_segment_name(self) -> str:
+        return self.segment_name(datetime.now(timezone.utc).strftime("%Y%m%d"))
+
+    def segments(self) -> list[Path]:
+        return sorted(self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+    def append(self, record: TelemetryRecord) -> None:
+        name = self._current_segment_name()
+        if self._handle is None or self._handle_name != name:
+            self._close_handle()
+            self._handle = (self.log_dir / name).open("ab")
+            self._handle_name = name
+        self._handle.write(pack_record(record))
+        self._handle.flush()
+        self._touched_segments.add(name)
+        self._appended_since_flush += 1
+        if self._appended_since_flush >= self.rollup_flush_every:
+            self.flush_rollups()
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+        self._handle = None
+        self._handle_name = ""
+
+    def close(self) -> None:
+        self.flush_rollups()
+        self._close_handle()
+
+    def load_rollups(self) -> dict[str, Any]:
+        path = self.log_dir / ROLLUP_FILENAME
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            data = {}
+        data.setdefault("totals", {})
+        data.setdefault("days", {})
+        data.setdefault("segments", {})
+        data.setdefault("imported", [])
+        data.setdefault("last_segment", "")
+        data.setdefault("series", {})
+        return data
+
+    def _write_rollups(self, rollups: dict[str, Any]) -> None:
+        path = self.log_dir / ROLLUP_FILENAME
+        temp_path = path.with_suffix(".json.tmp")
+        temp_path.write_text(json.dumps(rollups, separators=(",", ":")), encoding="utf-8")
+        os.replace(temp_path, path)
+
+    def _fold_segment_tail(self, rollups: dict[str, Any], name: str) -> int:
+        rolled = int(rollups["segments"].get(name, 0))
+        records = read_segment_records(self.log_dir / name, start=rolled)
+        if not records:
+            return 0
+        day_stats = rollups["days"].setdefault(self._day_for_segment(name), {})
+        series: dict[str, LatencySeries] = {}
+        for record in records:
+            for target in (day_stats, rollups["totals"]):
+                _fold(target, record.provider, record.estimated_tokens, record.actual_tokens, record.latency_ms, record.success)
+            key = series_key(record.provider, record.model, record.operation)
+            if key not in series:
+                series[key] = LatencySeries.from_dict(rollups["series"].get(key))
+            series[key].record(record.latency_ms, record.actual_tokens, record.success, record.error)
+        for key, value in series.items():
+            rollups["series"][key] = value.to_dict()
+        rollups["segments"][name] = rolled + len(records)
+        if name > str(rollups.get("last_segment") or ""):
+            rollups["last_segment"] = name
+        return len(records)
+
+    def _import_legacy_jsonl(self, rollups: dict[str, Any]) -> bool:
+        imported = set(rollups["imported"])
+        changed = False
+        for path in sorted(self.log_dir.glob(f"{SEGMENT_PREFIX}*.jsonl")):
+            if path.name in imported:
+                continue
+            day_stats = rollups["days"].setdefault(self._day_for_segment(path.name), {})
+            series: dict[str, LatencySeries] = {}
+            for raw_line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(raw_line)
+                except Exception:
+                    continue
+                key = series_key(
+                    str(record.get("provider") or "unknown"),
+                    str(record.get("model") or ""),
+                    str(record.get("operation") or ""),
+                )
+                if key not in series:
+                    series[key] = LatencySeries.from_dict(rollups["series"].get(key))
+                series[key].record(
+                    int(record.get("latency_ms") or 0),
+                    int(record.get("actual_tokens") or 0),
+                    bool(record.get("success")),
+                    record.get("error"),
+                )
+                for target in (day_stats, rollups["totals"]):
+                    _fold(
+                        target,
+                        str(record.get("provider") or "unknown"),
+                        int(record.get("estimated_tokens") or 0),
+                        int(record.get("actual_tokens") or 0),
+                        int(record.get("latency_ms") or 0),
+                        bool(record.get("success")),
+                    )
+            for key, value in series.items():
+                rollups["series"][key] = value.to_dict()
+            rollups["imported"].append(path.name)
+            changed = True
+        return changed
+
+    def flush_rollups(self) -> None:
+        if not self._touched_segments:
+            return
+        rollups = self.load_rollups()
+        for name in sorted(self._touched_segments):
+            self._fold_segment_tail(rollups, name)
+        self._write_rollups(rollups)
+        self._touched_segments = set()
+        self._appended_since_flush = 0
+
+    def reconcile(self) -> None:
+        """Folds every segment tail that a crashed writer never rolled up."""
+        rollups = self.load_rollups()
+        folded = sum(self._fold_segment_tail(rollups, path.name) for path in self.segments())
+        if folded or self._import_legacy_jsonl(rollups):
+            self._write_rollups(rollups)
+
+    def summarize(self) -> dict[str, Any]:
+        """Returns rollups with the live tail of the newest segments folded in.
+
+        Only today's segment and the last rolled-up segment are inspected, so the
+        cost does not grow with history. Legacy JSONL files are imported once.
+        """
+        rollups = self.load_rollups()
+        if self._import_legacy_jsonl(rollups):
+            self._write_rollups(rollups)
+        for name in {self._current_segment_name(), str(rollups.get("last_segment") or "")}:
+            if name:
+                self._fold_segment_tail(rollups, name)
+        return rollups
+
+    def provider_totals(self) -> dict[str, dict[str, int]]:
+        return self.summarize()["totals"]
+
+    def latency_summaries(self) -> dict[str, dict[str, Any]]:
+        summaries: dict[str, dict[str, Any]] = {}
+        for key, payload in self.summarize()["series"].items():
+            provider, model, operation = (key.split("|", 2) + ["", ""])[:3]
+            summaries[key] = {
+                "provider": provider,
+                "model": model,
+                "operation": operation,
+                **LatencySeries.from_dict(payload).summary(),
+            }
+        return summaries
+
+    def is_folded(self, path: Path) -> bool:
+        """True once every record of a closed segment is reflected in the rollups."""
+        rollups = self.load_rollups()
+        name = logical_name(path)
+        if name.endswith(".jsonl"):
+            return name in rollups["imported"]
+        return int(rollups["segments"].get(name, -1)) >= segment_record_count(path)
+
+    def read_tail(self, limit: int) -> list[tuple[str, TelemetryRecord]]:
+        collected: list[tuple[str, TelemetryRecord]] = []
+        remaining = max(0, limit)
+        paths = self.segments()
+        for suffix in COMPRESSED_SUFFIXES:
+            paths.extend(self.log_dir.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}{suffix}"))
+        for path in sorted(paths, key=logical_name, reverse=True):
+            if remaining <= 0:
+                break
+            count = segment_record_count(path)
+            start = max(0, count - remaining)
+            records = read_segment_records(path, start=start)
+            collected = [(path.name, record) for record in records] + collected
+            remaining -= len(records)
+        return collected
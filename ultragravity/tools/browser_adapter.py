@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import asdict
 from typing import Any
 
 from ultragravity.actions import RiskLevel
@@ -19,6 +20,7 @@ class BrowserAdapter:
             "navigate": ToolCapability("navigate", RiskLevel.R1, True, "Navigate to URL"),
             "execute_action": ToolCapability("execute_action", RiskLevel.R1, False, "Execute browser action plan"),
             "screenshot": ToolCapability("screenshot", RiskLevel.R0, True, "Capture browser screenshot"),
+            "fetch_pages": ToolCapability("fetch_pages", RiskLevel.R1, True, "Read several URLs in parallel tabs"),
         }
 
     def execute(self, operation: str, params: dict[str, Any]) -> ToolExecutionResult:
@@ -42,18 +44,35 @@ class BrowserAdapter:
             target = action_plan.get("target_element", {}) if isinstance(action_plan.get("target_element"), dict) else {}
             coords = target.get("coordinates")
 
-            if action in {"click", "type"} and (not isinstance(coords, list) or len(coords) < 2):
+            has_coords = isinstance(coords, list) and len(coords) >= 2
+            if action in {"click", "type"} and not has_coords and not target.get("element_id"):
                 return ToolExecutionResult(
                     success=True,
                     payload={
                         "fallback": "wait",
-                        "reason": "Missing coordinates for interactive action",
+                        "reason": "Missing coordinates or element id for interactive action",
                     },
                 )
 
             self.browser.execute_action(action_plan)
             return ToolExecutionResult(success=True, payload={"action": action})
 
+        if operation == "fetch_pages":
+            urls = [str(url) for url in params.get("urls", []) if url]
+            if not urls:
+                return ToolExecutionResult(success=False, error="Missing urls")
+            pages = self.browser.fetch_pages(
+                urls,
+                max_concurrency=int(params.get("max_concurrency", 4)),
+                timeout_seconds=float(params.get("timeout_seconds", 15.0)),
+            )
+            readable = any(page.ok for page in pages)
+            return ToolExecutionResult(
+                success=readable,
+                payload={"pages": [asdict(page) for page in pages]},
+                error="" if readable else "No page could be read",
+            )
+
         if operation == "screenshot":
             path = str(params.get("path", "screenshot.png"))
             screenshot_path = self.browser.get_screenshot(path)
@@ -4,6 +4,7 @@ from typing import Any
 
 from ultragravity.actions import Action
 from ultragravity.gateway import ActionGateway
+from ultragravity.tracing import trace_span
 
 from .base import ToolExecutionResult
 from .registry import ToolRegistry
@@ -37,7 +38,11 @@ class ToolOrchestrator:
             reason=reason or capability.description,
         )
 
-        execution = self.gateway.execute(action, lambda: adapter.execute(operation, params))
+        def _run_adapter() -> Any:
+            with trace_span(f"tool.{tool_name}.{operation}"):
+                return adapter.execute(operation, params)
+
+        execution = self.gateway.execute(action, _run_adapter)
         if not execution.allowed:
             return ToolExecutionResult(success=False, error=execution.error or "Denied by policy")
         if not execution.executed:
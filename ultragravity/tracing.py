@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Protocol, TypeVar
+
+FunctionType = TypeVar("FunctionType", bound=Callable[..., Any])
+TRACE_PREFIX = "trace-"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: str
+    name: str
+    start_unix_ns: int
+    start_monotonic_ns: int
+    attributes: dict[str, Any] = field(default_factory=dict)
+    duration_ms: float = 0.0
+    status: str = "ok"
+    error: str = ""
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_unix_ns": self.start_unix_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None:
+        ...
+
+
+class JsonlSpanExporter:
+    """Appends finished spans to ``<log_dir>/trace-<trace_id>.jsonl``."""
+
+    def __init__(self, log_dir: str | Path = "logs/traces"):
+        self.log_dir = Path(log_dir)
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def trace_path(self, trace_id: str) -> Path:
+        return self.log_dir / f"{TRACE_PREFIX}{trace_id}.jsonl"
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        with self._lock, self.trace_path(span.trace_id).open("a", encoding="utf-8") as output:
+            output.write(line)
+
+
+_current_span: contextvars.ContextVar[Span | None] = contextvars.ContextVar("ultragravity_current_span", default=None)
+
+
+class _NoopSpan:
+    def set(self, **attributes: Any) -> None:
+        return
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """Nested spans tracked through ``contextvars`` with monotonic durations.
+
+    A tracer without an exporter is a no-op, so instrumented code pays only a
+    context-manager call when tracing is disabled.
+    """
+
+    def __init__(self, exporter: SpanExporter | None = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @staticmethod
+    def current_span() -> Span | None:
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name: str, trace_id: str | None = None, **attributes: Any) -> Iterator[Span | _NoopSpan]:
+        if self.exporter is None:
+            yield _NOOP_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            trace_id=parent.trace_id if parent is not None else (trace_id or uuid.uuid4().hex),
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent is not None else "",
+            name=name,
+            start_unix_ns=time.time_ns(),
+            start_monotonic_ns=time.monotonic_ns(),
+            attributes=dict(attributes),
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.status = "error"
+            span.error = f"{type(exc).__name__}: {exc}"[:240]
+            raise
+        finally:
+            span.duration_ms = (time.monotonic_ns() - span.start_monotonic_ns) / 1_000_000
+            _current_span.reset(token)
+            try:
+                self.exporter.export(span)
+            except OSError:
+                pass
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> None:
+    global _tracer
+    _tracer = tracer
+
+
+def trace_span(name: str, trace_id: str | None = None, **attributes: Any):
+    """Opens a span on the process-wide tracer."""
+    return _tracer.span(name, trace_id=trace_id, **attributes)
+
+
+def traced(name: str) -> Callable[[FunctionType], FunctionType]:
+    def decorator(function: FunctionType) -> FunctionType:
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _tracer.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def parallel_map(
+    work: Callable[[Any], Any],
+    items: list[Any],
+    max_workers: int,
+    thread_name_prefix: str = "worker",
+) -> list[Any]:
+    """``work`` over ``items`` on up to ``max_workers`` threads, in order, inside the caller's span.
+
+    Pool threads do not inherit contextvars, so each item runs in a copy of
+    the submitting context; otherwise spans opened by workers would start new
+    root traces.
+    """
+    workers = min(max_workers, len(items))
+    if workers <= 1:
+        return [work(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, work, item) for item in items]
+        return [future.result() for future in futures]
+
+
+def load_trace(path: str | Path) -> list[dict[str, Any]]:
+    spans: list[dict[str, Any]] = []
+    for raw_line in Path(path).read_text(encoding="utf-8").splitlines():
+        try:
+            spans.append(json.loads(raw_line))
+        except Exception:
+            continue
+    return spans
+
+
+def find_trace(log_dir: str | Path, run: str = "latest") -> Path | None:
+    """Resolves a trace id, unique id prefix or ``latest`` to a trace file."""
+    candidates = sorted(Path(log_dir).glob(f"{TRACE_PREFIX}*.jsonl"), key=lambda path: path.stat().st_mtime)
+    if not candidates:
+        return None
+    if run in {"", "latest"}:
+        return candidates[-1]
+    matches = [path for path in candidates if path.stem[len(TRACE_PREFIX) :].startswith(run)]
+    return matches[-1] if matches else None
+
+
+def flame_summary(spans: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Aggregates spans by their name path into total and self time rows.
+
+    Rows come back in depth-first order so they can be printed as an indented
+    tree, heaviest siblings first.
+    """
+    by_id = {str(span.get("span_id")): span for span in spans}
+    children_ms: dict[str, float] = {}
+    for span in spans:
+        parent_id = str(span.get("parent_id") or "")
+        if parent_id:
+            children_ms[parent_id] = children_ms.get(parent_id, 0.0) + float(span.get("duration_ms") or 0.0)
+
+    def name_path(span: dict[str, Any]) -> tuple[str, ...]:
+        names: list[str] = []
+        cursor: dict[str, Any] | None = span
+        seen: set[str] = set()
+        while cursor is not None and str(cursor.get("span_id")) not in seen:
+            seen.add(str(cursor.get("span_id")))
+            names.append(str(cursor.get("name")))
+            cursor = by_id.get(str(cursor.get("parent_id") or ""))
+        return tuple(reversed(names))
+
+    rows: dict[tuple[str, ...], dict[str, Any]] = {}
+    for span in spans:
+        path = name_path(span)
+        duration = float(span.get("duration_ms") or 0.0)
+        row = rows.setdefault(path, {"path": path, "count": 0, "total_ms": 0.0, "self_ms": 0.0, "errors": 0})
+        row["count"] += 1
+        row["total_ms"] += duration
+        row["self_ms"] += max(0.0, duration - children_ms.get(str(span.get("span_id")), 0.0))
+        if span.get("status") == "error":
+            row["errors"] += 1
+
+    ordered: list[dict[str, Any]] = []
+
+    def visit(prefix: tuple[str, ...]) -> None:
+        children = [row for path, row in rows.items() if len(path) == len(prefix) + 1 and path[: len(prefix)] == prefix]
+        for row in sorted(children, key=lambda item: item["total_ms"], reverse=True):
+            ordered.append(row)
+            visit(row["path"])
+
+    visit(())
+    return ordered